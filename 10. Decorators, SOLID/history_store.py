@@ -0,0 +1,199 @@
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+# File offset up to which the history file is covered by the index
+_INDEX_HEADER = struct.Struct("<Q")
+# How many lines __iter__ reads from the file at a time
+_ITER_CHUNK = 10000
+
+
+class HistoryStore:
+    """
+    History file with a sidecar index of line offsets.
+    The history file is memory-mapped and the index ("<history file>.idx") keeps the start offset
+    of every line as a uint64, so a range of lines is read without loading the rest of the file.
+    New lines stay in memory until flush() appends them to the file and to the index.
+    Empty lines are skipped, the numbering counts only real operations.
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self._lock = threading.RLock()
+        self._offsets = array("Q")  # Start offset of every indexed line
+        self._indexed_end = 0  # The file is indexed up to this offset
+        self._pending = []  # Lines that are not written to the file yet
+        self._missing_newline = False  # The file does not end with a line break
+        self._mmap = None
+        self._mmap_size = 0
+        self._load_index()
+
+    # --- Index ---
+    def _load_index(self):
+        """Loads the index and brings it up to date with the history file."""
+        file_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        try:
+            with open(self.index_path, "rb") as f:
+                indexed_end = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))[0]
+                data = f.read()
+            offsets = array("Q")
+            offsets.frombytes(data[:len(data) - len(data) % offsets.itemsize])
+        except (FileNotFoundError, struct.error):
+            indexed_end, offsets = 0, array("Q")
+
+        if indexed_end > file_size:
+            # The history file was replaced or truncated, the index is useless
+            indexed_end, offsets = 0, array("Q")
+        # Entries appended after the last header update (a crash in between) are indexed again below
+        while offsets and offsets[-1] >= indexed_end:
+            offsets.pop()
+
+        self._offsets = offsets
+        self._indexed_end = indexed_end
+        if indexed_end < file_size or not os.path.exists(self.index_path):
+            self._index_file_tail()
+            self._write_index()
+
+    def _index_file_tail(self):
+        """Adds the lines that were written to the history file without updating the index."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_end)
+            position = self._indexed_end
+            line = b""
+            for line in f:
+                if line.strip():
+                    self._offsets.append(position)
+                position += len(line)
+        self._indexed_end = position
+        self._missing_newline = position > 0 and not line.endswith(b"\n")
+
+    def _write_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_INDEX_HEADER.pack(self._indexed_end))
+            self._offsets.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    # --- Reading ---
+    def _read_indexed(self, start, end):
+        """Returns indexed lines start..end-1. Must be called while holding self._lock."""
+        if start >= end:
+            return []
+        if self._mmap_size < self._indexed_end:
+            # The file has grown since it was mapped
+            if self._mmap is not None:
+                self._mmap.close()
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mmap_size = len(self._mmap)
+
+        lines = []
+        offsets = self._offsets
+        for i in range(start, end):
+            line_end = offsets[i + 1] if i + 1 < len(offsets) else self._indexed_end
+            lines.append(self._mmap[offsets[i]:line_end].decode("utf-8", errors="replace").strip())
+        return lines
+
+    def read_range(self, start, end):
+        """Returns lines start..end-1 (counted from 0), reading only those lines from the file."""
+        with self._lock:
+            indexed_count = len(self._offsets)
+            start = max(start, 0)
+            end = min(end, indexed_count + len(self._pending))
+            lines = self._read_indexed(start, min(end, indexed_count))
+            lines.extend(self._pending[max(start - indexed_count, 0):max(end - indexed_count, 0)])
+            return lines
+
+    def __len__(self):
+        with self._lock:
+            return len(self._offsets) + len(self._pending)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return list(self)[key]
+            start, stop, _ = key.indices(len(self))
+            return self.read_range(start, stop)
+        length = len(self)
+        if key < 0:
+            key += length
+        if not 0 <= key < length:
+            raise IndexError("history index out of range")
+        return self.read_range(key, key + 1)[0]
+
+    def __iter__(self):
+        """Iterates over all lines, reading the file in chunks."""
+        position = 0
+        while True:
+            chunk = self.read_range(position, position + _ITER_CHUNK)
+            if not chunk:
+                return
+            yield from chunk
+            position += len(chunk)
+
+    # --- Writing ---
+    def append(self, line):
+        """Adds a line in memory; it is written to the file by flush()."""
+        with self._lock:
+            self._pending.append(line)
+
+    @property
+    def unflushed_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, count=None):
+        """
+        Appends the first count pending lines (all by default) to the file and to the index.
+        Only one thread may flush at a time; readers and append() are not blocked by the disk work.
+        """
+        with self._lock:
+            lines = self._pending[:count] if count is not None else list(self._pending)
+            position = self._indexed_end
+        if not lines:
+            return
+
+        new_offsets = array("Q")
+        data = []
+        if self._missing_newline:
+            data.append(b"\n")
+            position += 1
+        for line in lines:
+            encoded = (line + "\n").encode("utf-8")
+            new_offsets.append(position)
+            data.append(encoded)
+            position += len(encoded)
+
+        with open(self.path, "ab") as f:
+            f.write(b"".join(data))
+            f.flush()
+            os.fsync(f.fileno())
+        # The offsets go first and the header last: after a crash in between the header still
+        # points before the new entries, so they are simply indexed again on the next start
+        with open(self.index_path, "r+b") as f:
+            f.seek(_INDEX_HEADER.size + len(self._offsets) * self._offsets.itemsize)
+            new_offsets.tofile(f)
+            f.seek(0)
+            f.write(_INDEX_HEADER.pack(position))
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self._lock:
+            self._offsets.extend(new_offsets)
+            self._indexed_end = position
+            self._missing_newline = False
+            del self._pending[:len(lines)]
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+                self._mmap_size = 0
@@ -1,11 +1,18 @@
-from ast import literal_eval
+import os
 import sys
 
+from history_store import HistoryStore
+from warehouse_codec import load_warehouse, save_warehouse
+
 # File names for storing data
 BALANCE_FILE = "company_balance.txt"
 WAREHOUSE_FILE = "warehouse.txt"
 HISTORY_FILE = "history.txt"
 
+# Format of the warehouse file: "jsonl" (readable, survives a damaged line) or "binary" (fastest).
+# Files in the old str(dict) format are detected and converted on startup.
+WAREHOUSE_FORMAT = "jsonl"
+
 # **MODIFIED:** GLOBAL registry for commands
 _GLOBAL_COMMAND_REGISTRY = {}
 
@@ -27,7 +34,7 @@ class Manager:
     def __init__(self, initial_balance=1000000):
         self.company_balance = initial_balance
         self.warehouse = {}
-        self.history = []
+        self.history = None  # HistoryStore, opened in _load_data
 
         self._commands = {}
         # **MODIFIED:** Populate instance commands from the GLOBAL registry
@@ -50,24 +57,21 @@ class Manager:
             print(f"Error reading balance from {BALANCE_FILE}. Default balance used.")
 
         try:
-            with open(WAREHOUSE_FILE, "r") as f:
-                warehouse_data = f.read()
-                if warehouse_data:
-                    self.warehouse = literal_eval(warehouse_data)
+            self.warehouse, warehouse_format, _ = load_warehouse(WAREHOUSE_FILE)
             print(f"Warehouse loaded from {WAREHOUSE_FILE}.")
+            if warehouse_format != WAREHOUSE_FORMAT:
+                save_warehouse(WAREHOUSE_FILE, self.warehouse, WAREHOUSE_FORMAT)
+                print(f"Warehouse file converted from '{warehouse_format}' to '{WAREHOUSE_FORMAT}' format.")
         except FileNotFoundError:
             print(f"Warehouse file ({WAREHOUSE_FILE}) not found. Default warehouse used.")
         except (ValueError, SyntaxError):
             print(f"Error reading warehouse from {WAREHOUSE_FILE}. Default warehouse used.")
 
-        try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                self.history = [line.strip() for line in f]
-            print(f"History loaded from {HISTORY_FILE}. Found {len(self.history)} operations.")
-        except FileNotFoundError:
+        # Only the line offsets are loaded; review reads the requested lines from the file
+        if not os.path.exists(HISTORY_FILE):
             print(f"History file ({HISTORY_FILE}) not found. History is empty.")
-        except UnicodeDecodeError:
-            print(f"Encoding error reading history from {HISTORY_FILE}. History may be incomplete.")
+        self.history = HistoryStore(HISTORY_FILE)
+        print(f"History loaded from {HISTORY_FILE}. Found {len(self.history)} operations.")
 
     def _save_data(self):
         """Saves data to files on program exit."""
@@ -79,16 +83,13 @@ class Manager:
             print(f"Error saving balance to {BALANCE_FILE}: {e}")
 
         try:
-            with open(WAREHOUSE_FILE, "w") as f:
-                f.write(str(self.warehouse))
+            save_warehouse(WAREHOUSE_FILE, self.warehouse, WAREHOUSE_FORMAT)
             print(f"Warehouse saved in {WAREHOUSE_FILE}.")
         except Exception as e:
             print(f"Error saving warehouse to {WAREHOUSE_FILE}: {e}")
 
         try:
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                for item in self.history:
-                    f.write(item + "\n")
+            self.history.flush()  # Appends only the operations of this session
             print(f"History saved in {HISTORY_FILE}.")
         except Exception as e:
             print(f"Error saving history to {HISTORY_FILE}: {e}")
@@ -282,6 +283,7 @@ class Manager:
                 if review_from < 1 or review_to > history_len or review_from > review_to:
                     print("Enter the correct range of operations (starting from 1).")
                 else:
+                    # Only the requested lines are read from the history file
                     for i, message in enumerate(self.history[review_from - 1:review_to]):
                         print(f"Operation {review_from + i}. {message}")
             except ValueError:
@@ -1,7 +1,13 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from contextlib import ExitStack
 import os
-from ast import literal_eval
 import sys
+import threading
+import atexit
+
+from history_store import HistoryStore
+from journal import Journal, write_file_atomically
+from warehouse_codec import load_warehouse, save_warehouse
 
 
 # File names for storing data
@@ -9,6 +15,29 @@ BALANCE_FILE = "company_balance.txt"
 WAREHOUSE_FILE = "warehouse.txt"
 HISTORY_FILE = "history.txt"
 
+# Format of the warehouse snapshot: "jsonl" (readable, survives a damaged line) or "binary" (fastest).
+# Files in the old str(dict) format are detected and converted on startup.
+WAREHOUSE_FORMAT = "jsonl"
+
+# Running stock totals are updated in O(1) by every sale and purchase.
+# In verification mode they are also compared with a full recomputation after every change (slow, for debugging).
+VERIFY_STOCK_TOTALS = False
+
+# The background compactor folds the journal into a snapshot every N seconds
+# or earlier, as soon as the journal has this many records
+COMPACT_INTERVAL = 60
+COMPACT_AFTER_RECORDS = 1000
+
+# Group commit: journal records of concurrent requests are collected for up to COMMIT_WINDOW seconds
+# (or until COMMIT_MAX_BATCH records are waiting) and stored with one write and one fsync.
+# With 0 a batch holds the records that queued up while the previous fsync was running,
+# a few milliseconds help on disks where fsync is very slow.
+COMMIT_WINDOW = 0
+COMMIT_MAX_BATCH = 64
+
+# Largest number of line items accepted by one /api/batch request
+BATCH_MAX_ITEMS = 1000
+
 _GLOBAL_COMMAND_REGISTRY = {}
 
 
@@ -21,16 +50,37 @@ def assign(command_name):
 
 
 class Manager:
-    def __init__(self, initial_balance=1000000):
+    def __init__(self, initial_balance=1000000, compact_interval=COMPACT_INTERVAL,
+                 commit_window=COMMIT_WINDOW, commit_max_batch=COMMIT_MAX_BATCH, verify_totals=VERIFY_STOCK_TOTALS):
         self.company_balance = initial_balance
         self.warehouse = {}  # Dictionary: {'product_name': {'price': N, 'quantity': M}}
-        self.history = []
+        # Running totals over self.warehouse: units in stock, their value and the number of products in stock
+        self.stock_totals = {"units": 0, "value": 0, "skus": 0}
+        self.verify_totals = verify_totals
+        self.history = None  # HistoryStore, opened in _load_data
 
         self._commands = {}
         for cmd_name, cmd_func in _GLOBAL_COMMAND_REGISTRY.items():
             self._commands[cmd_name] = cmd_func.__get__(self, self.__class__)
 
+        # Locks are always taken in this order: product lock -> balance lock -> catalogue lock -> history lock.
+        # Operations on different products only meet on the (short) balance lock and can run in parallel.
+        self._product_locks = {}  # {'product_name': threading.Lock()}
+        self._balance_lock = threading.Lock()  # company_balance, stock_totals and every change of stock quantities
+        self._catalogue_lock = threading.Lock()  # adding products to self.warehouse and self._product_locks
+        self._history_lock = threading.Lock()  # self.history and the order of records in the journal
+        self._compact_lock = threading.Lock()
+        self._compact_requested = threading.Event()
+        self._stop_compactor = threading.Event()
+
         self._load_data()
+        self.journal = Journal(commit_window=commit_window, max_batch=commit_max_batch)
+        self._replay_journal()
+
+        self._compactor = None
+        if compact_interval:
+            self._compactor = threading.Thread(target=self._run_compactor, args=(compact_interval,), daemon=True)
+            self._compactor.start()
 
     def _load_data(self):
         try:
@@ -42,45 +92,182 @@ class Manager:
             pass
 
         try:
-            with open(WAREHOUSE_FILE, "r") as f:
-                warehouse_data = f.read()
-                if warehouse_data:
-                    self.warehouse = literal_eval(warehouse_data)
+            self.warehouse, warehouse_format, meta = load_warehouse(WAREHOUSE_FILE)
+            # Totals saved with the snapshot spare a pass over the whole catalogue
+            self.stock_totals = meta.get("stock_totals") or self._compute_stock_totals()
+            if warehouse_format != WAREHOUSE_FORMAT:
+                # Migrate to the configured format
+                save_warehouse(WAREHOUSE_FILE, self.warehouse, WAREHOUSE_FORMAT, {"stock_totals": self.stock_totals})
         except FileNotFoundError:
             pass
         except (ValueError, SyntaxError):
             pass
+        if self.verify_totals:
+            self._check_stock_totals()
 
-        try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                self.history = [line.strip() for line in f if line.strip()]  # Skipping empty lines
-        except FileNotFoundError:
-            pass
-        except UnicodeDecodeError:
-            pass
-        except Exception as e:
-            pass
+        # The history is not loaded into memory: lines are read from the file through its offset index
+        self.history = HistoryStore(HISTORY_FILE)
 
-    def _save_data(self):
-        """Saves data to files."""
-        try:
-            with open(BALANCE_FILE, "w") as f:
-                f.write(str(self.company_balance))
-        except Exception as e:
-            pass
-
-        try:
-            with open(WAREHOUSE_FILE, "w") as f:
-                f.write(str(self.warehouse))
-        except Exception as e:
-            pass
-
-        try:
-            with open(HISTORY_FILE, "w") as f:
-                for item in self.history:
-                    f.write(item + "\n")
-        except Exception as e:
-            pass
+    def _save_data(self, balance, warehouse, stock_totals, new_history_count):
+        """
+        Writes a snapshot: balance and warehouse (with its running totals) are replaced atomically,
+        the first new_history_count new history lines are appended to the history file.
+        History goes last, so its length tells which journal records the snapshot covers.
+        """
+        write_file_atomically(BALANCE_FILE, str(balance))
+        save_warehouse(WAREHOUSE_FILE, warehouse, WAREHOUSE_FORMAT, {"stock_totals": stock_totals})
+        self.history.flush(new_history_count)
+
+    def _replay_journal(self):
+        """Applies the journal tail on top of the loaded snapshot and folds it into a new snapshot."""
+        replayed = 0
+        for record in self.journal.read_records():
+            # Records whose history line is already in the snapshot are covered by it
+            if record["n"] <= len(self.history):
+                continue
+            if "balance" in record:
+                self.company_balance = record["balance"]
+            if "product" in record:
+                self._update_stock_totals(self.warehouse.get(record["product"]), record["item"])
+                self.warehouse[record["product"]] = record["item"]
+            # Batch records carry several products and history lines
+            for product_name, item in record.get("items", {}).items():
+                self._update_stock_totals(self.warehouse.get(product_name), item)
+                self.warehouse[product_name] = item
+            for history_line in record.get("lines", [record.get("history")]):
+                self.history.append(history_line)
+            replayed += 1
+
+        if replayed or self.journal.has_rotated_part:
+            self._save_data(self.company_balance, self.warehouse, self.stock_totals, self.history.unflushed_count)
+        self.journal.reset()
+
+    def _compute_stock_totals(self):
+        """Full recomputation of the running totals, O(number of products)."""
+        totals = {"units": 0, "value": 0, "skus": 0}
+        for info in self.warehouse.values():
+            totals["units"] += info["quantity"]
+            totals["value"] += info["quantity"] * info["price"]
+            if info["quantity"] > 0:
+                totals["skus"] += 1
+        return totals
+
+    def _update_stock_totals(self, old_item, new_item):
+        """
+        Moves the running totals from the old state of a product to the new one (None for a new product), O(1).
+        Must be called while holding the balance lock.
+        """
+        for item, sign in ((old_item, -1), (new_item, 1)):
+            if item:
+                self.stock_totals["units"] += sign * item["quantity"]
+                self.stock_totals["value"] += sign * item["quantity"] * item["price"]
+                if item["quantity"] > 0:
+                    self.stock_totals["skus"] += sign
+        if self.verify_totals:
+            self._check_stock_totals()
+
+    def _check_stock_totals(self):
+        """
+        Compares the running totals with a full recomputation and repairs them on a mismatch.
+        Returns True if they matched. Must be called while holding the balance lock (or before serving).
+        """
+        expected = self._compute_stock_totals()
+        if self.stock_totals == expected:
+            return True
+        print(f"Warning: running stock totals {self.stock_totals} differ from recomputed {expected}. Repaired.")
+        self.stock_totals = expected
+        return False
+
+    def verify_stock_totals(self):
+        """Checks the running totals against a full recomputation (see VERIFY_STOCK_TOTALS)."""
+        with self._balance_lock, self._catalogue_lock:
+            return self._check_stock_totals()
+
+    def _get_product_lock(self, product_name):
+        with self._catalogue_lock:
+            lock = self._product_locks.get(product_name)
+            if lock is None:
+                lock = self._product_locks[product_name] = threading.Lock()
+            return lock
+
+    def _record_operation(self, history_line, balance_changed=False, product_name=None):
+        """
+        Adds a history line and writes the resulting state to the journal.
+        Records hold absolute values (not deltas), so replaying one twice is harmless.
+        Must be called while holding the balance lock if the balance or a stock quantity changed,
+        so that records reach the journal in the same order as the changes.
+        Returns the journal sequence number of the record; the caller passes it to self.journal.sync()
+        after releasing its locks and before confirming the operation.
+        """
+        record = {"history": history_line}
+        if balance_changed:
+            record["balance"] = self.company_balance
+        if product_name is not None:
+            record["product"] = product_name
+            record["item"] = dict(self.warehouse[product_name])
+        with self._history_lock:
+            self.history.append(history_line)
+            record["n"] = len(self.history)
+            seq = self.journal.write(record)
+
+        if self.journal.records_since_rotation >= COMPACT_AFTER_RECORDS:
+            self._compact_requested.set()
+        return seq
+
+    def _record_batch(self, history_lines, product_names):
+        """
+        Like _record_operation for a batch: all its history lines, the balance and every touched product
+        go to the journal as one record, so after a crash a batch is replayed completely or not at all.
+        Must be called while holding the balance lock. Returns the journal sequence number.
+        """
+        record = {"lines": history_lines, "balance": self.company_balance,
+                  "items": {product_name: dict(self.warehouse[product_name]) for product_name in product_names}}
+        with self._history_lock:
+            for history_line in history_lines:
+                self.history.append(history_line)
+            record["n"] = len(self.history)
+            seq = self.journal.write(record)
+
+        if self.journal.records_since_rotation >= COMPACT_AFTER_RECORDS:
+            self._compact_requested.set()
+        return seq
+
+    def compact(self):
+        """Writes a snapshot of the current state and drops the journal records it covers."""
+        with self._compact_lock:
+            # Every change of state happens under the balance lock, so holding it gives a consistent cut
+            with self._balance_lock, self._catalogue_lock, self._history_lock:
+                # A rotated part left by a failed snapshot is retried even without new records
+                if self.journal.records_since_rotation == 0 and not self.journal.has_rotated_part:
+                    return
+                self.journal.rotate()
+                balance = self.company_balance
+                warehouse = {name: dict(info) for name, info in self.warehouse.items()}
+                stock_totals = dict(self.stock_totals)
+                new_history_count = self.history.unflushed_count
+
+            # The slow part runs without blocking operations; they go to the new journal file
+            self._save_data(balance, warehouse, stock_totals, new_history_count)
+            self.journal.discard_rotated()
+
+    def _run_compactor(self, interval):
+        while not self._stop_compactor.is_set():
+            self._compact_requested.wait(interval)
+            self._compact_requested.clear()
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting the journal: {e}")
+
+    def close(self):
+        """Stops the compactor, writes a final snapshot and closes the journal."""
+        self._stop_compactor.set()
+        self._compact_requested.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        self.compact()
+        self.journal.close()
+        self.history.close()
 
     # --- Command Methods ---
     def add_or_subtract_balance(self, operation, amount):
@@ -91,51 +278,65 @@ class Manager:
             return "The amount cannot be negative.", False
 
         if operation == "add":
-            self.company_balance += amount
-            self.history.append(f"Adding funds ({amount}) to the account. Balance: {self.company_balance} PLN")
-            self._save_data()
-            return f"Balance successfully replenished. Current balance: {self.company_balance} PLN.", True
+            with self._balance_lock:
+                self.company_balance += amount
+                seq = self._record_operation(
+                    f"Adding funds ({amount}) to the account. Balance: {self.company_balance} PLN",
+                    balance_changed=True)
+                result = f"Balance successfully replenished. Current balance: {self.company_balance} PLN.", True
         elif operation == "sub":
-            if self.company_balance < amount:
-                self.history.append(
-                    f"Attempt to withdraw ({amount}) PLN, insufficient funds. Balance: {self.company_balance} PLN")
-                self._save_data()
-                return f"Insufficient funds. Available: {self.company_balance} PLN, requested: {amount} PLN.", False
-            else:
-                self.company_balance -= amount
-                self.history.append(f"Withdrawal of funds ({amount}) from the account. Balance: {self.company_balance} PLN")
-                self._save_data()
-                return f"Funds successfully withdrawn. Current balance: {self.company_balance} PLN.", True
+            with self._balance_lock:
+                if self.company_balance < amount:
+                    seq = self._record_operation(
+                        f"Attempt to withdraw ({amount}) PLN, insufficient funds. Balance: {self.company_balance} PLN")
+                    result = f"Insufficient funds. Available: {self.company_balance} PLN, requested: {amount} PLN.", False
+                else:
+                    self.company_balance -= amount
+                    seq = self._record_operation(
+                        f"Withdrawal of funds ({amount}) from the account. Balance: {self.company_balance} PLN",
+                        balance_changed=True)
+                    result = f"Funds successfully withdrawn. Current balance: {self.company_balance} PLN.", True
         else:
             return "Invalid operation (must be 'add' or 'sub').", False
 
+        self.journal.sync(seq)  # Confirm only what is already on disk (together with a whole batch)
+        return result
+
     def sell_product(self, product_name, quantity):
         """Handles selling a product."""
         product_name = product_name.lower()
         quantity = int(quantity)  # We assume that the number has already been validated
 
+        # Products are never removed, so a product that exists now will still exist under its lock
         if product_name not in self.warehouse:
             return f"Product '{product_name}' not found in stock.", False
 
-        product_info = self.warehouse[product_name]
-        product_price = product_info["price"]
-        available_quantity = product_info["quantity"]
-
         if quantity <= 0:
             return "The quantity to sell must be greater than zero.", False
-        elif quantity > available_quantity:
-            self.history.append(
-                f"Attempting to sell ({product_name}) in ({quantity}) but not enough in stock ({available_quantity}).")
-            self._save_data()
-            return f"Not enough product in stock. Available: {available_quantity}, requested: {quantity}.", False
-        else:
-            self.warehouse[product_name]["quantity"] -= quantity
-            sale_amount = product_price * quantity
-            self.company_balance += sale_amount
-            self.history.append(
-                f"Sale: {quantity} units ({product_name}) for {sale_amount} PLN. Balance: {self.company_balance} PLN. In stock: {self.warehouse[product_name]['quantity']} units.")
-            self._save_data()
-            return f"Successfully sold {quantity} units of {product_name}. Profit: {sale_amount} PLN. Current balance: {self.company_balance} PLN.", True
+
+        with self._get_product_lock(product_name):
+            product_info = self.warehouse[product_name]
+            product_price = product_info["price"]
+            available_quantity = product_info["quantity"]
+
+            if quantity > available_quantity:
+                seq = self._record_operation(
+                    f"Attempting to sell ({product_name}) in ({quantity}) but not enough in stock ({available_quantity}).")
+                result = f"Not enough product in stock. Available: {available_quantity}, requested: {quantity}.", False
+            else:
+                sale_amount = product_price * quantity
+                with self._balance_lock:
+                    old_item = dict(product_info)
+                    self.warehouse[product_name]["quantity"] -= quantity
+                    self._update_stock_totals(old_item, product_info)
+                    self.company_balance += sale_amount
+                    seq = self._record_operation(
+                        f"Sale: {quantity} units ({product_name}) for {sale_amount} PLN. Balance: {self.company_balance} PLN. In stock: {self.warehouse[product_name]['quantity']} units.",
+                        balance_changed=True, product_name=product_name)
+                    result = f"Successfully sold {quantity} units of {product_name}. Profit: {sale_amount} PLN. Current balance: {self.company_balance} PLN.", True
+
+        self.journal.sync(seq)
+        return result
 
     def purchase_product(self, product_name, quantity, price):
         """Handles purchasing a product."""
@@ -150,21 +351,143 @@ class Manager:
 
         total_cost = quantity * price
 
-        if self.company_balance < total_cost:
-            self.history.append(
-                f"Attempted to buy ({product_name}) for ({total_cost}) PLN, insufficient funds. Balance: {self.company_balance} PLN.")
-            self._save_data()
-            return f"Insufficient funds to purchase. Required: {total_cost} PLN, available: {self.company_balance} PLN.", False
-        else:
-            if product_name in self.warehouse:
-                self.warehouse[product_name]["quantity"] += quantity
-            else:
-                self.warehouse[product_name] = {"price": price, "quantity": quantity}
-            self.company_balance -= total_cost
-            self.history.append(
-                f"Purchase: {quantity} units ({product_name}) for {total_cost} PLN. Balance: {self.company_balance} PLN. In stock: {self.warehouse[product_name]['quantity']} units.")
-            self._save_data()
-            return f"Successfully purchased {quantity} units of {product_name}. Cost: {total_cost} PLN. Current balance: {self.company_balance} PLN.", True
+        with self._get_product_lock(product_name):
+            with self._balance_lock:
+                if self.company_balance < total_cost:
+                    seq = self._record_operation(
+                        f"Attempted to buy ({product_name}) for ({total_cost}) PLN, insufficient funds. Balance: {self.company_balance} PLN.")
+                    result = f"Insufficient funds to purchase. Required: {total_cost} PLN, available: {self.company_balance} PLN.", False
+                else:
+                    old_item = None
+                    if product_name in self.warehouse:
+                        old_item = dict(self.warehouse[product_name])
+                        self.warehouse[product_name]["quantity"] += quantity
+                    else:
+                        with self._catalogue_lock:
+                            self.warehouse[product_name] = {"price": price, "quantity": quantity}
+                    self._update_stock_totals(old_item, self.warehouse[product_name])
+                    self.company_balance -= total_cost
+                    seq = self._record_operation(
+                        f"Purchase: {quantity} units ({product_name}) for {total_cost} PLN. Balance: {self.company_balance} PLN. In stock: {self.warehouse[product_name]['quantity']} units.",
+                        balance_changed=True, product_name=product_name)
+                    result = f"Successfully purchased {quantity} units of {product_name}. Cost: {total_cost} PLN. Current balance: {self.company_balance} PLN.", True
+
+        self.journal.sync(seq)
+        return result
+
+    @staticmethod
+    def _validate_batch_item(item):
+        """Returns (operation, product_name, quantity, price) of one line item or raises ValueError."""
+        if not isinstance(item, dict):
+            raise ValueError("A line item must be an object.")
+        operation = item.get("operation")
+        if operation not in ("purchase", "sale"):
+            raise ValueError("Invalid operation (must be 'purchase' or 'sale').")
+        product_name = item.get("product_name")
+        if not isinstance(product_name, str) or not product_name.strip():
+            raise ValueError("The product name must be a non-empty string.")
+        quantity = item.get("quantity")
+        # bool is a subclass of int, but true/false is not a quantity
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+            raise ValueError("The quantity must be a whole number greater than zero.")
+        price = None
+        if operation == "purchase":
+            price = item.get("price")
+            if not isinstance(price, int) or isinstance(price, bool) or price <= 0:
+                raise ValueError("The price must be a whole number greater than zero.")
+        return operation, product_name.strip().lower(), quantity, price
+
+    def apply_batch(self, items, all_or_nothing=False):
+        """
+        Applies many purchases and sales at once.
+        Lines are checked in order against the state left by the previous lines; with all_or_nothing
+        a single failed line rejects the whole batch. The accepted lines are applied under one set of locks,
+        recorded in the journal as one record and confirmed with one sync.
+        Returns {"success", "applied", "balance", "results"} with one result per line.
+        """
+        results = []
+        parsed = []
+        for line, item in enumerate(items):
+            try:
+                parsed.append(self._validate_batch_item(item))
+                results.append({"line": line, "success": True, "message": ""})
+            except ValueError as e:
+                parsed.append(None)
+                results.append({"line": line, "success": False, "message": str(e)})
+
+        # A lock is created for every name it is asked for and never removed, so only products that exist
+        # (they are never removed either) and purchase targets are locked; a sale of an unknown product fails
+        # without a lock, which keeps a client from growing the lock table with made-up names
+        product_names = sorted({entry[1] for entry in parsed
+                                if entry is not None and (entry[0] == "purchase" or entry[1] in self.warehouse)})
+        seq = None
+        with ExitStack() as stack:
+            # Sorted order, so two batches with common products cannot deadlock
+            for product_name in product_names:
+                stack.enter_context(self._get_product_lock(product_name))
+            stack.enter_context(self._balance_lock)
+
+            # Work on copies; the real state is only changed once the whole batch is checked
+            balance = self.company_balance
+            items_after = {name: dict(self.warehouse[name]) for name in product_names if name in self.warehouse}
+            history_lines = []
+            for entry, result in zip(parsed, results):
+                if entry is None:
+                    continue
+                operation, product_name, quantity, price = entry
+                item = items_after.get(product_name)
+                if operation == "sale":
+                    if item is None:
+                        result.update(success=False, message=f"Product '{product_name}' not found in stock.")
+                        continue
+                    if item["quantity"] < quantity:
+                        result.update(success=False,
+                                      message=f"Not enough product in stock. Available: {item['quantity']}, requested: {quantity}.")
+                        continue
+                    sale_amount = item["price"] * quantity
+                    item["quantity"] -= quantity
+                    balance += sale_amount
+                    history_lines.append(
+                        f"Sale: {quantity} units ({product_name}) for {sale_amount} PLN. Balance: {balance} PLN. In stock: {item['quantity']} units.")
+                    result["message"] = f"Sold {quantity} units of {product_name}. Profit: {sale_amount} PLN."
+                else:
+                    total_cost = quantity * price
+                    if balance < total_cost:
+                        result.update(success=False,
+                                      message=f"Insufficient funds to purchase. Required: {total_cost} PLN, available: {balance} PLN.")
+                        continue
+                    if item is None:
+                        item = items_after[product_name] = {"price": price, "quantity": 0}
+                    item["quantity"] += quantity
+                    balance -= total_cost
+                    history_lines.append(
+                        f"Purchase: {quantity} units ({product_name}) for {total_cost} PLN. Balance: {balance} PLN. In stock: {item['quantity']} units.")
+                    result["message"] = f"Purchased {quantity} units of {product_name}. Cost: {total_cost} PLN."
+
+            failed = sum(not result["success"] for result in results)
+            if all_or_nothing and failed:
+                for result in results:
+                    if result["success"]:
+                        result.update(success=False, message="Not applied: other lines of the batch failed.")
+            elif history_lines:
+                changed = [name for name, item in items_after.items() if self.warehouse.get(name) != item]
+                new_products = [name for name in changed if name not in self.warehouse]
+                if new_products:
+                    with self._catalogue_lock:
+                        for product_name in new_products:
+                            self.warehouse[product_name] = dict(items_after[product_name])
+                for product_name in changed:
+                    old_item = None if product_name in new_products else dict(self.warehouse[product_name])
+                    self.warehouse[product_name].update(items_after[product_name])
+                    self._update_stock_totals(old_item, self.warehouse[product_name])
+                self.company_balance = balance
+                seq = self._record_batch(history_lines, changed)
+            current_balance = self.company_balance
+
+        if seq is not None:
+            self.journal.sync(seq)
+        applied = sum(result["success"] for result in results)
+        return {"success": failed == 0, "applied": applied, "balance": current_balance, "results": results}
 
     def get_history_range(self, line_from=None, line_to=None):
         """
@@ -173,23 +496,25 @@ class Manager:
         """
 
         if line_from is None and line_to is None:
-            # If the entire history is requested, the starting index is 0
+            # If the entire history is requested, the starting index is 0.
+            # The store is iterated in chunks while the template is rendered, nothing is loaded up front.
             return self.history, 0  # Return the entire history and the starting index 0 (for the 1st entry)
 
         try:
+            history_len = len(self.history)
             start_index = int(line_from) - 1 if line_from is not None else 0
-            end_index = int(line_to) if line_to is not None else len(self.history)
+            end_index = int(line_to) if line_to is not None else history_len
 
-            if start_index < 0 or (start_index >= len(self.history) and len(self.history) > 0):
+            if start_index < 0 or (start_index >= history_len and history_len > 0):
                 return [], 0  # Invalid starting index
 
-            if end_index > len(self.history):
-                end_index = len(self.history)
+            if end_index > history_len:
+                end_index = history_len
 
             if start_index >= end_index:
                 return [], 0  # Empty list if range is invalid
 
-            # Return the history slice and the actual starting index of the slice
+            # Only the requested lines are read from the file
             return self.history[start_index:end_index], start_index
         except ValueError:
             return [], 0  # Return an empty list and 0 if the parameters are not numeric
@@ -202,14 +527,17 @@ class Manager:
         return self.company_balance
 
     def get_current_stock_level(self):
-        """Calculates total stock level. Can be sum of quantities or number of unique products."""
-        total_items = sum(item['quantity'] for item in self.warehouse.values())
-        # Or if you want number of unique products:
-        # total_unique_products = len(self.warehouse)
-        return total_items  # Return the total quantity of all goods in the warehouse
+        """Returns the total quantity of all goods in the warehouse (a running total, no pass over the products)."""
+        return self.stock_totals["units"]
+
+    def get_stock_totals(self):
+        """Returns the running totals: units in stock, their value and the number of products in stock."""
+        return dict(self.stock_totals)
 
     def get_warehouse_items(self):
-        return self.warehouse
+        """Returns a copy, so templates can iterate it while other requests add products."""
+        with self._catalogue_lock:
+            return {name: dict(info) for name, info in self.warehouse.items()}
 
 
 # --- END OF MANAGER CLASS CODE ---
@@ -219,6 +547,7 @@ app = Flask(__name__)
 app.secret_key = 'your_super_secret_key'  # For flash messages. I'll have to remember to change it to something unique.
 
 manager = Manager()
+atexit.register(manager.close)  # Final snapshot on shutdown; the journal already keeps every operation safe
 
 # DECORATORS
 @app.route("/")
@@ -265,6 +594,31 @@ def purchase():
                            stock_level=current_stock_level)
 
 
+@app.route("/api/batch", methods=['POST'])
+def batch():
+    """
+    JSON endpoint for many purchases and sales in one request:
+    {"all_or_nothing": false, "items": [{"operation": "purchase", "product_name": "...", "quantity": 1, "price": 1},
+                                        {"operation": "sale", "product_name": "...", "quantity": 1}]}
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("items"), list) or not data["items"]:
+        return jsonify({"error": "The body must be a JSON object with a non-empty 'items' list."}), 400
+    if len(data["items"]) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"A batch may have at most {BATCH_MAX_ITEMS} items."}), 400
+    all_or_nothing = data.get("all_or_nothing", False)
+    if not isinstance(all_or_nothing, bool):
+        return jsonify({"error": "'all_or_nothing' must be true or false."}), 400
+
+    try:
+        result = manager.apply_batch(data["items"], all_or_nothing=all_or_nothing)
+    except Exception as e:
+        return jsonify({"error": f"An unexpected error occurred: {e}"}), 500
+    # 422 when an all-or-nothing batch was rejected, otherwise the per-line results say what was applied
+    status = 422 if all_or_nothing and not result["success"] else 200
+    return jsonify(result), status
+
+
 @app.route("/sale", methods=['GET', 'POST'])
 def sale():
     current_balance = manager.get_current_balance()
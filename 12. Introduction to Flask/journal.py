@@ -0,0 +1,184 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+# File name of the append-only operation journal
+JOURNAL_FILE = "journal.log"
+
+
+def write_file_atomically(path, text):
+    """
+    Writes text to a temporary file, fsyncs it and renames it over path,
+    so a crash leaves either the old or the new file, never a half-written one.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Journal:
+    """
+    Append-only write-ahead journal with group commit.
+    Every operation is stored as one JSON line. Records written by concurrent requests are collected
+    for up to commit_window seconds (or until max_batch records are waiting) and then stored
+    with a single write and a single fsync, so the cost of a write does not depend on how long
+    the history is and the disk is not asked for an fsync per request.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, commit_window=0, max_batch=64):
+        self.path = path
+        self.rotated_path = path + ".old"  # Journal part that is being folded into a snapshot
+        self.commit_window = commit_window
+        self.max_batch = max_batch
+        self.records_since_rotation = 0
+        self._lock = threading.Lock()
+        self._batch_changed = threading.Condition(self._lock)
+        self._pending = []  # Encoded records that are not written to the file yet
+        self._written_seq = 0  # Sequence number of the last record handed to write()
+        self._durable_seq = 0  # Sequence number of the last record known to be on disk
+        self._flushing = False  # True while one of the waiting threads writes a batch
+        self._file = open(self.path, "ab")
+
+    def write(self, record):
+        """
+        Queues one record without waiting for the disk and returns its sequence number.
+        Records reach the file in the order write() is called; call sync() before confirming the operation.
+        """
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._pending.append(line)
+            self._written_seq += 1
+            self.records_since_rotation += 1
+            if len(self._pending) >= self.max_batch:
+                self._batch_changed.notify_all()  # Wake the thread that is collecting the batch
+            return self._written_seq
+
+    def sync(self, seq=None):
+        """
+        Waits until the record with sequence number seq (by default every record queued so far) is on disk.
+        The first waiting thread collects a batch and writes it for everyone; the others just wait.
+        """
+        with self._lock:
+            if seq is None:
+                seq = self._written_seq
+            while self._durable_seq < seq:
+                if self._flushing:
+                    self._batch_changed.wait()
+                    continue
+
+                self._flushing = True
+                try:
+                    deadline = time.monotonic() + self.commit_window
+                    while len(self._pending) < self.max_batch:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._batch_changed.wait(remaining)
+
+                    batch, self._pending = self._pending, []
+                    batch_seq = self._written_seq
+                    # The disk work runs without the lock, so new records can queue up for the next batch
+                    self._lock.release()
+                    try:
+                        self._write_batch(batch)
+                    except Exception:
+                        self._lock.acquire()
+                        self._pending = batch + self._pending  # Let the next attempt retry these records
+                        raise
+                    self._lock.acquire()
+                    self._durable_seq = batch_seq
+                finally:
+                    self._flushing = False
+                    self._batch_changed.notify_all()
+
+    def append(self, record):
+        """Appends one record and waits until it is on disk."""
+        self.sync(self.write(record))
+
+    def _write_batch(self, batch):
+        if batch:
+            self._file.write(b"".join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _flush_pending(self):
+        """Writes every queued record. Must be called while holding self._lock."""
+        while self._flushing:
+            self._batch_changed.wait()
+        self._write_batch(self._pending)
+        self._pending = []
+        self._durable_seq = self._written_seq
+        self._batch_changed.notify_all()
+
+    def read_records(self):
+        """Yields all records, oldest first: the rotated part and then the current one."""
+        for path in (self.rotated_path, self.path):
+            try:
+                with open(path, "rb") as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            # A torn last line after a crash; the operation was never confirmed
+                            continue
+            except FileNotFoundError:
+                continue
+
+    @property
+    def has_rotated_part(self):
+        """True while a rotated part waits for its snapshot, e.g. after a failed one."""
+        return os.path.exists(self.rotated_path)
+
+    def rotate(self):
+        """
+        Moves the current journal aside and starts a new, empty one.
+        If the previous rotated part is still there (its snapshot failed), the current records are appended to it,
+        so the next snapshot covers both and discard_rotated() removes them together.
+        """
+        with self._lock:
+            # Queued records belong to the old file, together with the state they describe
+            self._flush_pending()
+            self._file.close()
+            if os.path.exists(self.rotated_path):
+                # A crash during the copy leaves records in both files; replay skips the second copy
+                with open(self.path, "rb") as current, open(self.rotated_path, "a+b") as rotated:
+                    if rotated.tell():
+                        rotated.seek(-1, os.SEEK_END)
+                        if rotated.read(1) != b"\n":
+                            rotated.write(b"\n")  # Keep a torn last line from swallowing the first copied record
+                    shutil.copyfileobj(current, rotated)
+                    rotated.flush()
+                    os.fsync(rotated.fileno())
+                self._file = open(self.path, "wb")
+                os.fsync(self._file.fileno())
+            else:
+                os.replace(self.path, self.rotated_path)
+                self._file = open(self.path, "ab")
+            self.records_since_rotation = 0
+
+    def discard_rotated(self):
+        """Removes the rotated part once its records are covered by a snapshot."""
+        try:
+            os.remove(self.rotated_path)
+        except FileNotFoundError:
+            pass
+
+    def reset(self):
+        """Empties the whole journal (used when a full snapshot has just been written)."""
+        with self._lock:
+            self._flush_pending()
+            self._file.close()
+            self.discard_rotated()
+            self._file = open(self.path, "wb")
+            os.fsync(self._file.fileno())
+            self.records_since_rotation = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_pending()
+            self._file.close()
@@ -0,0 +1,125 @@
+"""
+Stress benchmark for the thread-safe Manager.
+
+Many threads run random sales, purchases and balance changes against one Manager,
+then the script checks that no update was lost:
+- the balance equals the initial balance plus all confirmed incomes minus all confirmed expenses;
+- every product quantity equals its initial quantity plus purchases minus sales and is never negative;
+- every operation left exactly one history line;
+- the running stock totals match a full recomputation;
+- a Manager loaded again from disk (snapshot + journal) sees exactly the same state.
+
+Usage: python stress_benchmark.py [threads] [operations_per_thread] [commit_window_seconds]
+Run it with commit window 0 and with a few milliseconds to compare group commit against
+one fsync per request.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# The data files are relative to the working directory, so the benchmark works in its own directory
+# (importing app also creates the module-level manager there)
+WORK_DIR = tempfile.mkdtemp(prefix="manager_stress_")
+os.chdir(WORK_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+
+INITIAL_BALANCE = 1000000
+PRODUCTS = {f"product {i}": {"price": random.randint(1, 50), "quantity": 1000} for i in range(20)}
+
+
+def worker(manager, operations, stats, stats_lock):
+    balance_delta = 0
+    quantity_delta = {}
+    for _ in range(operations):
+        product_name = random.choice(list(PRODUCTS))
+        action = random.random()
+        if action < 0.45:
+            quantity = random.randint(1, 20)
+            price = manager.warehouse[product_name]["price"]
+            _, success = manager.sell_product(product_name, quantity)
+            if success:
+                balance_delta += price * quantity
+                quantity_delta[product_name] = quantity_delta.get(product_name, 0) - quantity
+        elif action < 0.9:
+            quantity = random.randint(1, 20)
+            price = random.randint(1, 50)
+            _, success = manager.purchase_product(product_name, quantity, price)
+            if success:
+                balance_delta -= price * quantity
+                quantity_delta[product_name] = quantity_delta.get(product_name, 0) + quantity
+        else:
+            operation = random.choice(["add", "sub"])
+            amount = random.randint(1, 5000)
+            _, success = manager.add_or_subtract_balance(operation, amount)
+            if success:
+                balance_delta += amount if operation == "add" else -amount
+
+    with stats_lock:
+        stats["balance"] += balance_delta
+        for product_name, delta in quantity_delta.items():
+            stats["quantities"][product_name] += delta
+
+
+def main():
+    threads_count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    commit_window = float(sys.argv[3]) if len(sys.argv) > 3 else app.COMMIT_WINDOW
+
+    app.write_file_atomically(app.BALANCE_FILE, str(INITIAL_BALANCE))
+    app.save_warehouse(app.WAREHOUSE_FILE, PRODUCTS, app.WAREHOUSE_FORMAT)
+    # A busy compactor runs alongside the operations
+    manager = app.Manager(compact_interval=0.2, commit_window=commit_window)
+
+    stats = {"balance": 0, "quantities": {name: 0 for name in PRODUCTS}}
+    stats_lock = threading.Lock()
+    threads = [threading.Thread(target=worker, args=(manager, operations, stats, stats_lock))
+               for _ in range(threads_count)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total_operations = threads_count * operations
+    print(f"{total_operations} operations in {threads_count} threads (commit window {commit_window * 1000:g} ms) "
+          f"took {elapsed:.2f} s ({total_operations / elapsed:.0f} operations/s)")
+
+    errors = []
+    if manager.company_balance != INITIAL_BALANCE + stats["balance"]:
+        errors.append(f"balance {manager.company_balance} != expected {INITIAL_BALANCE + stats['balance']}")
+    for product_name, info in PRODUCTS.items():
+        expected = info["quantity"] + stats["quantities"][product_name]
+        actual = manager.warehouse[product_name]["quantity"]
+        if actual != expected or actual < 0:
+            errors.append(f"{product_name}: quantity {actual} != expected {expected}")
+    if len(manager.history) != total_operations:
+        errors.append(f"{len(manager.history)} history lines for {total_operations} operations")
+    if not manager.verify_stock_totals():
+        errors.append("running stock totals differ from a full recomputation")
+
+    manager.close()
+    reloaded = app.Manager(compact_interval=0)
+    if (reloaded.company_balance, reloaded.warehouse, reloaded.history[:]) != \
+            (manager.company_balance, manager.warehouse, manager.history[:]):
+        errors.append("state loaded from disk differs from the state in memory")
+    if reloaded.get_stock_totals() != manager.get_stock_totals() or not reloaded.verify_stock_totals():
+        errors.append("stock totals loaded from disk are wrong")
+    reloaded.close()
+
+    if errors:
+        print("Invariants violated:")
+        for error in errors:
+            print(f"- {error}")
+        sys.exit(1)
+    print(f"All invariants hold (data in {WORK_DIR}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Snapshot codecs for the warehouse file.
+
+Every file starts with a versioned header, so the format is detected automatically.
+A snapshot may also carry a small "meta" dict (for example running stock totals) next to the products:
+- "jsonl"  - text, one product per line; a damaged line only loses that product;
+- "binary" - struct-packed records plus one string table with all product names, fastest to load;
+- legacy   - the old str(dict) format read with literal_eval; it is only read, never written.
+
+Run this file directly for a load/save benchmark across catalogue sizes.
+"""
+import json
+import os
+import struct
+import zlib
+from ast import literal_eval
+
+JSONL_HEADER = "#warehouse-jsonl 1\n"
+JSONL_META_PREFIX = "#meta "
+BINARY_MAGIC = b"WHSB"
+BINARY_VERSION = 2  # Version 2 adds the optional meta block; version 1 files are still read
+
+# magic, version, number of products, size of the string table
+_BINARY_HEADER = struct.Struct("<4sHII")
+# offset and length of the name in the string table, price, quantity
+_BINARY_RECORD = struct.Struct("<IHqq")
+_BINARY_CRC = struct.Struct("<I")
+
+_CODECS = {}
+
+
+def codec(format_name):
+    """
+    Decorator for registering a codec class under a format name.
+    A codec has encode(warehouse, meta) -> bytes, decode(data) -> (warehouse, meta) and detect(data) -> bool.
+    """
+
+    def decorator(cls):
+        _CODECS[format_name] = cls
+        return cls
+
+    return decorator
+
+
+@codec("jsonl")
+class JsonLinesCodec:
+    @staticmethod
+    def detect(data):
+        return data.startswith(JSONL_HEADER.encode("utf-8"))
+
+    @staticmethod
+    def encode(warehouse, meta=None):
+        # One encoder for all lines: json.dumps with options builds a new encoder on every call
+        encode_row = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        lines = [JSONL_HEADER]
+        if meta:
+            lines.append(JSONL_META_PREFIX + encode_row(meta) + "\n")
+        for name, info in warehouse.items():
+            lines.append(encode_row([name, info["price"], info["quantity"]]) + "\n")
+        return "".join(lines).encode("utf-8")
+
+    @staticmethod
+    def decode(data):
+        # Records end with "\n" only: splitlines() would also split names at U+2028, \x1c and the like,
+        # which encode() writes unescaped (ensure_ascii=False)
+        lines = [line for line in data.decode("utf-8").split("\n")[1:] if line.strip()]
+        meta = {}
+        if lines and lines[0].startswith(JSONL_META_PREFIX):
+            try:
+                meta = json.loads(lines[0][len(JSONL_META_PREFIX):])
+            except ValueError:
+                pass  # Meta can always be recomputed from the products
+            lines = lines[1:]
+        try:
+            # Fast path: the whole file parsed by one json.loads call
+            rows = json.loads("[" + ",".join(lines) + "]") if lines else []
+        except ValueError:
+            # Slow path for a damaged file: keep every line that is still readable
+            rows = []
+            for line in lines:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue
+        warehouse = {}
+        for row in rows:
+            if isinstance(row, list) and len(row) == 3:
+                name, price, quantity = row
+                warehouse[name] = {"price": price, "quantity": quantity}
+        return warehouse, meta
+
+
+@codec("binary")
+class BinaryCodec:
+    @staticmethod
+    def detect(data):
+        return data.startswith(BINARY_MAGIC)
+
+    @staticmethod
+    def encode(warehouse, meta=None):
+        names = []
+        records = []
+        offset = 0
+        for name, info in warehouse.items():
+            encoded_name = name.encode("utf-8")
+            names.append(encoded_name)
+            records.append(_BINARY_RECORD.pack(offset, len(encoded_name), info["price"], info["quantity"]))
+            offset += len(encoded_name)
+        string_table = b"".join(names)
+        # The meta block (JSON) sits between the records and the checksum
+        meta_block = json.dumps(meta).encode("utf-8") if meta else b""
+        body = (_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(records), len(string_table))
+                + string_table + b"".join(records) + meta_block)
+        return body + _BINARY_CRC.pack(zlib.crc32(body))
+
+    @staticmethod
+    def decode(data):
+        body, crc_bytes = data[:-_BINARY_CRC.size], data[-_BINARY_CRC.size:]
+        if len(data) < _BINARY_HEADER.size + _BINARY_CRC.size or _BINARY_CRC.unpack(crc_bytes)[0] != zlib.crc32(body):
+            raise ValueError("Binary warehouse file is damaged (checksum mismatch).")
+        _, version, count, table_size = _BINARY_HEADER.unpack_from(body)
+        if version not in (1, BINARY_VERSION):
+            raise ValueError(f"Unsupported binary warehouse version: {version}.")
+        table_start = _BINARY_HEADER.size
+        records_start = table_start + table_size
+        meta_start = records_start + count * _BINARY_RECORD.size
+        raw_table = body[table_start:records_start]
+        # For ASCII names byte offsets are character offsets, so the table is decoded only once
+        decode_names = not raw_table.isascii()
+        table = raw_table if decode_names else raw_table.decode("ascii")
+        warehouse = {}
+        for offset, length, price, quantity in _BINARY_RECORD.iter_unpack(body[records_start:meta_start]):
+            name = table[offset:offset + length]
+            if decode_names:
+                name = name.decode("utf-8")
+            warehouse[name] = {"price": price, "quantity": quantity}
+        if len(warehouse) != count:
+            raise ValueError("Binary warehouse file is damaged (wrong number of products).")
+        meta = json.loads(body[meta_start:]) if len(body) > meta_start else {}
+        return warehouse, meta
+
+
+def detect_format(data):
+    """Returns the format name of the file contents, "legacy" for the old str(dict) format."""
+    for format_name, codec_cls in _CODECS.items():
+        if codec_cls.detect(data):
+            return format_name
+    return "legacy"
+
+
+def load_warehouse(path):
+    """
+    Loads the warehouse from path.
+    Returns (warehouse, format_name, meta). Raises FileNotFoundError, or ValueError/SyntaxError for a damaged file.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.strip():
+        return {}, "legacy", {}
+    format_name = detect_format(data)
+    if format_name == "legacy":
+        return literal_eval(data.decode("utf-8")), format_name, {}
+    warehouse, meta = _CODECS[format_name].decode(data)
+    return warehouse, format_name, meta
+
+
+def save_warehouse(path, warehouse, format_name="jsonl", meta=None):
+    """Saves the warehouse in the given format through a temporary file, so a crash never leaves half a file."""
+    data = _CODECS[format_name].encode(warehouse, meta)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# --- Benchmark ---
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    def measure(func):
+        start = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - start
+
+    work_dir = tempfile.mkdtemp(prefix="warehouse_codec_")
+
+    # Names with characters that are line breaks for str.splitlines() but not for the JSONL format
+    tricky = {f"a{separator}b": {"price": i + 1, "quantity": i}
+              for i, separator in enumerate("\u2028\u2029\x85\x0b\x0c\x1c\x1d\x1e\r")}
+    tricky["plain"] = {"price": 1, "quantity": 1}
+    for format_name in _CODECS:
+        path = os.path.join(work_dir, f"tricky_{format_name}")
+        save_warehouse(path, tricky, format_name, {"total": 1})
+        assert load_warehouse(path) == (tricky, format_name, {"total": 1}), format_name
+    print(f"{'products':>10} {'format':>8} {'size, KB':>10} {'save, ms':>10} {'load, ms':>10}")
+    for size in (1000, 10000, 100000, 300000):
+        warehouse = {f"product {i}": {"price": i % 5000 + 1, "quantity": i % 700} for i in range(size)}
+        for format_name in ["legacy"] + list(_CODECS):
+            path = os.path.join(work_dir, f"warehouse_{size}_{format_name}")
+            if format_name == "legacy":
+                def save():
+                    with open(path, "w") as f:
+                        f.write(str(warehouse))
+            else:
+                def save():
+                    save_warehouse(path, warehouse, format_name)
+            _, save_time = measure(save)
+            (loaded, _, _), load_time = measure(lambda: load_warehouse(path))
+            assert loaded == warehouse
+            print(f"{size:>10} {format_name:>8} {os.path.getsize(path) / 1024:>10.0f} "
+                  f"{save_time * 1000:>10.1f} {load_time * 1000:>10.1f}")
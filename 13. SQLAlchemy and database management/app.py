@@ -1,6 +1,11 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
+import base64
+import math
 import os # Для os.path.join и os.path.abspath
 
 app = Flask(__name__)
@@ -10,13 +15,76 @@ app = Flask(__name__)
 # app.root_path is the root directory of your Flask application (where app.py is located)
 # 'site.db' - database file name
 database_path = os.path.join(app.root_path, 'site.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
+# WAREHOUSE_DATABASE_URI points the application at another database (the benchmarks use a temporary one)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('WAREHOUSE_DATABASE_URI', f'sqlite:///{database_path}')
 # Disable tracking of modifications, as it consumes a lot of memory and is not always necessary
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.secret_key = 'your_super_secret_key' # Important secret key for flash messages
 
+# Number of history records shown per page in cursor (keyset) mode
+HISTORY_PAGE_SIZE = 50
+
+# Largest number of line items accepted by one /api/batch request
+BATCH_MAX_ITEMS = 1000
+
+# Stock totals are kept in their own row and updated by every sale and purchase.
+# With verification on, each read also compares them with a full recomputation (slow, for debugging).
+app.config['VERIFY_STOCK_TOTALS'] = False
+
+# --- SQLITE PERFORMANCE PROFILE ---
+# Every profile has PRAGMAs run on each new connection and options for the engine (connection pool).
+# "performance": in WAL mode readers are not blocked by a writer; synchronous=NORMAL syncs the WAL
+# only at checkpoints (a power loss may lose the last commits but never corrupts the file);
+# mmap and a bigger page cache save reads; busy_timeout makes a writer wait for the lock instead of failing.
+# "default" leaves SQLite and SQLAlchemy as they are.
+SQLITE_PROFILES = {
+    'default': {
+        'pragmas': {},
+        'engine_options': {},
+    },
+    'performance': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,  # Negative values are KiB: 64 MiB per connection
+            'busy_timeout': 10000,  # Milliseconds
+            'temp_store': 'MEMORY',
+        },
+        # Requests reuse pooled connections (and their page cache) instead of opening the file again
+        'engine_options': {'pool_size': 16, 'max_overflow': 16, 'pool_timeout': 30},
+    },
+}
+# WAREHOUSE_SQLITE_PROFILE selects the profile, e.g. "default" to compare with the untuned database
+app.config['SQLITE_PROFILE'] = os.environ.get('WAREHOUSE_SQLITE_PROFILE', 'performance')
+
+
+def is_sqlite_file_database(uri):
+    """True for a SQLite database in a file; an in-memory one uses a pool that takes no pool options."""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:') \
+        and url.query.get('mode') != 'memory'
+
+
+if is_sqlite_file_database(app.config['SQLALCHEMY_DATABASE_URI']):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = SQLITE_PROFILES[app.config['SQLITE_PROFILE']]['engine_options']
+
 db = SQLAlchemy(app)
 
+
+def apply_sqlite_profile(dbapi_connection, connection_record):
+    """Runs the PRAGMAs of the selected profile on a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PROFILES[app.config['SQLITE_PROFILE']]['pragmas'].items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    cursor.close()
+
+
+with app.app_context():
+    # The engine is created here, before any connection is opened, so every connection gets the profile
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', apply_sqlite_profile)
+
 # --- DEFINITION OF MODELS (DATABASE SCHEMA) ---
 
 # Model for products in stock
@@ -37,8 +105,21 @@ class CompanyBalance(db.Model):
     def __repr__(self):
         return f"CompanyBalance(amount={self.amount})"
 
+# Model for running stock totals (a single row, updated in the same transaction as the products)
+class StockTotals(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    total_units = db.Column(db.Integer, nullable=False, default=0)
+    inventory_value = db.Column(db.Float, nullable=False, default=0.0)
+    sku_count = db.Column(db.Integer, nullable=False, default=0) # Products with quantity > 0
+
+    def __repr__(self):
+        return f"StockTotals(units={self.total_units}, value={self.inventory_value}, skus={self.sku_count})"
+
 # Model for transaction history
 class Transaction(db.Model):
+    # Composite index used by the keyset pagination of /history/ (ORDER BY timestamp, id)
+    __table_args__ = (db.Index('ix_transaction_timestamp_id', 'timestamp', 'id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(500), nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -49,42 +130,134 @@ class Transaction(db.Model):
 
 # --- OTHER FUNCTIONS FOR WORKING WITH THE DATABASE ---
 
-def get_current_balance_db():
+def get_balance_record_db():
     balance_record = CompanyBalance.query.first()
     if not balance_record:
         # If there is no balance record, create it with the initial value
         balance_record = CompanyBalance(amount=1000000.0)
         db.session.add(balance_record)
         db.session.commit()
-    return balance_record.amount
+    return balance_record
 
-def update_balance_db(amount, is_add=True):
-    balance_record = CompanyBalance.query.first()
-    if not balance_record:
-        balance_record = CompanyBalance(amount=1000000.0)
-        db.session.add(balance_record)
-        db.session.commit()
+def get_current_balance_db():
+    return get_balance_record_db().amount
+
+def change_balance_db(delta):
+    """
+    Changes the balance by delta with a single UPDATE (amount = amount + delta), so concurrent requests
+    cannot overwrite each other's changes. A withdrawal (negative delta) only matches the row
+    WHERE amount >= -delta, so the check and the change are one atomic statement.
+    Returns the new balance, or None if there were not enough funds. Not committed.
+    """
+    balance_id = get_balance_record_db().id
+    statement = db.update(CompanyBalance).where(CompanyBalance.id == balance_id)
+    if delta < 0:
+        statement = statement.where(CompanyBalance.amount >= -delta)
+    # RETURNING gives the new amount and doubles as the row count check: no row means no change.
+    # CAST because SQLite may return a whole REAL value as an integer from RETURNING.
+    return db.session.execute(
+        statement.values(amount=CompanyBalance.amount + delta)
+        .returning(db.cast(CompanyBalance.amount, db.Float))).scalar()
+
+def update_balance_db(amount, is_add=True, commit=True):
+    new_amount = change_balance_db(amount if is_add else -amount)
+    if new_amount is None:
+        description = f"Attempt to withdraw ({amount}) PLN, insufficient funds."
+        # We record history even if the operation fails
+        add_transaction_db(description + f" (Balance: {get_current_balance_db()} PLN)")
+        if commit:
+            db.session.commit()
+        return False, "Insufficient funds."
 
     if is_add:
-        balance_record.amount += amount
         description = f"Adding funds ({amount}) to the account."
     else:
-        if balance_record.amount < amount:
-            description = f"Attempt to withdraw ({amount}) PLN, insufficient funds."
-            # We record history even if the operation fails
-            add_transaction_db(description + f" (Balance: {balance_record.amount} PLN)")
-            db.session.commit()
-            return False, "Insufficient funds."
-        balance_record.amount -= amount
         description = f"Withdrawal of funds ({amount}) from the account."
-
-    add_transaction_db(description + f" Current balance: {balance_record.amount} PLN")
+    add_transaction_db(description + f" Current balance: {new_amount} PLN")
+    if commit:
+        db.session.commit()
+    return True, f"Balance updated. Current balance: {new_amount} PLN."
+
+def take_stock_db(product_name, quantity):
+    """
+    Takes quantity units of a product with a single UPDATE ... WHERE quantity >= :quantity.
+    Returns (remaining quantity, price), or None if the product is missing or there is not enough in stock.
+    Not committed.
+    """
+    return db.session.execute(
+        db.update(Product)
+        .where(Product.name == product_name, Product.quantity >= quantity)
+        .values(quantity=Product.quantity - quantity)
+        .returning(Product.quantity, db.cast(Product.price, db.Float).label('price'))).first()
+
+def add_stock_db(product_name, quantity, price):
+    """
+    Adds quantity units at the new price with a single UPDATE, or inserts the product if it is new.
+    Returns the previous (quantity, price), (0, 0) for a new product. Not committed.
+    Call it after a write in the same transaction (the purchase withdrawal): SQLite then already
+    holds its write lock, so the previous values read here cannot change before the commit.
+    """
+    previous = db.session.execute(
+        db.select(Product.quantity, Product.price).where(Product.name == product_name)).first()
+    if previous is None:
+        db.session.add(Product(name=product_name, quantity=quantity, price=price))
+        return 0, 0
+    db.session.execute(
+        db.update(Product)
+        .where(Product.name == product_name)
+        .values(quantity=Product.quantity + quantity, price=price))
+    return previous.quantity, previous.price
+
+def compute_stock_totals_db():
+    """Full recomputation of the stock totals over all products. Returns (units, value, skus)."""
+    total_units, inventory_value = db.session.query(
+        db.func.sum(Product.quantity), db.func.sum(Product.quantity * Product.price)).one()
+    sku_count = Product.query.filter(Product.quantity > 0).count()
+    return total_units or 0, inventory_value or 0.0, sku_count
+
+def verify_stock_totals_db(totals):
+    """Compares the stored totals with a full recomputation and repairs them on a mismatch."""
+    units, value, skus = compute_stock_totals_db()
+    if totals.total_units == units and totals.sku_count == skus and math.isclose(
+            totals.inventory_value, value, rel_tol=1e-9, abs_tol=1e-6):
+        return True
+    app.logger.warning(f"Stock totals {totals} differ from recomputed (units={units}, value={value}, skus={skus}). Repaired.")
+    totals.total_units, totals.inventory_value, totals.sku_count = units, value, skus
     db.session.commit()
-    return True, f"Balance updated. Current balance: {balance_record.amount} PLN."
+    return False
+
+def get_stock_totals_db():
+    totals = StockTotals.query.first()
+    if not totals:
+        # Existing database without totals: compute them once from the products
+        units, value, skus = compute_stock_totals_db()
+        totals = StockTotals(total_units=units, inventory_value=value, sku_count=skus)
+        db.session.add(totals)
+        db.session.commit()
+    elif app.config['VERIFY_STOCK_TOTALS']:
+        verify_stock_totals_db(totals)
+    return totals
+
+def update_stock_totals_db(old_quantity, old_price, new_quantity, new_price):
+    """
+    Moves the stock totals from the old state of one product to the new one (0, 0 for a new product).
+    A single UPDATE with deltas, committed together with the caller's product change.
+    """
+    add_to_stock_totals_db(new_quantity - old_quantity,
+                           new_quantity * new_price - old_quantity * old_price,
+                           int(new_quantity > 0) - int(old_quantity > 0))
+
+def add_to_stock_totals_db(units, value, skus):
+    """Adds already summed deltas (for example of a whole batch) to the stock totals with a single UPDATE."""
+    db.session.execute(
+        db.update(StockTotals).values(
+            total_units=StockTotals.total_units + units,
+            inventory_value=StockTotals.inventory_value + value,
+            sku_count=StockTotals.sku_count + skus))
 
 def get_current_stock_level_db():
-    total_items = db.session.query(db.func.sum(Product.quantity)).scalar()
-    return total_items if total_items is not None else 0
+    # Read from the running totals instead of SUM over all products
+    return get_stock_totals_db().total_units
 
 def get_warehouse_items_db():
     return Product.query.all()
@@ -124,6 +297,222 @@ def get_history_range_db(line_from=None, line_to=None):
 
     return filtered_records, start_index
 
+def encode_history_cursor(direction, transaction):
+    """Packs the direction and the (timestamp, id) key of a transaction into an opaque token."""
+    raw = f"{direction}|{transaction.timestamp.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_history_cursor(token):
+    """
+    Unpacks a token created by encode_history_cursor.
+    Returns (direction, timestamp, id) or None if the token is invalid.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8")
+        direction, timestamp_str, id_str = raw.split("|")
+        if direction not in ("next", "prev"):
+            return None
+        return direction, datetime.fromisoformat(timestamp_str), int(id_str)
+    except (ValueError, UnicodeError):
+        return None
+
+def get_history_page_db(cursor=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    Returns one page of history using keyset pagination on (timestamp, id).
+    Unlike get_history_range_db there is no COUNT and no OFFSET, so every page costs
+    the same no matter how deep it is.
+    Returns (list_of_transactions, next_cursor, prev_cursor); a cursor is None when
+    there is no page in that direction.
+    """
+    key = db.tuple_(Transaction.timestamp, Transaction.id)
+    query = Transaction.query
+    direction = "next"
+
+    if cursor is not None:
+        direction, timestamp, transaction_id = cursor
+        if direction == "next":
+            query = query.filter(key > db.tuple_(timestamp, transaction_id))
+        else:
+            query = query.filter(key < db.tuple_(timestamp, transaction_id))
+
+    if direction == "next":
+        query = query.order_by(Transaction.timestamp.asc(), Transaction.id.asc())
+    else:
+        query = query.order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+
+    # One extra row tells us whether there is another page after this one
+    records = query.limit(page_size + 1).all()
+    has_more = len(records) > page_size
+    records = records[:page_size]
+
+    if direction == "prev":
+        records.reverse()
+        has_next = cursor is not None
+        has_prev = has_more
+    else:
+        has_next = has_more
+        has_prev = cursor is not None
+
+    next_cursor = encode_history_cursor("next", records[-1]) if records and has_next else None
+    prev_cursor = encode_history_cursor("prev", records[0]) if records and has_prev else None
+    return records, next_cursor, prev_cursor
+
+# --- BATCH OPERATIONS ---
+
+def validate_batch_item(item):
+    """Returns (operation, product_name, quantity, price) of one line item or raises ValueError."""
+    if not isinstance(item, dict):
+        raise ValueError("A line item must be an object.")
+    operation = item.get('operation')
+    if operation not in ('purchase', 'sale'):
+        raise ValueError("Invalid operation (must be 'purchase' or 'sale').")
+    product_name = item.get('product_name')
+    if not isinstance(product_name, str) or not product_name.strip():
+        raise ValueError("The product name must be a non-empty string.")
+    quantity = item.get('quantity')
+    # bool is a subclass of int, but true/false is not a quantity
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+        raise ValueError("The quantity must be an integer greater than zero.")
+    price = None
+    if operation == 'purchase':
+        price = item.get('price')
+        if not isinstance(price, (int, float)) or isinstance(price, bool) or not price > 0:
+            raise ValueError("The price must be a number greater than zero.")
+        price = float(price)
+    return operation, product_name.strip().lower(), quantity, price
+
+def apply_batch_db(items, all_or_nothing=False):
+    """
+    Applies many purchases and sales in one database transaction.
+    Lines are checked in order against the state left by the previous lines (with all_or_nothing
+    a single failed line rejects the whole batch), then the accepted lines are written with:
+    one conditional UPDATE of the balance (the only funds check in the database), one executemany
+    UPDATE of the changed products, one bulk INSERT of new products, one bulk INSERT of the
+    history records and one commit.
+    Product updates only match rows that still have the quantity and price read at the start;
+    if another request changed one of them in between, the whole batch is rolled back.
+    Returns {"success", "applied", "balance", "results"} with one result per line.
+    """
+    results = []
+    parsed = []
+    for line, item in enumerate(items):
+        try:
+            parsed.append(validate_batch_item(item))
+            results.append({'line': line, 'success': True, 'message': ''})
+        except ValueError as e:
+            parsed.append(None)
+            results.append({'line': line, 'success': False, 'message': str(e)})
+
+    product_names = {entry[1] for entry in parsed if entry is not None}
+    products = {}
+    if product_names:
+        products = {product.name: product
+                    for product in Product.query.filter(Product.name.in_(product_names))}
+    # Work on copies: {'name': [quantity, price]}
+    state = {name: [product.quantity, product.price] for name, product in products.items()}
+    start_balance = balance = get_current_balance_db()
+    descriptions = []
+    for entry, result in zip(parsed, results):
+        if entry is None:
+            continue
+        operation, product_name, quantity, price = entry
+        product_state = state.get(product_name)
+        if operation == 'sale':
+            if product_state is None:
+                result.update(success=False, message=f"Product '{product_name}' not found in stock.")
+                continue
+            if product_state[0] < quantity:
+                result.update(success=False,
+                              message=f"There are not enough goods in stock. Available: {product_state[0]}, requested: {quantity}.")
+                continue
+            sale_amount = product_state[1] * quantity
+            product_state[0] -= quantity
+            balance += sale_amount
+            descriptions.append(f"Sale: {quantity} units ({product_name}) for {sale_amount} PLN.")
+            result['message'] = f"Sold {quantity} units of {product_name}. Profit: {sale_amount} PLN."
+        else:
+            total_cost = quantity * price
+            if balance < total_cost:
+                result.update(success=False,
+                              message=f"Insufficient funds to purchase. Required: {total_cost} PLN, available: {balance} PLN.")
+                continue
+            if product_state is None:
+                product_state = state[product_name] = [0, price]
+            product_state[0] += quantity
+            product_state[1] = price  # The price of the last purchase, as in /purchase
+            balance -= total_cost
+            descriptions.append(f"Purchase: {quantity} units ({product_name}) for {total_cost} PLN.")
+            result['message'] = f"Purchased {quantity} units of {product_name}. Cost: {total_cost} PLN."
+
+    failed = sum(not result['success'] for result in results)
+    if all_or_nothing and failed:
+        for result in results:
+            if result['success']:
+                result.update(success=False, message="Not applied: other lines of the batch failed.")
+        descriptions = []
+
+    def reject_all(message):
+        db.session.rollback()
+        for result in results:
+            if result['success']:
+                result.update(success=False, message=message)
+
+    if descriptions:
+        # Balance first: in SQLite this write also takes the lock for the rest of the transaction
+        new_balance = change_balance_db(balance - start_balance)
+        if new_balance is None:
+            reject_all("Not applied: insufficient funds for the batch.")
+            return {'success': False, 'applied': 0, 'balance': get_current_balance_db(), 'results': results}
+
+        product_table = Product.__table__
+        updates = []
+        inserts = []
+        units = value = skus = 0
+        for name, (quantity, price) in state.items():
+            old_quantity, old_price = (products[name].quantity, products[name].price) if name in products else (0, 0)
+            if name not in products:
+                inserts.append({'name': name, 'quantity': quantity, 'price': price})
+            elif (quantity, price) != (old_quantity, old_price):
+                updates.append({'b_id': products[name].id, 'b_old_quantity': old_quantity, 'b_old_price': old_price,
+                                'b_quantity': quantity, 'b_price': price})
+            else:
+                continue
+            units += quantity - old_quantity
+            value += quantity * price - old_quantity * old_price
+            skus += int(quantity > 0) - int(old_quantity > 0)
+
+        conflict = False
+        if updates:
+            updated = db.session.execute(
+                product_table.update()
+                .where(product_table.c.id == db.bindparam('b_id'),
+                       product_table.c.quantity == db.bindparam('b_old_quantity'),
+                       product_table.c.price == db.bindparam('b_old_price'))
+                .values(quantity=db.bindparam('b_quantity'), price=db.bindparam('b_price')),
+                updates).rowcount
+            conflict = updated != len(updates)
+        if inserts and not conflict:
+            try:
+                db.session.execute(db.insert(Product), inserts)
+            except IntegrityError:
+                conflict = True
+        if conflict:
+            # A product was changed or created by another request since it was read
+            reject_all("Not applied: the products were changed by another request, please retry.")
+            return {'success': False, 'applied': 0, 'balance': get_current_balance_db(), 'results': results}
+
+        add_to_stock_totals_db(units, value, skus)
+        descriptions.append(
+            f"Batch of {len(descriptions)} operations, balance change ({new_balance - start_balance}) PLN. Current balance: {new_balance} PLN")
+        db.session.execute(db.insert(Transaction), [{'description': description} for description in descriptions])
+        db.session.commit()
+        balance = new_balance
+    else:
+        balance = start_balance
+
+    applied = sum(result['success'] for result in results)
+    return {'success': failed == 0, 'applied': applied, 'balance': balance, 'results': results}
+
 # --- FLASK ROUTES ---
 @app.route("/")
 @app.route("/index")
@@ -157,11 +546,12 @@ def purchase():
                 if quantity <= 0 or price <= 0:
                     flash("Quantity and price must be greater than zero!", "error")
                 else:
-                    product = Product.query.filter_by(name=product_name.lower()).first()
                     total_cost = quantity * price
 
-                    current_bal = get_current_balance_db()
-                    if current_bal < total_cost:
+                    # The funds check and the withdrawal are one conditional UPDATE
+                    new_balance = change_balance_db(-total_cost)
+                    if new_balance is None:
+                        current_bal = get_current_balance_db()
                         add_transaction_db(
                             f"Attempted to purchase ({product_name}) for ({total_cost}) PLN, insufficient funds. Balance: {current_bal} PLN.")
                         db.session.commit()
@@ -169,22 +559,17 @@ def purchase():
                             f"Insufficient funds to purchase. Required: {total_cost} PLN, available: {current_bal} PLN.",
                             "error")
                     else:
-                        success, msg = update_balance_db(total_cost, is_add=False)  # Withdraw the money
-                        if success:
-                            if product:
-                                product.quantity += quantity
-                                product.price = price  # Update the price if the product is already available
-                            else:
-                                new_product = Product(name=product_name.lower(), quantity=quantity, price=price)
-                                db.session.add(new_product)
-
-                            add_transaction_db(f"Purchase: {quantity} units ({product_name}) for {total_cost} PLN.")
-                            db.session.commit()  # Commit all changes in this transaction
-                            flash(f"Successfully purchased {quantity} units of {product_name}. Cost: {total_cost} PLN.",
-                                  "success")
-                            return redirect(url_for('purchase'))  # Redirect to the GET version of the page
-                        else:
-                            flash(msg, "error")  # This message is already being processed by update_balance_db
+                        add_transaction_db(
+                            f"Withdrawal of funds ({total_cost}) from the account. Current balance: {new_balance} PLN")
+                        # Adds to the stock and updates the price if the product is already available
+                        old_quantity, old_price = add_stock_db(product_name.lower(), quantity, price)
+                        update_stock_totals_db(old_quantity, old_price, old_quantity + quantity, price)
+
+                        add_transaction_db(f"Purchase: {quantity} units ({product_name}) for {total_cost} PLN.")
+                        db.session.commit()  # Commit all changes in this transaction
+                        flash(f"Successfully purchased {quantity} units of {product_name}. Cost: {total_cost} PLN.",
+                              "success")
+                        return redirect(url_for('purchase'))  # Redirect to the GET version of the page
             except ValueError:
                 flash("Quantity must be an integer, price must be a number!", "error")
             except Exception as e:
@@ -196,6 +581,32 @@ def purchase():
                            stock_level=current_stock_level)
 
 
+@app.route("/api/batch", methods=['POST'])
+def batch():
+    """
+    JSON endpoint for many purchases and sales in one transaction:
+    {"all_or_nothing": false, "items": [{"operation": "purchase", "product_name": "...", "quantity": 1, "price": 1.5},
+                                        {"operation": "sale", "product_name": "...", "quantity": 1}]}
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('items'), list) or not data['items']:
+        return jsonify({'error': "The body must be a JSON object with a non-empty 'items' list."}), 400
+    if len(data['items']) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f"A batch may have at most {BATCH_MAX_ITEMS} items."}), 400
+    all_or_nothing = data.get('all_or_nothing', False)
+    if not isinstance(all_or_nothing, bool):
+        return jsonify({'error': "'all_or_nothing' must be true or false."}), 400
+
+    try:
+        result = apply_batch_db(data['items'], all_or_nothing=all_or_nothing)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f"An unexpected error occurred: {e}"}), 500
+    # 422 when an all-or-nothing batch was rejected, otherwise the per-line results say what was applied
+    status = 422 if all_or_nothing and not result['success'] else 200
+    return jsonify(result), status
+
+
 @app.route("/sale", methods=['GET', 'POST'])
 def sale():
     current_balance = get_current_balance_db()
@@ -214,28 +625,30 @@ def sale():
                 if quantity <= 0:
                     flash("The quantity to sell must be greater than zero!", "error")
                 else:
-                    product = Product.query.filter_by(name=product_name.lower()).first()
-                    if not product:
-                        flash(f"Product '{product_name}' not found in stock.", "error")
-                    elif product.quantity < quantity:
-                        add_transaction_db(
-                            f"Attempting to sell ({product_name}) in ({quantity}) but not enough in stock ({product.quantity}).")
-                        db.session.commit()
-                        flash(f"There are not enough goods in stock. Available: {product.quantity}, requested: {quantity}.",
-                              "error")
-                    else:
-                        sale_amount = product.price * quantity
-                        product.quantity -= quantity
-
-                        success, msg = update_balance_db(sale_amount, is_add=True)  # Adding money
-                        if success:
-                            add_transaction_db(f"Sale: {quantity} units ({product_name}) for {sale_amount} PLN.")
-                            db.session.commit()  # Commit all changes
-                            flash(f"Successfully sold {quantity} units of {product_name}. Profit: {sale_amount} PLN.",
-                                  "success")
-                            return redirect(url_for('sale'))
+                    # The stock check and the change are one conditional UPDATE
+                    taken = take_stock_db(product_name.lower(), quantity)
+                    if taken is None:
+                        available = db.session.execute(
+                            db.select(Product.quantity).where(Product.name == product_name.lower())).scalar()
+                        if available is None:
+                            flash(f"Product '{product_name}' not found in stock.", "error")
                         else:
-                            flash(msg, "error")  # This message has already been processed by update_balance_db
+                            add_transaction_db(
+                                f"Attempting to sell ({product_name}) in ({quantity}) but not enough in stock ({available}).")
+                            db.session.commit()
+                            flash(f"There are not enough goods in stock. Available: {available}, requested: {quantity}.",
+                                  "error")
+                    else:
+                        remaining, price = taken
+                        sale_amount = price * quantity
+                        update_stock_totals_db(remaining + quantity, price, remaining, price)
+
+                        update_balance_db(sale_amount, is_add=True, commit=False)  # Adding money
+                        add_transaction_db(f"Sale: {quantity} units ({product_name}) for {sale_amount} PLN.")
+                        db.session.commit()  # Commit all changes
+                        flash(f"Successfully sold {quantity} units of {product_name}. Profit: {sale_amount} PLN.",
+                              "success")
+                        return redirect(url_for('sale'))
             except ValueError:
                 flash("The quantity must be an integer!", "error")
             except Exception as e:
@@ -289,6 +702,23 @@ def history():
     line_from_str = request.args.get('line_from')
     line_to_str = request.args.get('line_to')
 
+    # Without a range the history is browsed page by page using cursors
+    if line_from_str is None and line_to_str is None:
+        cursor_str = request.args.get('cursor')
+        cursor = None
+        if cursor_str:
+            cursor = decode_history_cursor(cursor_str)
+            if cursor is None:
+                flash("Invalid history page link. Showing the first page.", "warning")
+
+        history_objects, next_cursor, prev_cursor = get_history_page_db(cursor)
+        # In cursor mode the absolute position is unknown (it would need a COUNT), so the id is shown
+        history_descriptions = [(transaction.id, transaction.description) for transaction in history_objects]
+        return render_template("history.html",
+                               history_records=history_descriptions,
+                               next_cursor=next_cursor,
+                               prev_cursor=prev_cursor)
+
     # get_history_range_db returns (Transaction list of objects, actual_start_index)
     history_objects, actual_start_index = get_history_range_db(line_from_str, line_to_str)
 
@@ -317,6 +747,9 @@ if __name__ == '__main__':
     # Wrap db.create_all() in app_context so it works outside of a query
     with app.app_context():
         db.create_all() # Create tables when the application starts
+        # create_all does not add new indexes to tables that already exist
+        for index in Transaction.__table__.indexes:
+            index.create(bind=db.engine, checkfirst=True)
         # Initialize the balance if it does not exist
         if not CompanyBalance.query.first():
             db.session.add(CompanyBalance(amount=1000000.0))
@@ -0,0 +1,116 @@
+"""
+Concurrency benchmark for sales: read-modify-write in Python against single conditional UPDATEs.
+
+Many threads sell one unit of the same product at a time, each in its own session, against a temporary
+SQLite database:
+- "read-modify-write" is the previous implementation: load the product and the balance, change them
+  in Python and commit, so two requests that read the same values lose one of the updates;
+- "atomic UPDATE" uses take_stock_db() and change_balance_db(): the check and the change are one
+  statement each (UPDATE ... SET quantity = quantity - :q WHERE quantity >= :q).
+
+After every run the script compares the final stock and balance with the number of confirmed sales
+and reports throughput, lost updates, overselling and errors.
+
+Usage: python concurrency_benchmark.py [threads] [sales_per_thread]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix="warehouse_concurrency_")
+os.environ['WAREHOUSE_DATABASE_URI'] = f"sqlite:///{os.path.join(WORK_DIR, 'benchmark.db')}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, Product, CompanyBalance, take_stock_db, change_balance_db  # noqa: E402
+
+PRODUCT_NAME = "benchmark product"
+PRICE = 10.0
+INITIAL_BALANCE = 1000.0
+
+
+def sell_read_modify_write(quantity):
+    product = Product.query.filter_by(name=PRODUCT_NAME).first()
+    if product.quantity < quantity:
+        return False
+    balance_record = CompanyBalance.query.first()
+    product.quantity -= quantity
+    balance_record.amount += product.price * quantity
+    db.session.commit()
+    return True
+
+
+def sell_atomic(quantity):
+    taken = take_stock_db(PRODUCT_NAME, quantity)
+    if taken is None:
+        db.session.rollback()
+        return False
+    change_balance_db(taken.price * quantity)
+    db.session.commit()
+    return True
+
+
+def worker(sell, sales, stats, stats_lock):
+    sold = errors = 0
+    with app.app_context():
+        for _ in range(sales):
+            try:
+                if sell(1):
+                    sold += 1
+            except Exception:
+                # "database is locked" and similar, the sale is not confirmed
+                db.session.rollback()
+                errors += 1
+    with stats_lock:
+        stats["sold"] += sold
+        stats["errors"] += errors
+
+
+def run(name, sell, threads_count, sales, initial_stock):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(Product(name=PRODUCT_NAME, quantity=initial_stock, price=PRICE))
+        db.session.add(CompanyBalance(amount=INITIAL_BALANCE))
+        db.session.commit()
+
+    stats = {"sold": 0, "errors": 0}
+    stats_lock = threading.Lock()
+    threads = [threading.Thread(target=worker, args=(sell, sales, stats, stats_lock)) for _ in range(threads_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        quantity = db.session.execute(db.select(Product.quantity)).scalar()
+        balance = db.session.execute(db.select(CompanyBalance.amount)).scalar()
+    lost_stock = quantity - (initial_stock - stats["sold"])  # Sales that did not reduce the stock
+    lost_balance = round((INITIAL_BALANCE + stats["sold"] * PRICE - balance) / PRICE)
+    attempts = threads_count * sales
+    oversold = stats["sold"] > initial_stock or quantity < 0
+    print(f"{name:>18} {attempts / elapsed:>10.0f} {stats['sold']:>8} {stats['errors']:>7} "
+          f"{lost_stock:>11} {lost_balance:>13} {'yes' if oversold else 'no':>10}")
+    return lost_stock == 0 and lost_balance == 0 and not oversold
+
+
+def main():
+    threads_count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    sales = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    # Less stock than attempted sales, so the stock check is also under contention at the end
+    initial_stock = threads_count * sales * 3 // 4
+
+    print(f"{threads_count} threads x {sales} sales of 1 unit, initial stock {initial_stock} (database in {WORK_DIR})")
+    print(f"{'path':>18} {'sales/s':>10} {'sold':>8} {'errors':>7} {'lost stock':>11} "
+          f"{'lost balance':>13} {'oversold':>10}")
+    run("read-modify-write", sell_read_modify_write, threads_count, sales, initial_stock)
+    if not run("atomic UPDATE", sell_atomic, threads_count, sales, initial_stock):
+        print("The atomic path lost updates!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Read latency under write load for the SQLite profiles of app.py.
+
+For every profile a fresh database is seeded with products and history, then writer processes post
+purchases and sales while reader processes load "/" and "/history/" and measure how long each page takes.
+Processes instead of threads keep the GIL out of the measurement, so only the database locks are compared.
+With the "default" profile (rollback journal) a reader has to wait while a writer commits;
+with "performance" (WAL) readers keep working during writes.
+
+Every profile runs in its own process, because the profile is applied when app.py creates the engine.
+Usage: python sqlite_benchmark.py [seconds] [readers] [writers]
+"""
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+PRODUCTS = 200
+HISTORY_RECORDS = 20000
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def seed(app_module):
+    app, db = app_module.app, app_module.db
+    with app.app_context():
+        db.create_all()
+        db.session.add(app_module.CompanyBalance(amount=1000000000.0))
+        for i in range(PRODUCTS):
+            db.session.add(app_module.Product(name=f"product {i}", quantity=1000000, price=float(i % 50 + 1)))
+        db.session.add_all(app_module.Transaction(description=f"Seed operation {i}") for i in range(HISTORY_RECORDS))
+        db.session.commit()
+        app_module.get_stock_totals_db()
+
+
+def reader(app, deadline, results):
+    latencies, errors = [], 0
+    client = app.test_client()
+    urls = ["/", "/history/"]
+    while time.perf_counter() < deadline:
+        url = random.choice(urls)
+        start = time.perf_counter()
+        try:
+            response = client.get(url)
+            failed = response.status_code != 200
+        except Exception:
+            failed = True
+        latencies.append(time.perf_counter() - start)
+        errors += failed
+    results.put(("read", latencies, errors))
+
+
+def writer(app, deadline, results):
+    writes = errors = 0
+    client = app.test_client()
+    while time.perf_counter() < deadline:
+        product_name = f"product {random.randrange(PRODUCTS)}"
+        if random.random() < 0.5:
+            response = client.post("/purchase", data={"product_name": product_name, "quantity": "3", "price": "10"})
+        else:
+            response = client.post("/sale", data={"product_name": product_name, "quantity": "2"})
+        # A successful operation redirects; an error renders the form again with a message
+        if response.status_code == 302:
+            writes += 1
+        else:
+            errors += 1
+    results.put(("write", writes, errors))
+
+
+def run_profile(seconds, readers_count, writers_count):
+    """Runs in the child process: the environment already points app.py at the profile and database."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    seed(app_module)
+    app = app_module.app
+    with app.app_context():
+        # The forked processes must open their own connections
+        app_module.db.engine.dispose()
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    deadline = time.perf_counter() + seconds
+    processes = [context.Process(target=reader, args=(app, deadline, results)) for _ in range(readers_count)]
+    processes += [context.Process(target=writer, args=(app, deadline, results)) for _ in range(writers_count)]
+    for process in processes:
+        process.start()
+    latencies, read_errors, writes, write_errors = [], 0, 0, 0
+    for _ in processes:
+        role, value, errors = results.get()
+        if role == "read":
+            latencies.extend(value)
+            read_errors += errors
+        else:
+            writes += value
+            write_errors += errors
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    print(json.dumps({
+        "reads": len(latencies) / seconds,
+        "p50": percentile(latencies, 0.5) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "max": (latencies[-1] if latencies else 0) * 1000,
+        "read_errors": read_errors,
+        "writes": writes / seconds,
+        "write_errors": write_errors,
+    }))
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers_count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    writers_count = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    work_dir = tempfile.mkdtemp(prefix="warehouse_sqlite_")
+
+    # Readers and writers only run in parallel with enough cores; on a single core they just take turns
+    print(f"{readers_count} readers, {writers_count} writers, {seconds:g} s per profile, {os.cpu_count()} CPUs "
+          f"(databases in {work_dir})")
+    print(f"{'profile':>12} {'reads/s':>8} {'p50, ms':>8} {'p95, ms':>8} {'p99, ms':>8} {'max, ms':>8} "
+          f"{'read err':>8} {'writes/s':>8} {'write err':>9}")
+    for profile in ("default", "performance"):
+        env = dict(os.environ,
+                   WAREHOUSE_SQLITE_PROFILE=profile,
+                   WAREHOUSE_DATABASE_URI=f"sqlite:///{os.path.join(work_dir, profile + '.db')}")
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--profile-run",
+                                 str(seconds), str(readers_count), str(writers_count)],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{profile:>12} {result['reads']:>8.0f} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+              f"{result['p99']:>8.1f} {result['max']:>8.1f} {result['read_errors']:>8} "
+              f"{result['writes']:>8.0f} {result['write_errors']:>9}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--profile-run":
+        run_profile(float(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        main()
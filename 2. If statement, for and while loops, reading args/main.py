@@ -1,69 +1,171 @@
-# Initialization of variables
-package_weight = 0  # current parcel weight
-item_weight = 0  # item weight
+import sys
+import time
 
-sent_packages = 0  # total number of parcels
-total_weight = 0  # total weight for the shift
-total_unused_capacity = 0  # total unused weight
+from packing import ALGORITHMS, MAX_ITEM_WEIGHT, MIN_ITEM_WEIGHT, PARCEL_CAPACITY, pack, read_weights
+from shift_report import REPORT_PERCENTILES, ShiftStatistics
 
-unused_capacities = []  # list of parcels that were not fully filled for the shift
+USAGE = ("Usage: main.py                                                - enter the items one by one\n"
+         "       main.py [--algorithm NAME] <weights_file|-> [file ...]  - pack all weights from files or stdin,\n"
+         "                                                                 one shift per file\n"
+         f"  --algorithm NAME  {', '.join(ALGORITHMS)} or all (default next-fit, the interactive rule)\n"
+         f"Weights are integers from {MIN_ITEM_WEIGHT} to {MAX_ITEM_WEIGHT} separated by spaces or lines; 0 ends the list.")
+MAX_LISTED_PARCELS = 10  # Parcel numbers shown for the most 'unused' parcels of a shift
 
-total_items = int(input("Enter the number of items you wish to send: "))
 
-for item_count in range(1, total_items + 1):
-    # Working with exceptions
-    try:
-        item_weight = int(input(f"Enter the weight of item {item_count} (1-10 kg, or 0 to stop): "))
-    except ValueError:
-        print("Invalid input. Please enter a valid integer for the weight.")
-        continue
-
-    # Exiting the program
-    if item_weight == 0:
-        print("Exiting the program.")
-        break
-
-    # Checking for acceptable weight
-    if item_weight < 1 or item_weight > 10:
-        print("Incorrect item weight. Weight should be min 1 kg., max 10 kg.")
-        continue
-
-    # Adding product to the current package
-    if package_weight + item_weight > 20:
+def run_interactive():
+    # Initialization of variables
+    package_weight = 0  # current parcel weight
+    item_weight = 0  # item weight
+
+    sent_packages = 0  # total number of parcels
+    total_weight = 0  # total weight for the shift
+    total_unused_capacity = 0  # total unused weight
+
+    unused_capacities = []  # list of parcels that were not fully filled for the shift
+
+    total_items = int(input("Enter the number of items you wish to send: "))
+
+    for item_count in range(1, total_items + 1):
+        # Working with exceptions
+        try:
+            item_weight = int(input(f"Enter the weight of item {item_count} (1-10 kg, or 0 to stop): "))
+        except ValueError:
+            print("Invalid input. Please enter a valid integer for the weight.")
+            continue
+
+        # Exiting the program
+        if item_weight == 0:
+            print("Exiting the program.")
+            break
+
+        # Checking for acceptable weight
+        if item_weight < 1 or item_weight > 10:
+            print("Incorrect item weight. Weight should be min 1 kg., max 10 kg.")
+            continue
+
+        # Adding product to the current package
+        if package_weight + item_weight > 20:
+            sent_packages += 1
+            total_weight = total_weight + package_weight
+            unused_capacity = 20 - package_weight
+            total_unused_capacity = total_unused_capacity + unused_capacity
+            unused_capacities.append(unused_capacity)
+
+            # Start a new package with the current item
+            package_weight = item_weight
+        elif package_weight == 20:
+            unused_capacities.append(0)
+        else:
+            # Add the item to the current package
+            package_weight += item_weight
+
+    # At the end, send the last package if it has items
+    if package_weight > 0:
         sent_packages += 1
         total_weight = total_weight + package_weight
         unused_capacity = 20 - package_weight
-        total_unused_capacity = total_unused_capacity + unused_capacity
+        total_unused_capacity += unused_capacity
         unused_capacities.append(unused_capacity)
 
-        # Start a new package with the current item
-        package_weight = item_weight
-    elif package_weight == 20:
-        unused_capacities.append(0)
-    else:
-        # Add the item to the current package
-        package_weight += item_weight
-
-# At the end, send the last package if it has items
-if package_weight > 0:
-    sent_packages += 1
-    total_weight = total_weight + package_weight
-    unused_capacity = 20 - package_weight
-    total_unused_capacity += unused_capacity
-    unused_capacities.append(unused_capacity)
-
-# Finding the most 'unused' package
-max_unused_capacity = max(unused_capacities)
-
-# What if there are several packages?
-max_unused_package_numbers = []
-for i in range(len(unused_capacities)):
-    if unused_capacities[i] == max_unused_capacity:
-        max_unused_package_numbers.append(i + 1)  # +1 because we need number, not index
-
-# Display the results
-print(f"""-- {sent_packages} packages sent
+    # Finding the most 'unused' packages (there may be several)
+    report = ShiftStatistics([[20 - unused_capacity for unused_capacity in unused_capacities]])
+    max_unused_capacity = int(report.max_unused[0])
+    max_unused_package_numbers = report.max_unused_parcels()[0].tolist()
+
+    # Display the results
+    print(f"""-- {sent_packages} packages sent
 -- The total weight of the items is {total_weight} kilograms
 -- Total 'unused' capacity (non-optimal packaging) is {total_unused_capacity} kilograms
 -- The list of unused capacities looks like {unused_capacities}
--- The most 'unused' package is number {max_unused_package_numbers} its unused capacity is {max_unused_capacity}""")  # 0 - if the package is full
\ No newline at end of file
+-- The most 'unused' package is number {max_unused_package_numbers} its unused capacity is {max_unused_capacity}""")  # 0 - if the package is full
+
+
+# --- Batch mode ---
+def parse_options(args):
+    """Separates the leading --options from the positional arguments. Returns (options, positional)."""
+    options = {"algorithm": "next-fit"}
+    args = list(args)
+    while args and args[0].startswith("--"):
+        option = args.pop(0)
+        if option == "--algorithm" and args and (args[0] in ALGORITHMS or args[0] == "all"):
+            options["algorithm"] = args.pop(0)
+        else:
+            print(f"Unknown or incomplete option: {option}")
+            print(USAGE)
+            sys.exit(1)
+    return options, args
+
+
+def read_shift(path):
+    """Reads the item weights of one shift from a file, or from stdin for "-"."""
+    if path == "-":
+        return read_weights(sys.stdin)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return read_weights(f)
+    except OSError as e:
+        print(f"Cannot read {path}: {e}")
+        sys.exit(1)
+
+
+def print_shift_details(stats):
+    """Prints the most 'unused' parcels and the histogram of unused capacity of a single shift."""
+    numbers = stats.max_unused_parcels()[0]
+    listed = ", ".join(str(number) for number in numbers[:MAX_LISTED_PARCELS].tolist())
+    if len(numbers) > MAX_LISTED_PARCELS:
+        listed += f", ... ({len(numbers)} parcels)"
+    print(f"-- The most 'unused' parcels are numbers [{listed}], their unused capacity is {stats.max_unused[0]} kg")
+    histogram = ", ".join(f"{kg}: {count}" for kg, count in enumerate(stats.unused_histograms[0].tolist()) if count)
+    print(f"-- Unused capacity histogram (kg: parcels): {histogram}")
+
+
+def run_batch(paths, algorithm):
+    names = ["stdin" if path == "-" else path for path in paths]
+    shifts = []
+    for path, name in zip(paths, names):
+        report = read_shift(path)
+        weights = report.weights
+        print(f"-- {name}: {len(weights)} items, {sum(weights)} kilograms, "
+              f"at least {-(-sum(weights) // PARCEL_CAPACITY)} parcels are needed")
+        if report.invalid or report.out_of_range:
+            print(f"   skipped {report.invalid} values that are not integers and {report.out_of_range} weights "
+                  f"outside {MIN_ITEM_WEIGHT}-{MAX_ITEM_WEIGHT} kg")
+        if report.stopped:
+            print("   the list ended at a weight of 0")
+        shifts.append(weights)
+
+    name_width = max(len("shift"), *(len(name) for name in names))
+    percentile_header = "".join(f"{f'p{q} load':>9}" for q in REPORT_PERCENTILES)
+    for algorithm_name in (ALGORITHMS if algorithm == "all" else [algorithm]):
+        results = [pack(weights, algorithm_name) for weights in shifts]
+        start = time.perf_counter()
+        stats = ShiftStatistics([result.loads for result in results], names=names)
+        percentiles = stats.load_percentiles()
+        fill_rates = stats.fill_rate()
+        report_time = time.perf_counter() - start
+
+        print(f"\n-- {algorithm_name}: packed in {sum(result.elapsed for result in results) * 1000:.1f} ms, "
+              f"report computed in {report_time * 1000:.1f} ms")
+        print(f"{'shift':>{name_width}} {'parcels':>9} {'weight, kg':>11} {'unused, kg':>11} {'fill':>7} "
+              f"{'max unused':>11} {'at max':>8}{percentile_header}")
+        for i, name in enumerate(names):
+            print(f"{name:>{name_width}} {stats.parcels[i]:>9} {stats.total_weight[i]:>11} "
+                  f"{stats.total_unused[i]:>11} {fill_rates[i]:>7.1%} {stats.max_unused[i]:>11} "
+                  f"{stats.max_unused_count[i]:>8}" + "".join(f"{value:>9}" for value in percentiles[i].tolist()))
+        if len(shifts) == 1:
+            print_shift_details(stats)
+
+
+def main():
+    options, positional = parse_options(sys.argv[1:])
+    if not positional:
+        if len(sys.argv) > 1:
+            print(USAGE)
+            sys.exit(1)
+        run_interactive()
+    else:
+        run_batch(positional, options["algorithm"])
+
+
+if __name__ == "__main__":
+    main()
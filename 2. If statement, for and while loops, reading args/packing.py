@@ -0,0 +1,204 @@
+"""
+Batch parcel packing.
+
+Item weights are read from a file or a stream and packed into parcels with one of these algorithms:
+- "next-fit" - the interactive program's rule: items go into the current parcel, which is sent as soon as
+               the next item does not fit (O(n), keeps the order of the items);
+- "ffd"      - first-fit decreasing: heaviest items first, each into the first parcel it fits in;
+- "bfd"      - best-fit decreasing: heaviest items first, each into the fullest parcel it fits in.
+FFD keeps the free capacity of every parcel in a max segment tree, so the first parcel with enough room is
+found in O(log n). BFD counts the open parcels by free capacity (an integer from 0 to the capacity) in
+a segment tree over those values, so the tightest fitting parcel is found in O(log capacity).
+Both are O(n log n) overall, dominated by sorting the items.
+"""
+import time
+from array import array
+
+PARCEL_CAPACITY = 20  # kg
+MIN_ITEM_WEIGHT = 1
+MAX_ITEM_WEIGHT = 10
+
+
+class ReadReport:
+    """Item weights read from a file, and how many values were skipped."""
+
+    def __init__(self):
+        self.weights = array("I")
+        self.invalid = 0  # Not an integer
+        self.out_of_range = 0  # Outside MIN_ITEM_WEIGHT..MAX_ITEM_WEIGHT
+        self.stopped = False  # A weight of 0 ended the list
+
+
+def read_weights(stream, limit=None):
+    """
+    Reads whitespace-separated item weights from a text stream, line by line.
+    Like the interactive program, a weight of 0 ends the list and invalid or out-of-range values are skipped.
+    At most limit weights are read when limit is given.
+    """
+    report = ReadReport()
+    weights = report.weights
+    for line in stream:
+        for token in line.split():
+            try:
+                weight = int(token)
+            except ValueError:
+                report.invalid += 1
+                continue
+            if weight == 0:
+                report.stopped = True
+                return report
+            if weight < MIN_ITEM_WEIGHT or weight > MAX_ITEM_WEIGHT:
+                report.out_of_range += 1
+                continue
+            weights.append(weight)
+            if limit is not None and len(weights) >= limit:
+                return report
+    return report
+
+
+class PackingResult:
+    """Loads of the parcels in the order they were opened, and how long packing took."""
+
+    def __init__(self, algorithm, capacity, loads, items, elapsed):
+        self.algorithm = algorithm
+        self.capacity = capacity
+        self.loads = loads
+        self.items = items
+        self.elapsed = elapsed
+
+    @property
+    def parcels(self):
+        return len(self.loads)
+
+    @property
+    def total_weight(self):
+        return sum(self.loads)
+
+    @property
+    def unused_capacity(self):
+        return self.parcels * self.capacity - self.total_weight
+
+    def unused_capacities(self):
+        """Unused capacity of every parcel, in parcel order."""
+        capacity = self.capacity
+        return [capacity - load for load in self.loads]
+
+
+# --- Algorithms ---
+# Every algorithm takes the item weights (integers from 1 to capacity) and returns the parcel loads as an array.
+
+def next_fit(weights, capacity=PARCEL_CAPACITY):
+    loads = array("I")
+    load = 0
+    for weight in weights:
+        if load + weight > capacity:
+            loads.append(load)
+            load = weight
+        else:
+            load += weight
+    if load > 0:
+        loads.append(load)
+    return loads
+
+
+def first_fit_decreasing(weights, capacity=PARCEL_CAPACITY):
+    items = sorted(weights, reverse=True)
+    if not items:
+        return array("I")
+    # Every parcel after the first one is opened because the item did not fit into the previous parcels,
+    # so any two consecutive parcels hold more than the capacity: there are at most 2 * total / capacity + 1
+    max_parcels = min(len(items), 2 * sum(items) // capacity + 1)
+    size = 1
+    while size < max_parcels:
+        size *= 2
+    # Leaves hold the free capacity of the parcels; unopened parcels are empty, so the first parcel
+    # with enough room is either an open one or the next one to open
+    tree = [capacity] * (2 * size)
+    opened = 0
+    for weight in items:
+        node = 1
+        while node < size:
+            node *= 2
+            if tree[node] < weight:
+                node += 1
+        tree[node] -= weight
+        if node - size >= opened:
+            opened = node - size + 1
+        node //= 2
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            best = left if left > right else right
+            if tree[node] == best:
+                break
+            tree[node] = best
+            node //= 2
+    return array("I", (capacity - free for free in tree[size:size + opened]))
+
+
+class _ResidualTree:
+    """Number of open parcels for every free capacity from 0 to capacity, as a segment tree of counts."""
+
+    def __init__(self, capacity):
+        self.size = 1
+        while self.size < capacity + 1:
+            self.size *= 2
+        self.tree = [0] * (2 * self.size)
+
+    def add(self, free, delta):
+        node = free + self.size
+        tree = self.tree
+        while node:
+            tree[node] += delta
+            node //= 2
+
+    def find_at_least(self, free):
+        """Returns the smallest free capacity >= free that some open parcel has, or None."""
+        tree, size = self.tree, self.size
+        node = free + size
+        if tree[node]:
+            return free
+        while node > 1:
+            # From a left child, the subtree on the right covers the next larger values
+            if not node & 1 and tree[node + 1]:
+                node += 1
+                while node < size:
+                    node *= 2
+                    if not tree[node]:
+                        node += 1
+                return node - size
+            node //= 2
+        return None
+
+
+def best_fit_decreasing(weights, capacity=PARCEL_CAPACITY):
+    loads = array("I")
+    residuals = _ResidualTree(capacity)
+    parcels_by_free = [[] for _ in range(capacity + 1)]  # Open parcels (indexes in loads) by free capacity
+    for weight in sorted(weights, reverse=True):
+        free = residuals.find_at_least(weight)
+        if free is None:
+            parcel = len(loads)
+            loads.append(weight)
+        else:
+            parcel = parcels_by_free[free].pop()
+            residuals.add(free, -1)
+            loads[parcel] += weight
+        free = capacity - loads[parcel]
+        if free:  # A full parcel never takes another item
+            parcels_by_free[free].append(parcel)
+            residuals.add(free, 1)
+    return loads
+
+
+ALGORITHMS = {
+    "next-fit": next_fit,
+    "ffd": first_fit_decreasing,
+    "bfd": best_fit_decreasing,
+}
+
+
+def pack(weights, algorithm="next-fit", capacity=PARCEL_CAPACITY):
+    """Packs the weights with the named algorithm and returns a PackingResult."""
+    start = time.perf_counter()
+    loads = ALGORITHMS[algorithm](weights, capacity)
+    return PackingResult(algorithm, capacity, loads, len(weights), time.perf_counter() - start)
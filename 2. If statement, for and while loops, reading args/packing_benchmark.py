@@ -0,0 +1,106 @@
+"""
+Benchmark and check of the packing algorithms.
+
+Random shifts of item weights are packed with every algorithm and the results are checked:
+- every parcel holds at most the capacity and the parcels hold exactly the weight of the items;
+- no algorithm uses fewer parcels than the lower bound ceil(total / capacity);
+- FFD and BFD give the same parcels as straightforward implementations that scan all open parcels
+  for every item (checked on small shifts, where the scans are affordable), and never use more parcels
+  than next-fit.
+The scans are also timed on a medium shift to show what the segment trees save.
+
+Usage: python packing_benchmark.py [largest_shift]
+"""
+import random
+import sys
+import time
+
+from packing import ALGORITHMS, MAX_ITEM_WEIGHT, MIN_ITEM_WEIGHT, PARCEL_CAPACITY, pack
+
+SCAN_CHECK_SHIFTS = 200
+SCAN_TIMING_ITEMS = 20000
+
+
+def scan_first_fit_decreasing(weights, capacity):
+    loads = []
+    for weight in sorted(weights, reverse=True):
+        for parcel, load in enumerate(loads):
+            if load + weight <= capacity:
+                loads[parcel] += weight
+                break
+        else:
+            loads.append(weight)
+    return loads
+
+
+def scan_best_fit_decreasing(weights, capacity):
+    loads = []
+    for weight in sorted(weights, reverse=True):
+        best = None
+        for parcel, load in enumerate(loads):
+            if load + weight <= capacity and (best is None or load > loads[best]):
+                best = parcel
+        if best is None:
+            loads.append(weight)
+        else:
+            loads[best] += weight
+    return loads
+
+
+def random_weights(rng, count):
+    return [rng.randint(MIN_ITEM_WEIGHT, MAX_ITEM_WEIGHT) for _ in range(count)]
+
+
+def main():
+    largest_shift = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    rng = random.Random(24)
+    errors = []
+
+    # Parcels with equal loads are interchangeable, so BFD is compared as a multiset of loads
+    for _ in range(SCAN_CHECK_SHIFTS):
+        weights = random_weights(rng, rng.randint(0, 300))
+        if list(pack(weights, "ffd").loads) != scan_first_fit_decreasing(weights, PARCEL_CAPACITY):
+            errors.append(f"ffd differs from the scan for {weights}")
+            break
+        if sorted(pack(weights, "bfd").loads) != sorted(scan_best_fit_decreasing(weights, PARCEL_CAPACITY)):
+            errors.append(f"bfd differs from the scan for {weights}")
+            break
+
+    weights = random_weights(rng, SCAN_TIMING_ITEMS)
+    for name, scan in (("ffd", scan_first_fit_decreasing), ("bfd", scan_best_fit_decreasing)):
+        start = time.perf_counter()
+        scan(weights, PARCEL_CAPACITY)
+        scan_time = time.perf_counter() - start
+        tree_time = pack(weights, name).elapsed
+        print(f"{name} on {SCAN_TIMING_ITEMS} items: scanning all parcels {scan_time * 1000:.0f} ms, "
+              f"segment tree {tree_time * 1000:.0f} ms")
+
+    print(f"{'items':>10} {'algorithm':>10} {'parcels':>10} {'unused, kg':>12} {'time, ms':>10} {'items/s':>12}")
+    count = 10 ** 4
+    while count <= largest_shift:
+        weights = random_weights(rng, count)
+        total = sum(weights)
+        lower_bound = -(-total // PARCEL_CAPACITY)
+        results = {name: pack(weights, name) for name in ALGORITHMS}
+        for name, result in results.items():
+            print(f"{count:>10} {name:>10} {result.parcels:>10} {result.unused_capacity:>12} "
+                  f"{result.elapsed * 1000:>10.1f} {count / max(result.elapsed, 1e-9):>12.0f}")
+            if max(result.loads) > PARCEL_CAPACITY or result.total_weight != total:
+                errors.append(f"{name} on {count} items: parcels overloaded or weight lost")
+            if result.parcels < lower_bound:
+                errors.append(f"{name} on {count} items: {result.parcels} parcels is below the lower bound")
+        for name in ("ffd", "bfd"):
+            if results[name].parcels > results["next-fit"].parcels:
+                errors.append(f"{name} on {count} items uses more parcels than next-fit")
+        count *= 10
+
+    if errors:
+        print("Invariants violated:")
+        for error in errors:
+            print(f"- {error}")
+        sys.exit(1)
+    print("All packings are valid and FFD/BFD match the parcel scans.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark and check of the NumPy shift statistics.
+
+Large shifts are packed with next-fit, and the end-of-shift report is computed twice: with Python loops
+over the list of unused capacities, the way the interactive program does it, and with ShiftStatistics.
+The two must agree on every number: parcels, totals, the largest unused capacity and the parcels that
+have it, the histogram of unused capacity and the load percentiles. The same is done for a comparison
+of many shifts at once.
+
+Usage: python report_benchmark.py [parcels_per_shift] [shifts]
+"""
+import random
+import sys
+import time
+from array import array
+
+from packing import MAX_ITEM_WEIGHT, MIN_ITEM_WEIGHT, PARCEL_CAPACITY, next_fit
+from shift_report import REPORT_PERCENTILES, ShiftStatistics
+
+ITEMS_PER_PARCEL = 3.05  # Next-fit puts about 3 items of 1-10 kg into a 20 kg parcel
+
+
+def python_report(loads, capacity=PARCEL_CAPACITY):
+    """The report of one shift computed with Python lists and loops."""
+    unused_capacities = [capacity - load for load in loads]
+    max_unused = max(unused_capacities) if unused_capacities else 0
+    max_unused_numbers = []
+    for i in range(len(unused_capacities)):
+        if unused_capacities[i] == max_unused:
+            max_unused_numbers.append(i + 1)
+    histogram = [0] * (capacity + 1)
+    for unused in unused_capacities:
+        histogram[unused] += 1
+    ordered = sorted(loads)
+    percentiles = []
+    for q in REPORT_PERCENTILES:
+        # The smallest load that at least q% of the parcels do not exceed
+        rank = max(-(-q * len(ordered) // 100), 1)
+        percentiles.append(ordered[rank - 1] if ordered else 0)
+    return {"parcels": len(loads), "total_weight": sum(loads), "total_unused": sum(unused_capacities),
+            "max_unused": max_unused, "max_unused_parcels": max_unused_numbers, "histogram": histogram,
+            "percentiles": percentiles}
+
+
+def numpy_reports(stats):
+    """The same reports taken from ShiftStatistics, one per shift."""
+    max_unused_parcels = stats.max_unused_parcels()
+    percentiles = stats.load_percentiles()
+    return [{"parcels": int(stats.parcels[i]), "total_weight": int(stats.total_weight[i]),
+             "total_unused": int(stats.total_unused[i]), "max_unused": int(stats.max_unused[i]),
+             "max_unused_parcels": max_unused_parcels[i].tolist(), "histogram": stats.unused_histograms[i].tolist(),
+             "percentiles": percentiles[i].tolist()} for i in range(len(stats))]
+
+
+def pack_shift(rng, parcels):
+    """Packs random items with next-fit until the shift has about the given number of parcels."""
+    weights = array("I", (rng.randint(MIN_ITEM_WEIGHT, MAX_ITEM_WEIGHT) for _ in range(int(parcels * ITEMS_PER_PARCEL))))
+    return next_fit(weights)
+
+
+def measure(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parcels = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    shift_count = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    rng = random.Random(25)
+    errors = []
+
+    large_shift = pack_shift(rng, parcels)
+    many_shifts = [pack_shift(rng, parcels // 10) for _ in range(shift_count)]
+    for title, shifts in ((f"1 shift, {len(large_shift)} parcels", [large_shift]),
+                          (f"{shift_count} shifts, {sum(map(len, many_shifts))} parcels", many_shifts)):
+        expected, python_time = measure(lambda: [python_report(loads) for loads in shifts])
+        actual, numpy_time = measure(lambda: numpy_reports(ShiftStatistics(shifts)))
+        print(f"{title}: Python loops {python_time * 1000:.0f} ms, NumPy {numpy_time * 1000:.1f} ms "
+              f"({python_time / numpy_time:.0f}x)")
+        for i, (python_result, numpy_result) in enumerate(zip(expected, actual)):
+            for key, value in python_result.items():
+                if numpy_result[key] != value:
+                    errors.append(f"{title}, shift {i + 1}: {key} differs")
+
+    # Edge cases: no shifts, an empty shift, full parcels only
+    edge_shifts = [array("I"), array("I", [PARCEL_CAPACITY] * 5), array("I", [1])]
+    if numpy_reports(ShiftStatistics(edge_shifts)) != [python_report(loads) for loads in edge_shifts] \
+            or ShiftStatistics([]).max_unused_parcels() != []:
+        errors.append("edge cases differ")
+
+    if errors:
+        print("Invariants violated:")
+        for error in errors[:20]:
+            print(f"- {error}")
+        sys.exit(1)
+    print("The NumPy reports match the Python loops.")
+
+
+if __name__ == "__main__":
+    main()
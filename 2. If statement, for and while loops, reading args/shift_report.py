@@ -0,0 +1,64 @@
+"""
+End-of-shift statistics of packed parcels, computed with NumPy.
+
+The parcel loads of any number of shifts are kept in one array (plus the unused capacity of every parcel
+and the shift it belongs to), and every statistic is computed for all shifts at once without Python loops:
+totals, the largest unused capacity and the parcels that have it, histograms of unused capacity
+and percentiles of the parcel loads. Loads are integers from 0 to the capacity, so the histograms are
+exact bincounts and the percentiles are read from their cumulative sums (the "inverted_cdf" definition
+of numpy.percentile: the smallest load that at least q% of the parcels do not exceed).
+"""
+import numpy as np
+
+from packing import PARCEL_CAPACITY
+
+REPORT_PERCENTILES = (50, 90, 99)
+
+
+class ShiftStatistics:
+    """Statistics of one or more shifts; shifts is a list with the parcel loads of every shift."""
+
+    def __init__(self, shifts, capacity=PARCEL_CAPACITY, names=None):
+        self.capacity = capacity
+        self.names = list(names) if names is not None else [f"shift {i + 1}" for i in range(len(shifts))]
+        self.parcels = np.fromiter((len(loads) for loads in shifts), dtype=np.int64, count=len(shifts))
+        # Loads never exceed the capacity, so 32-bit integers are enough and halve the memory traffic
+        self.loads = np.concatenate([np.asarray(loads) for loads in shifts]).astype(np.int32) \
+            if shifts else np.zeros(0, dtype=np.int32)
+        self.unused = capacity - self.loads
+        self.shift_of_parcel = np.repeat(np.arange(len(shifts), dtype=np.int32), self.parcels)
+        self.first_parcel = np.cumsum(self.parcels) - self.parcels  # Position of every shift in self.loads
+
+        width = capacity + 1
+        # Row = shift, column = unused capacity in kg
+        self.unused_histograms = np.bincount(self.shift_of_parcel * width + self.unused,
+                                             minlength=len(shifts) * width).reshape(len(shifts), width)
+        self.total_weight = self.unused_histograms[:, ::-1] @ np.arange(width)
+        self.total_unused = self.unused_histograms @ np.arange(width)
+        # The largest column with parcels in it; 0 for a shift without parcels
+        has_parcels = self.unused_histograms > 0
+        self.max_unused = np.where(self.parcels > 0, capacity - np.argmax(has_parcels[:, ::-1], axis=1), 0)
+        self.max_unused_count = self.unused_histograms[np.arange(len(shifts)), self.max_unused] * (self.parcels > 0)
+
+    def __len__(self):
+        return len(self.parcels)
+
+    def max_unused_parcels(self):
+        """Numbers (counted from 1 within the shift) of the parcels with the largest unused capacity, per shift."""
+        if not len(self):
+            return []
+        at_max = np.flatnonzero(self.unused == self.max_unused[self.shift_of_parcel])
+        numbers = at_max - self.first_parcel[self.shift_of_parcel[at_max]] + 1
+        return np.split(numbers, np.cumsum(self.max_unused_count)[:-1])
+
+    def load_percentiles(self, percentiles=REPORT_PERCENTILES):
+        """Parcel load percentiles in kg: one row per shift, one column per percentile; 0 for an empty shift."""
+        cumulative = np.cumsum(self.unused_histograms[:, ::-1], axis=1)  # Column = load in kg
+        thresholds = np.asarray(percentiles, dtype=np.float64)[:, None, None] / 100 * self.parcels[None, :, None]
+        reached = (cumulative[None, :, :] >= thresholds) & (cumulative[None, :, :] > 0)
+        return np.where(self.parcels[:, None] > 0, np.argmax(reached, axis=2).T, 0)
+
+    def fill_rate(self):
+        """Share of the parcel capacity that is used, per shift."""
+        capacity = self.parcels * self.capacity
+        return np.divide(self.total_weight, capacity, out=np.zeros(len(self)), where=capacity > 0)
@@ -0,0 +1,109 @@
+"""
+Benchmark of bulk roster import/export and of the registry snapshot.
+
+A roster with many students (10^6 by default), teachers and homeroom teachers is written as CSV and JSONL,
+then the script measures rows/s for importing each file into an empty registry, exporting it again,
+and saving/loading the snapshot, and checks that nothing is lost on the way:
+- an imported registry exports exactly the rows it was imported from;
+- a registry loaded from the snapshot exports the same rows and answers queries the same way.
+
+Usage: python import_benchmark.py [students]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from roster_io import export_roster, import_roster, iter_registry_rows, load_snapshot, save_snapshot
+from school_registry import Student, Teacher, HomeroomTeacher, SchoolRegistry
+
+CLASS_COUNT = 2000
+TEACHER_COUNT = 5000
+SUBJECTS = ["math", "physics", "history", "biology", "english", "art"]
+
+
+def build_registry(student_count):
+    rng = random.Random(23)
+    class_names = [f"{i // 26 + 1}{chr(ord('A') + i % 26)}" for i in range(CLASS_COUNT)]
+    registry = SchoolRegistry()
+    for i in range(student_count):
+        registry.add_student(Student(f"Student{i}", f"Surname{i % 50000}", rng.choice(class_names)))
+    for i in range(TEACHER_COUNT):
+        classes = [rng.choice(class_names) for _ in range(6)]
+        registry.add_teacher(Teacher(f"Teacher{i}", f"Surname{i}", SUBJECTS[i % len(SUBJECTS)], classes))
+    for i, class_name in enumerate(class_names):
+        registry.add_homeroom_teacher(HomeroomTeacher(f"Homeroom{i}", f"Surname{i}", class_name))
+    return registry, class_names
+
+
+def same_answers(registry, other, class_names):
+    """Compares a sample of queries answered by two registries."""
+    for class_name in class_names[:50]:
+        if [str(s) for s in registry.students_in_class(class_name)] != \
+                [str(s) for s in other.students_in_class(class_name)]:
+            return False
+        if str(registry.homeroom_teacher_of(class_name)) != str(other.homeroom_teacher_of(class_name)):
+            return False
+        if [str(t) for t in registry.teachers_of_class(class_name)] != \
+                [str(t) for t in other.teachers_of_class(class_name)]:
+            return False
+    return all(str(registry.find_student(s.first_name, s.last_name)) == str(other.find_student(s.first_name, s.last_name))
+               for s in registry.students[::max(len(registry.students) // 100, 1)])
+
+
+def rate(rows, seconds):
+    return f"{seconds:>8.2f} s {rows / max(seconds, 1e-9):>10.0f} rows/s"
+
+
+def run(student_count, work_dir):
+    """Runs the measurements with the files in work_dir and returns the violated invariants."""
+    registry, class_names = build_registry(student_count)
+    expected_rows = list(iter_registry_rows(registry))
+    print(f"{len(expected_rows)} rows ({student_count} students), files in {work_dir}")
+
+    errors = []
+    for extension in (".csv", ".jsonl"):
+        path = os.path.join(work_dir, "roster" + extension)
+        rows, elapsed = export_roster(registry, path)
+        print(f"export {extension:<6} {rate(rows, elapsed)} {os.path.getsize(path) / 2 ** 20:>8.1f} MB")
+
+        imported = SchoolRegistry()
+        report = import_roster(imported, path)
+        print(f"import {extension:<6} {rate(report.rows, report.elapsed)}")
+        if report.skipped or list(iter_registry_rows(imported)) != expected_rows:
+            errors.append(f"{extension}: the imported registry differs from the exported one")
+        if not same_answers(registry, imported, class_names):
+            errors.append(f"{extension}: the imported registry answers queries differently")
+
+    snapshot_path = os.path.join(work_dir, "school_registry.snapshot")
+    start = time.perf_counter()
+    save_snapshot(registry, snapshot_path)
+    print(f"snapshot save {rate(len(expected_rows), time.perf_counter() - start)} "
+          f"{os.path.getsize(snapshot_path) / 2 ** 20:>8.1f} MB")
+    start = time.perf_counter()
+    loaded = load_snapshot(snapshot_path)
+    print(f"snapshot load {rate(len(expected_rows), time.perf_counter() - start)}")
+    if loaded is None or list(iter_registry_rows(loaded)) != expected_rows:
+        errors.append("the registry loaded from the snapshot differs from the saved one")
+    elif not same_answers(registry, loaded, class_names):
+        errors.append("the registry loaded from the snapshot answers queries differently")
+
+    return errors
+
+
+def main():
+    student_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    # The files take about 100 MB at 10^6 students; the directory is removed when the benchmark ends
+    with tempfile.TemporaryDirectory(prefix="school_roster_") as work_dir:
+        errors = run(student_count, work_dir)
+    if errors:
+        print("Invariants violated:")
+        for error in errors:
+            print(f"- {error}")
+        sys.exit(1)
+    print("Imports and the snapshot reproduce the registry exactly.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,22 @@
-#Initialization of classes
-class Student:
-    def __init__(self, first_name, last_name, class_name):
-        self.first_name = first_name
-        self.last_name = last_name
-        self.class_name = class_name
+import time
 
-    def __str__(self):
-        return f"Student: {self.first_name} {self.last_name}, Class: {self.class_name}"
-
-class Teacher:
-    def __init__(self, first_name, last_name, subject, classes_taught=None):
-        self.first_name = first_name
-        self.last_name = last_name
-        self.subject = subject
-        self.classes_taught = classes_taught if classes_taught is not None else []
-
-    def __str__(self):
-        return f"Teacher: {self.first_name} {self.last_name}, Subject: {self.subject}, Classes: {', '.join(self.classes_taught)}"
-
-class HomeroomTeacher:
-    def __init__(self, first_name, last_name, homeroom_class):
-        self.first_name = first_name
-        self.last_name = last_name
-        self.homeroom_class = homeroom_class
-
-    def __str__(self):
-        return f"Homeroom teacher: {self.first_name} {self.last_name}, Class: {self.homeroom_class}"
+from school_registry import Student, Teacher, HomeroomTeacher, SchoolRegistry
+from roster_io import SNAPSHOT_FILE, export_roster, import_roster, load_snapshot, save_snapshot
 
 
 #Initialization of variables
-students = []
-teachers = []
-homeroom_teachers = []
+start = time.perf_counter()
+registry = load_snapshot(SNAPSHOT_FILE)
+if registry is not None:
+    print(f"Loaded {len(registry.students)} students, {len(registry.teachers)} teachers and "
+          f"{len(registry.homeroom_teachers)} homeroom teachers from {SNAPSHOT_FILE} "
+          f"in {time.perf_counter() - start:.2f} s.")
+else:
+    registry = SchoolRegistry()
 command = ""
 
 while True:
-    print("Available commands: create, manage, end")
+    print("Available commands: create, manage, import, export, end")
     command = input("Enter the command: ").lower()
 
     if command == "create":
@@ -46,7 +27,7 @@ while True:
             first_name = input("Enter the student's name: ")
             last_name = input("Enter the student's last name: ")
             class_name = input("Enter the class name (example 4C): ")
-            students.append(Student(first_name, last_name, class_name))
+            registry.add_student(Student(first_name, last_name, class_name))
             print(f"Student {first_name} {last_name} added to class {class_name}.")
 
         elif user_type == "teacher":
@@ -60,14 +41,14 @@ while True:
                 if not class_name:
                     break
                 classes.append(class_name.upper())
-            teachers.append(Teacher(first_name, last_name, subject, classes))
+            registry.add_teacher(Teacher(first_name, last_name, subject, classes))
             print(f"Teacher {first_name} {last_name} by subject {subject} teaches classes: {', '.join(classes)}.")
 
         elif user_type == "homeroom teacher":
             first_name = input("Enter the name of the homeroom teacher: ")
             last_name = input("Enter the class teacher's last name: ")
             homeroom_class = input("Enter the name of the class that the class teacher teaches (example: 1B): ")
-            homeroom_teachers.append(HomeroomTeacher(first_name, last_name, homeroom_class.upper()))
+            registry.add_homeroom_teacher(HomeroomTeacher(first_name, last_name, homeroom_class.upper()))
             print(f"Homeroom teacher {first_name} {last_name} teaches a class {homeroom_class.upper()}.")
 
         elif user_type == "end":
@@ -83,8 +64,8 @@ while True:
 
         if manage_type == 'class':
             class_name_to_display = input("Enter the class name to display (e.g., 1B): ").upper()
-            students_in_class = [s for s in students if s.class_name == class_name_to_display]
-            homeroom_teacher_of_class = next((ht for ht in homeroom_teachers if ht.homeroom_class == class_name_to_display), None)
+            students_in_class = registry.students_in_class(class_name_to_display)
+            homeroom_teacher_of_class = registry.homeroom_teacher_of(class_name_to_display)
 
             print(f"\nInformation for class {class_name_to_display}:")
             if students_in_class:
@@ -103,18 +84,13 @@ while True:
             student_name_to_find = input("Enter the student's first and last name (example: John Doe): ").split()
             if len(student_name_to_find) == 2:
                 first_name_to_find, last_name_to_find = student_name_to_find
-                found_student = None
-                for s in students:
-                    if s.first_name == first_name_to_find and s.last_name == last_name_to_find:
-                        found_student = s
-                        break
+                found_student = registry.find_student(first_name_to_find, last_name_to_find)
                 if found_student:
                     print(f"\nInformation for student {found_student.first_name} {found_student.last_name}:")
                     print(f"Class: {found_student.class_name}")
                     teachers_of_student = set()
-                    for teacher in teachers:
-                        if found_student.class_name in teacher.classes_taught:
-                            teachers_of_student.add(f"{teacher.first_name} {teacher.last_name} ({teacher.subject})")
+                    for teacher in registry.teachers_of_class(found_student.class_name):
+                        teachers_of_student.add(f"{teacher.first_name} {teacher.last_name} ({teacher.subject})")
                     if teachers_of_student:
                         print("Teachers:")
                         for teacher_info in teachers_of_student:
@@ -131,11 +107,7 @@ while True:
             teacher_name_to_find = input("Enter the teacher's first and last name (example: Jane Doe): ").split()
             if len(teacher_name_to_find) == 2:
                 first_name_to_find, last_name_to_find = teacher_name_to_find
-                found_teacher = None
-                for t in teachers:
-                    if t.first_name == first_name_to_find and t.last_name == last_name_to_find:
-                        found_teacher = t
-                        break
+                found_teacher = registry.find_teacher(first_name_to_find, last_name_to_find)
                 if found_teacher:
                     print(f"\nInformation for teacher {found_teacher.first_name} {found_teacher.last_name}:")
                     if found_teacher.classes_taught:
@@ -153,14 +125,10 @@ while True:
             ht_name_to_find = input("Enter the homeroom teacher's first and last name (example Peter Brown): ").split()
             if len(ht_name_to_find) == 2:
                 first_name_to_find, last_name_to_find = ht_name_to_find
-                found_ht = None
-                for ht in homeroom_teachers:
-                    if ht.first_name == first_name_to_find and ht.last_name == last_name_to_find:
-                        found_ht = ht
-                        break
+                found_ht = registry.find_homeroom_teacher(first_name_to_find, last_name_to_find)
                 if found_ht:
                     print(f"\nInformation for homeroom teacher {found_ht.first_name} {found_ht.last_name}:")
-                    students_in_homeroom_class = [s for s in students if s.class_name == found_ht.homeroom_class]
+                    students_in_homeroom_class = registry.students_in_class(found_ht.homeroom_class)
                     if students_in_homeroom_class:
                         print(f"Students in class {found_ht.homeroom_class}:")
                         for student in students_in_homeroom_class:
@@ -173,7 +141,28 @@ while True:
                 print(
                     "Incorrect input of first and last name. Please enter the first and last name separated by a space.")
 
+    elif command == "import":
+        path = input("Enter the roster file to import (.csv or .jsonl): ")
+        try:
+            import_roster(registry, path).print_summary(path)
+        except (OSError, ValueError, UnicodeDecodeError) as error:
+            print(f"Import failed: {error}")
+
+    elif command == "export":
+        path = input("Enter the roster file to export to (.csv or .jsonl): ")
+        try:
+            rows, elapsed = export_roster(registry, path)
+            print(f"Exported {rows} rows to {path} in {elapsed:.2f} s ({rows / max(elapsed, 1e-9):.0f} rows/s).")
+        except (OSError, ValueError) as error:
+            print(f"Export failed: {error}")
+
     elif command == "end":
+        start = time.perf_counter()
+        try:
+            save_snapshot(registry, SNAPSHOT_FILE)
+            print(f"Saved the registry to {SNAPSHOT_FILE} in {time.perf_counter() - start:.2f} s.")
+        except OSError as error:
+            print(f"Could not save the registry: {error}")
         print("End of program")
         break
 
@@ -0,0 +1,144 @@
+"""
+Memory benchmark of the ways a large roster of students can be held in memory.
+
+Every variant runs in its own process, which builds the roster and reports how much its peak RSS grew:
+- "dict"   - the person classes as they were before __slots__ (a __dict__ per instance, a new class name string per student);
+- "slots"  - the current Student class (__slots__, interned class names);
+- "roster" - StudentRoster, parallel arrays of name codes with every distinct name stored once
+             (struct of arrays; not used by the registry, kept here as the most compact layout to compare with).
+Names are built with f-strings for every row, like rows read from a file, so repeated names are separate
+objects unless the storage deduplicates them. The roster is also read back and compared with the input.
+
+Usage: python memory_benchmark.py [students]
+"""
+import resource
+import subprocess
+import sys
+import time
+from array import array
+
+from school_registry import Student
+
+VARIANTS = ("dict", "slots", "roster")
+FIRST_NAMES = 2000
+LAST_NAMES = 20000
+CLASS_COUNT = 2000
+
+
+class DictStudent:
+    """Student as it was before __slots__, kept here as the baseline."""
+
+    def __init__(self, first_name, last_name, class_name):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.class_name = class_name
+
+
+class StringTable:
+    """Stores every distinct string once and gives it a small integer code (0, 1, 2, ... in order of arrival)."""
+    __slots__ = ("_strings", "_codes")
+
+    def __init__(self):
+        self._strings = []
+        self._codes = {}
+
+    def code(self, value):
+        """Returns the code of value, adding it to the table first if it is new."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def __getitem__(self, code):
+        return self._strings[code]
+
+
+class StudentRoster:
+    """
+    Students stored as three parallel arrays of 4-byte codes (first name, last name, class name),
+    about 12 bytes per student plus one copy of every distinct name.
+    Student objects are created only when the roster is read.
+    """
+
+    def __init__(self):
+        self.first_names = StringTable()
+        self.last_names = StringTable()
+        self.class_names = StringTable()
+        self._first_codes = array("I")
+        self._last_codes = array("I")
+        self._class_codes = array("I")
+
+    def append(self, first_name, last_name, class_name):
+        self._first_codes.append(self.first_names.code(first_name))
+        self._last_codes.append(self.last_names.code(last_name))
+        self._class_codes.append(self.class_names.code(class_name))
+
+    def __len__(self):
+        return len(self._class_codes)
+
+    def __iter__(self):
+        first_names, last_names, class_names = self.first_names, self.last_names, self.class_names
+        for first_code, last_code, class_code in zip(self._first_codes, self._last_codes, self._class_codes):
+            yield Student(first_names[first_code], last_names[last_code], class_names[class_code])
+
+
+def generate_rows(count):
+    for i in range(count):
+        class_number = i * 7 % CLASS_COUNT
+        yield f"First{i * 31 % FIRST_NAMES}", f"Last{i * 17 % LAST_NAMES}", \
+            f"{class_number // 26 + 1}{chr(ord('A') + class_number % 26)}"
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kilobytes
+
+
+def run_variant(variant, count):
+    """Builds the roster in this process and prints "<rss growth in bytes> <seconds>"."""
+    rss_before = peak_rss_bytes()
+    start = time.perf_counter()
+    if variant == "roster":
+        roster = StudentRoster()
+        for row in generate_rows(count):
+            roster.append(*row)
+    else:
+        cls = Student if variant == "slots" else DictStudent
+        roster = [cls(*row) for row in generate_rows(count)]
+    elapsed = time.perf_counter() - start
+    rss_growth = peak_rss_bytes() - rss_before
+
+    for student, row in zip(roster, generate_rows(count)):
+        if (student.first_name, student.last_name, student.class_name) != row:
+            print(f"Row {row} was read back as {student}", file=sys.stderr)
+            sys.exit(1)
+    if len(roster) != count:
+        print(f"{len(roster)} students stored instead of {count}", file=sys.stderr)
+        sys.exit(1)
+    print(rss_growth, elapsed)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    print(f"{count} students, {FIRST_NAMES} first names, {LAST_NAMES} last names, {CLASS_COUNT} classes")
+    print(f"{'variant':>8} {'RSS, MB':>10} {'MB per 10^6':>12} {'bytes/student':>14} {'build, s':>9}")
+    baseline = None
+    for variant in VARIANTS:
+        result = subprocess.run([sys.executable, __file__, "--variant", variant, str(count)],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"{variant}: {result.stderr.strip()}")
+            sys.exit(1)
+        rss_growth, elapsed = result.stdout.split()
+        rss_growth, elapsed = int(rss_growth), float(elapsed)
+        baseline = baseline or rss_growth
+        print(f"{variant:>8} {rss_growth / 2 ** 20:>10.1f} {rss_growth / count * 10 ** 6 / 2 ** 20:>12.1f} "
+              f"{rss_growth / count:>14.1f} {elapsed:>9.2f}   ({rss_growth / baseline:.0%} of dict)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--variant":
+        run_variant(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
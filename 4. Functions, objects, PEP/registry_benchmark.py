@@ -0,0 +1,115 @@
+"""
+Benchmark of the indexed SchoolRegistry against the linear scans main.py used before.
+
+A registry with many students (10^6 by default), a few thousand teachers and one homeroom teacher
+per class is filled, then the same queries are answered both ways and the results are compared:
+- find a student / teacher / homeroom teacher by first and last name;
+- list the students and the homeroom teacher of a class;
+- list the teachers of a student's class.
+
+Usage: python registry_benchmark.py [students] [queries]
+"""
+import random
+import sys
+import time
+
+from school_registry import Student, Teacher, HomeroomTeacher, SchoolRegistry
+
+CLASS_COUNT = 2000
+TEACHER_COUNT = 5000
+CLASSES_PER_TEACHER = 6
+SUBJECTS = ["math", "physics", "history", "biology", "english", "art"]
+
+
+# --- Queries as main.py answered them before the registry (one scan per query) ---
+def scan_find(people, first_name, last_name):
+    for person in people:
+        if person.first_name == first_name and person.last_name == last_name:
+            return person
+    return None
+
+
+def scan_students_in_class(students, class_name):
+    return [s for s in students if s.class_name == class_name]
+
+
+def scan_homeroom_teacher_of(homeroom_teachers, class_name):
+    return next((ht for ht in homeroom_teachers if ht.homeroom_class == class_name), None)
+
+
+def scan_teachers_of_class(teachers, class_name):
+    return [t for t in teachers if class_name in t.classes_taught]
+
+
+def build_registry(student_count):
+    rng = random.Random(21)
+    class_names = [f"{i // 26 + 1}{chr(ord('A') + i % 26)}" for i in range(CLASS_COUNT)]
+    registry = SchoolRegistry()
+    for i in range(student_count):
+        registry.add_student(Student(f"Student{i}", f"Surname{i % 50000}", rng.choice(class_names)))
+    for i in range(TEACHER_COUNT):
+        classes = [rng.choice(class_names) for _ in range(CLASSES_PER_TEACHER)]
+        registry.add_teacher(Teacher(f"Teacher{i}", f"Surname{i}", SUBJECTS[i % len(SUBJECTS)], classes))
+    for i, class_name in enumerate(class_names):
+        registry.add_homeroom_teacher(HomeroomTeacher(f"Homeroom{i}", f"Surname{i}", class_name))
+    return registry, class_names, rng
+
+
+def measure(func, arguments):
+    start = time.perf_counter()
+    results = [func(*args) for args in arguments]
+    return results, time.perf_counter() - start
+
+
+def main():
+    student_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    start = time.perf_counter()
+    registry, class_names, rng = build_registry(student_count)
+    build_time = time.perf_counter() - start
+    print(f"{student_count} students, {TEACHER_COUNT} teachers, {CLASS_COUNT} classes "
+          f"added in {build_time:.2f} s ({student_count / build_time:.0f} students/s)")
+
+    student_names = [(s.first_name, s.last_name)
+                     for s in rng.sample(registry.students, query_count)] + [("Nobody", "Here")]
+    teacher_names = [(t.first_name, t.last_name) for t in rng.sample(registry.teachers, query_count)]
+    homeroom_names = [(ht.first_name, ht.last_name) for ht in rng.sample(registry.homeroom_teachers, query_count)]
+    classes = [(c,) for c in rng.sample(class_names, query_count)] + [("99Z",)]
+
+    queries = [
+        ("find student", student_names,
+         lambda f, l: scan_find(registry.students, f, l), registry.find_student),
+        ("find teacher", teacher_names,
+         lambda f, l: scan_find(registry.teachers, f, l), registry.find_teacher),
+        ("find homeroom teacher", homeroom_names,
+         lambda f, l: scan_find(registry.homeroom_teachers, f, l), registry.find_homeroom_teacher),
+        ("students in class", classes,
+         lambda c: scan_students_in_class(registry.students, c), registry.students_in_class),
+        ("homeroom teacher of class", classes,
+         lambda c: scan_homeroom_teacher_of(registry.homeroom_teachers, c), registry.homeroom_teacher_of),
+        ("teachers of class", classes,
+         lambda c: scan_teachers_of_class(registry.teachers, c), registry.teachers_of_class),
+    ]
+
+    errors = []
+    print(f"{'query':>26} {'scan, ms':>12} {'index, ms':>12} {'speedup':>10}")
+    for name, arguments, scan, indexed in queries:
+        scan_results, scan_time = measure(scan, arguments)
+        index_results, index_time = measure(indexed, arguments)
+        if index_results != scan_results:
+            errors.append(f"{name}: indexed results differ from the scan")
+        per_scan = scan_time / len(arguments) * 1000
+        per_index = index_time / len(arguments) * 1000
+        print(f"{name:>26} {per_scan:>12.3f} {per_index:>12.5f} {per_scan / max(per_index, 1e-9):>9.0f}x")
+
+    if errors:
+        print("Invariants violated:")
+        for error in errors:
+            print(f"- {error}")
+        sys.exit(1)
+    print("Indexed queries return the same results as the scans.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Bulk import/export of the school registry and a snapshot for a fast restart.
+
+Roster files are CSV (with a header) or JSONL, chosen by the file extension, with one person per row:
+- type       - student, teacher or homeroom teacher;
+- first_name, last_name;
+- class_name - the class of a student or homeroom teacher; a teacher's classes separated by spaces
+               (in JSONL it may also be a list);
+- subject    - only used for teachers.
+Files are read and written row by row, and every row goes straight into the registry, which updates
+its indexes as it goes, so the lookup structures are built in the same single pass.
+
+The snapshot stores the people as plain tuples in marshal format, which only holds builtin values and,
+unlike pickle, never imports or runs anything while loading. A restart rebuilds the registry from them
+in one pass. Bulk loads run with the cyclic garbage collector paused: the people never form reference
+cycles, and the collector would otherwise rescan the growing registry again and again, which makes
+a large load about three times slower.
+"""
+import csv
+import gc
+import json
+import marshal
+import os
+import time
+from contextlib import contextmanager
+
+from school_registry import Student, Teacher, HomeroomTeacher, SchoolRegistry
+
+ROSTER_FIELDS = ["type", "first_name", "last_name", "class_name", "subject"]
+ROSTER_FORMATS = (".csv", ".jsonl")
+# Next to this module, so a restart finds it whatever the working directory is (ignored by git)
+SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "school_registry.snapshot")
+SNAPSHOT_VERSION = 2
+MAX_REPORTED_ERRORS = 20
+
+
+def roster_format(path):
+    """Returns the format of a roster file (".csv" or ".jsonl") or raises ValueError."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ROSTER_FORMATS:
+        raise ValueError(f"Unsupported roster file {path}: use {' or '.join(ROSTER_FORMATS)}")
+    return extension
+
+
+class ImportReport:
+    """Counts the people imported from a roster file and keeps the first few row errors."""
+
+    def __init__(self):
+        self.counts = {Student: 0, Teacher: 0, HomeroomTeacher: 0}
+        self.skipped = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        return sum(self.counts.values()) + self.skipped
+
+    def error(self, line_number, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Line {line_number}: {message}")
+
+    def print_summary(self, path):
+        rate = self.rows / self.elapsed if self.elapsed else 0
+        print(f"Imported {self.counts[Student]} students, {self.counts[Teacher]} teachers and "
+              f"{self.counts[HomeroomTeacher]} homeroom teachers from {path} "
+              f"in {self.elapsed:.2f} s ({rate:.0f} rows/s).")
+        if self.skipped:
+            print(f"{self.skipped} rows skipped:")
+            for error in self.errors:
+                print(f"- {error}")
+            if self.skipped > len(self.errors):
+                print(f"- ... and {self.skipped - len(self.errors)} more")
+
+
+@contextmanager
+def paused_gc():
+    """Turns the cyclic garbage collector off for the duration of a bulk load."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+# --- Import ---
+def iter_roster_rows(path):
+    """Yields (line number, row) for every row of a roster file; a row that is not valid JSON is None."""
+    extension = roster_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if extension == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            loads = json.loads
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, loads(line)
+                except ValueError:
+                    yield line_number, None
+
+
+def make_person(row):
+    """
+    Builds a Student, Teacher or HomeroomTeacher from a roster row, with the class names normalized
+    the same way the create command does. Raises ValueError for an invalid row.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("not a JSON object")
+    person_type = row.get("type")
+    first_name = row.get("first_name")
+    last_name = row.get("last_name")
+    class_name = row.get("class_name") or ""
+    if not isinstance(first_name, str) or not isinstance(last_name, str) or not first_name or not last_name:
+        raise ValueError("first_name and last_name are required")
+
+    if person_type == "teacher":
+        subject = row.get("subject") or ""
+        classes = class_name.split() if isinstance(class_name, str) else class_name
+        if not isinstance(subject, str) or not isinstance(classes, list) \
+                or not all(isinstance(name, str) for name in classes):
+            raise ValueError("subject must be text and class_name a list of classes")
+        return Teacher(first_name, last_name, subject, [name.upper() for name in classes])
+    if person_type not in ("student", "homeroom teacher"):
+        raise ValueError(f"unknown type {person_type!r}")
+    if not isinstance(class_name, str) or not class_name:
+        raise ValueError("class_name is required")
+    if person_type == "student":
+        return Student(first_name, last_name, class_name)
+    return HomeroomTeacher(first_name, last_name, class_name.upper())
+
+
+def import_roster(registry, path):
+    """Adds every valid row of a roster file to the registry and returns an ImportReport."""
+    report = ImportReport()
+    add_person = {Student: registry.add_student, Teacher: registry.add_teacher,
+                  HomeroomTeacher: registry.add_homeroom_teacher}
+    counts = report.counts
+    start = time.perf_counter()
+    with paused_gc():
+        for line_number, row in iter_roster_rows(path):
+            try:
+                person = make_person(row)
+            except ValueError as error:
+                report.error(line_number, error)
+                continue
+            person_class = type(person)
+            add_person[person_class](person)
+            counts[person_class] += 1
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+# --- Export ---
+def iter_registry_rows(registry):
+    """Yields a roster row (a tuple in ROSTER_FIELDS order) for every person of the registry."""
+    for student in registry.students:
+        yield "student", student.first_name, student.last_name, student.class_name, ""
+    for teacher in registry.teachers:
+        yield "teacher", teacher.first_name, teacher.last_name, " ".join(teacher.classes_taught), teacher.subject
+    for homeroom_teacher in registry.homeroom_teachers:
+        yield "homeroom teacher", homeroom_teacher.first_name, homeroom_teacher.last_name, \
+            homeroom_teacher.homeroom_class, ""
+
+
+def export_roster(registry, path):
+    """
+    Writes every person of the registry to a CSV or JSONL roster file through a temporary file.
+    Returns (number of rows, seconds).
+    """
+    extension = roster_format(path)
+    start = time.perf_counter()
+    count = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        rows = iter_registry_rows(registry)
+        if extension == ".csv":
+            writer = csv.writer(f)
+            writer.writerow(ROSTER_FIELDS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            # One encoder for all rows: json.dumps with options builds a new encoder on every call
+            encode = json.JSONEncoder(ensure_ascii=False).encode
+            for row in rows:
+                f.write(encode(dict(zip(ROSTER_FIELDS, row))) + "\n")
+                count += 1
+    os.replace(tmp_path, path)
+    return count, time.perf_counter() - start
+
+
+# --- Snapshot ---
+def save_snapshot(registry, path=SNAPSHOT_FILE):
+    """Saves the people of the registry through a temporary file, so a crash never leaves half a snapshot."""
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "students": [(s.first_name, s.last_name, s.class_name) for s in registry.students],
+        "teachers": [(t.first_name, t.last_name, t.subject, t.classes_taught) for t in registry.teachers],
+        "homeroom_teachers": [(ht.first_name, ht.last_name, ht.homeroom_class) for ht in registry.homeroom_teachers],
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        marshal.dump(snapshot, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    """Rebuilds the registry saved in the snapshot, or returns None if there is no usable snapshot."""
+    registry = SchoolRegistry()
+    try:
+        with paused_gc():
+            with open(path, "rb") as f:
+                snapshot = marshal.load(f)
+            if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+                print(f"The snapshot {path} has an unsupported format and was ignored.")
+                return None
+            add_student, add_teacher = registry.add_student, registry.add_teacher
+            add_homeroom_teacher = registry.add_homeroom_teacher
+            for row in snapshot["students"]:
+                add_student(Student(*row))
+            for row in snapshot["teachers"]:
+                add_teacher(Teacher(*row))
+            for row in snapshot["homeroom_teachers"]:
+                add_homeroom_teacher(HomeroomTeacher(*row))
+    except FileNotFoundError:
+        return None
+    except (EOFError, KeyError, ValueError, TypeError, AttributeError, ImportError):
+        print(f"The snapshot {path} is damaged and was ignored.")
+        return None
+    return registry
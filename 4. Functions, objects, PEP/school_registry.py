@@ -0,0 +1,108 @@
+"""
+People of the school and an indexed registry of them.
+
+The person classes use __slots__ and intern their class names, so a class name is stored once however
+many people refer to it.
+
+SchoolRegistry keeps the lists of students, teachers and homeroom teachers together with hash indexes
+that are updated on every add, so each query costs O(size of its result) instead of a scan of all people:
+- students, teachers and homeroom teachers by (first name, last name);
+- students and homeroom teachers by class;
+- teachers by class (the reverse of Teacher.classes_taught).
+"""
+import sys
+
+
+class Student:
+    __slots__ = ("first_name", "last_name", "class_name")
+
+    def __init__(self, first_name, last_name, class_name):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.class_name = sys.intern(class_name)
+
+    def __str__(self):
+        return f"Student: {self.first_name} {self.last_name}, Class: {self.class_name}"
+
+
+class Teacher:
+    __slots__ = ("first_name", "last_name", "subject", "classes_taught")
+
+    def __init__(self, first_name, last_name, subject, classes_taught=None):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.subject = sys.intern(subject)
+        self.classes_taught = [sys.intern(class_name) for class_name in classes_taught or []]
+
+    def __str__(self):
+        return f"Teacher: {self.first_name} {self.last_name}, Subject: {self.subject}, Classes: {', '.join(self.classes_taught)}"
+
+
+class HomeroomTeacher:
+    __slots__ = ("first_name", "last_name", "homeroom_class")
+
+    def __init__(self, first_name, last_name, homeroom_class):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.homeroom_class = sys.intern(homeroom_class)
+
+    def __str__(self):
+        return f"Homeroom teacher: {self.first_name} {self.last_name}, Class: {self.homeroom_class}"
+
+
+class SchoolRegistry:
+    def __init__(self):
+        self.students = []
+        self.teachers = []
+        self.homeroom_teachers = []
+        # A name lookup returns the first person added with that name, like the scans it replaces
+        self._students_by_name = {}
+        self._teachers_by_name = {}
+        self._homeroom_teachers_by_name = {}
+        self._students_by_class = {}  # class name -> list of students
+        self._teachers_by_class = {}  # class name -> list of teachers teaching it
+        self._homeroom_teachers_by_class = {}  # class name -> first homeroom teacher of the class
+
+    # --- Adding people ---
+    def add_student(self, student):
+        self.students.append(student)
+        self._students_by_name.setdefault((student.first_name, student.last_name), student)
+        self._students_by_class.setdefault(student.class_name, []).append(student)
+
+    def add_teacher(self, teacher):
+        self.teachers.append(teacher)
+        self._teachers_by_name.setdefault((teacher.first_name, teacher.last_name), teacher)
+        # A class given twice still lists the teacher once
+        for class_name in dict.fromkeys(teacher.classes_taught):
+            self._teachers_by_class.setdefault(class_name, []).append(teacher)
+
+    def add_homeroom_teacher(self, homeroom_teacher):
+        self.homeroom_teachers.append(homeroom_teacher)
+        self._homeroom_teachers_by_name.setdefault(
+            (homeroom_teacher.first_name, homeroom_teacher.last_name), homeroom_teacher)
+        self._homeroom_teachers_by_class.setdefault(homeroom_teacher.homeroom_class, homeroom_teacher)
+
+    # --- Queries ---
+    def find_student(self, first_name, last_name):
+        """Returns the student with the given name or None."""
+        return self._students_by_name.get((first_name, last_name))
+
+    def find_teacher(self, first_name, last_name):
+        """Returns the teacher with the given name or None."""
+        return self._teachers_by_name.get((first_name, last_name))
+
+    def find_homeroom_teacher(self, first_name, last_name):
+        """Returns the homeroom teacher with the given name or None."""
+        return self._homeroom_teachers_by_name.get((first_name, last_name))
+
+    def students_in_class(self, class_name):
+        """Returns the students of a class in the order they were added."""
+        return self._students_by_class.get(class_name, [])
+
+    def teachers_of_class(self, class_name):
+        """Returns the teachers who teach a class, in the order they were added."""
+        return self._teachers_by_class.get(class_name, [])
+
+    def homeroom_teacher_of(self, class_name):
+        """Returns the homeroom teacher of a class or None."""
+        return self._homeroom_teachers_by_class.get(class_name)
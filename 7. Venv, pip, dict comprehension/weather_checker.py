@@ -4,6 +4,8 @@ import os
 import json
 from dateutil.relativedelta import relativedelta
 import sys
+import time
+from collections import OrderedDict
 
 # --- Constants and Settings ---
 CACHE_FILE = "weather_cache.json"
@@ -14,30 +16,134 @@ DEFAULT_LATITUDE = 53.4289
 DEFAULT_LONGITUDE = 14.5530
 DEFAULT_TIMEZONE = "Europe/Berlin" # A common timezone for Central Europe
 
+# Cache keys are 'latitude,longitude|YYYY-MM-DD' with the coordinates rounded to COORDINATE_PRECISION
+# decimal places (0.01 degree is about 1 km), so requests for nearly the same place share entries
+COORDINATE_PRECISION = 2
+# How long a cached value stays valid, by how far the date was from the day it was fetched:
+# a date that was already over is final and never expires, today and the next NEAR_FUTURE_DAYS days
+# expire after NEAR_FUTURE_TTL seconds, later (less certain, often updated) forecasts after FAR_FUTURE_TTL
+NEAR_FUTURE_DAYS = 2
+NEAR_FUTURE_TTL = 60 * 60
+FAR_FUTURE_TTL = 6 * 60 * 60
+# LRU budget: beyond either limit the least recently used entries are dropped
+MAX_CACHE_ENTRIES = 100000
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+CACHE_FORMAT_VERSION = 2
+
 # --- Helper Functions ---
 
+class LruCache(OrderedDict):
+    """
+    Cache entries {'lat,lon|YYYY-MM-DD': [precipitation, fetch timestamp]}, least recently used first,
+    with a running estimate of their size in bytes. Entries are added with put() and dropped with
+    pop_least_recently_used(), which keep size_bytes up to date.
+    """
+
+    def __init__(self, entries=()):
+        super().__init__()
+        self.size_bytes = 0
+        for key, entry in entries:
+            self.put(key, entry)
+
+    def put(self, key, entry):
+        """Adds or replaces an entry as the most recently used one."""
+        if self.pop(key, None) is None:
+            self.size_bytes += estimate_entry_size(key)
+        self[key] = entry
+
+    def pop_least_recently_used(self):
+        key, _ = self.popitem(last=False)
+        self.size_bytes -= estimate_entry_size(key)
+        return key
+
 def load_cache():
-    """Loads the query cache from a file."""
+    """
+    Loads the query cache from a file.
+    Returns an LruCache {'lat,lon|YYYY-MM-DD': [precipitation, fetch timestamp]}, least recently used first.
+    A cache in the old format ({date: value}) is taken over for the default location with fetch time 0,
+    so its dates are fetched again when used.
+    """
     if os.path.exists(CACHE_FILE):
         try:
             with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                content = json.load(f)
         except json.JSONDecodeError:
             print(f"Warning: Cache file '{CACHE_FILE}' is corrupted or empty. Creating a new one.")
-            return {}
+            return LruCache()
         except Exception as e:
             print(f"Error loading cache: {e}")
-            return {}
-    return {}
+            return LruCache()
+        if isinstance(content, dict) and content.get("version") == CACHE_FORMAT_VERSION:
+            return LruCache(content.get("entries", {}).items())
+        if isinstance(content, dict):
+            legacy = LruCache()
+            for date_str, value in content.items():
+                try:
+                    date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+                except ValueError:
+                    continue
+                legacy.put(make_cache_key(DEFAULT_LATITUDE, DEFAULT_LONGITUDE, date_obj), [value, 0])
+            return legacy
+    return LruCache()
 
 def save_cache(cache_data):
-    """Saves the query cache to a file."""
+    """Saves the query cache to a file (compact, it may hold thousands of locations)."""
+    tmp_file = CACHE_FILE + ".tmp"
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=4)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_FORMAT_VERSION, "entries": cache_data}, f, separators=(",", ":"))
+        os.replace(tmp_file, CACHE_FILE) # The old cache stays intact until the new one is complete
     except Exception as e:
         print(f"Error saving cache: {e}")
 
+def make_cache_key(latitude, longitude, search_date):
+    """Returns the cache key 'latitude,longitude|YYYY-MM-DD' with quantized coordinates."""
+    # + 0.0 turns -0.0 into 0.0, so both round to the same key
+    latitude = round(latitude, COORDINATE_PRECISION) + 0.0
+    longitude = round(longitude, COORDINATE_PRECISION) + 0.0
+    return f"{latitude:.{COORDINATE_PRECISION}f},{longitude:.{COORDINATE_PRECISION}f}|{search_date.strftime('%Y-%m-%d')}"
+
+def entry_ttl(search_date, fetched_at):
+    """
+    Returns how many seconds a value for search_date fetched at fetched_at (a timestamp) stays valid,
+    or None if it never expires.
+    """
+    fetched_day = datetime.date.fromtimestamp(fetched_at)
+    if search_date < fetched_day:
+        return None # The day was already over when it was fetched, the value is final
+    if (search_date - fetched_day).days <= NEAR_FUTURE_DAYS:
+        return NEAR_FUTURE_TTL
+    return FAR_FUTURE_TTL
+
+def is_fresh(search_date, fetched_at, now):
+    """Checks whether a value for search_date fetched at fetched_at is still valid at now."""
+    ttl = entry_ttl(search_date, fetched_at)
+    return ttl is None or now - fetched_at < ttl
+
+def estimate_entry_size(key):
+    """Approximate number of bytes the entry takes in the cache file."""
+    # "key":[value,timestamp], - the value and the timestamp are short numbers
+    return len(key) + 32
+
+def get_cached(cache, latitude, longitude, search_date, now=None):
+    """
+    Returns the cached value for the location and date if it is still fresh, otherwise None.
+    A hit moves the entry to the most recently used end.
+    """
+    key = make_cache_key(latitude, longitude, search_date)
+    entry = cache.get(key)
+    if entry is None or not is_fresh(search_date, entry[1], time.time() if now is None else now):
+        return None
+    cache.move_to_end(key)
+    return entry[0]
+
+def put_cached(cache, latitude, longitude, search_date, value, now=None,
+               max_entries=MAX_CACHE_ENTRIES, max_bytes=MAX_CACHE_BYTES):
+    """Stores a value fetched now as the most recently used entry and drops the least recently used ones over budget."""
+    cache.put(make_cache_key(latitude, longitude, search_date), [value, int(time.time() if now is None else now)])
+    while cache and (len(cache) > max_entries or cache.size_bytes > max_bytes):
+        cache.pop_least_recently_used()
+
 def get_precipitation_status(precipitation_value):
     """
     Determines the precipitation status based on the value.
@@ -92,56 +198,75 @@ def get_weather_from_api(latitude, longitude, search_date):
         print(f"Unknown error fetching weather data: {e}")
         return None
 
-# --- Main Program Logic (executes directly) ---
-
-# Load the cache at program start
-cache = load_cache()
-
-while True:
-    # --- Step 1: Get Date ---
-    user_input_date = input(
-        f"\nEnter date in YYYY-MM-DD format (e.g., {datetime.date.today().year}-"
-        f"{str(datetime.date.today().month).zfill(2)}-"
-        f"{str(datetime.date.today().day).zfill(2)}) "
-        "or press Enter for tomorrow: "
-    ).strip()
-
-    search_date = None
-    if not user_input_date:
-        # If no date is provided, consider the next day
-        search_date = datetime.date.today() + relativedelta(days=1)
-        print(f"No date specified. Checking weather for tomorrow: {search_date.strftime('%Y-%m-%d')}")
-    else:
-        # Validate the user input date format
-        try:
-            search_date = datetime.datetime.strptime(user_input_date, "%Y-%m-%d").date()
-        except ValueError:
-            print("Error: Invalid date format. Please use YYYY-MM-DD.")
-            continue # Ask for date again
-
-    # --- Step 2: Make API Request or Get from Cache ---
-    # The cache key now only includes the date, as location is fixed
-    cache_key = f"{search_date.strftime('%Y-%m-%d')}"
-
-    precipitation_result = None
-    if cache_key in cache:
-        # If the date is already in the cache, return the result from the file
-        print(f"Result for {search_date.strftime('%Y-%m-%d')} found in cache.")
-        precipitation_result = cache[cache_key]
-    else:
-        # If not in cache, make a request to the API
-        precipitation_result = get_weather_from_api(
-            DEFAULT_LATITUDE, DEFAULT_LONGITUDE, search_date
-        )
+# --- Main Program Logic ---
+
+def main():
+    # Load the cache at program start
+    cache = load_cache()
+    latitude, longitude = DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+
+    while True:
+        # --- Step 0: Get Location (the previous one is kept on Enter) ---
+        user_input_location = input(
+            f"\nEnter location as latitude,longitude (e.g., 52.23,21.01) "
+            f"or press Enter for ({latitude}, {longitude}): "
+        ).strip()
+        if user_input_location:
+            try:
+                new_latitude, new_longitude = (float(part) for part in user_input_location.split(","))
+            except ValueError:
+                print("Error: Invalid location format. Please use latitude,longitude.")
+                continue
+            if not (-90 <= new_latitude <= 90 and -180 <= new_longitude <= 180):
+                print("Error: Latitude must be between -90 and 90, longitude between -180 and 180.")
+                continue
+            latitude, longitude = new_latitude, new_longitude
+
+        # --- Step 1: Get Date ---
+        user_input_date = input(
+            f"\nEnter date in YYYY-MM-DD format (e.g., {datetime.date.today().year}-"
+            f"{str(datetime.date.today().month).zfill(2)}-"
+            f"{str(datetime.date.today().day).zfill(2)}) "
+            "or press Enter for tomorrow: "
+        ).strip()
+
+        search_date = None
+        if not user_input_date:
+            # If no date is provided, consider the next day
+            search_date = datetime.date.today() + relativedelta(days=1)
+            print(f"No date specified. Checking weather for tomorrow: {search_date.strftime('%Y-%m-%d')}")
+        else:
+            # Validate the user input date format
+            try:
+                search_date = datetime.datetime.strptime(user_input_date, "%Y-%m-%d").date()
+            except ValueError:
+                print("Error: Invalid date format. Please use YYYY-MM-DD.")
+                continue # Ask for date again
+
+        # --- Step 2: Make API Request or Get from Cache ---
+        # The cache is keyed by the (rounded) location and the date; stale values count as missing
+        precipitation_result = get_cached(cache, latitude, longitude, search_date)
         if precipitation_result is not None:
-            cache[cache_key] = precipitation_result # Save to cache
-            save_cache(cache) # Save cache to file
+            # If the date is already in the cache, return the result from the file
+            print(f"Result for {search_date.strftime('%Y-%m-%d')} found in cache.")
+        else:
+            # If not in cache, make a request to the API
+            precipitation_result = get_weather_from_api(
+                latitude, longitude, search_date
+            )
+            if precipitation_result is not None:
+                put_cached(cache, latitude, longitude, search_date, precipitation_result) # Save to cache
+                save_cache(cache) # Save cache to file
+
+        # --- Step 3: Determine and Print Precipitation Status ---
+        status = get_precipitation_status(precipitation_result)
+        print(f"Forecast for {search_date.strftime('%Y-%m-%d')}: {status}")
+
+        # --- Step 4: Continue or Exit ---
+        another_check = input("\nDo you want to check another date? (yes/no): ").strip().lower()
+        if another_check not in ['yes', 'y']:
+            sys.exit(0) # Exit the program
 
-    # --- Step 3: Determine and Print Precipitation Status ---
-    status = get_precipitation_status(precipitation_result)
-    print(f"Forecast for {search_date.strftime('%Y-%m-%d')}: {status}")
 
-    # --- Step 4: Continue or Exit ---
-    another_check = input("\nDo you want to check another date? (yes/no): ").strip().lower()
-    if another_check not in ['yes', 'y']:
-        sys.exit(0) # Exit the program
\ No newline at end of file
+if __name__ == "__main__":
+    main()
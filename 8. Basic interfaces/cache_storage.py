@@ -0,0 +1,324 @@
+"""
+Storage backends for the WeatherForecast cache.
+
+A backend keeps entries [precipitation, fetch timestamp] under keys 'latitude,longitude|YYYY-MM-DD'
+together with their least-recently-used order; freshness and budgets are decided by WeatherForecast.
+- "json"   - JsonCacheStorage: the whole cache in memory and in one JSON file. Simple, but opening
+             parses every entry and every save rewrites the file.
+- "sqlite" - SqliteCacheStorage: an indexed SQLite table. Nothing is loaded when it is opened,
+             lookups and date-range scans read only the rows they need, a save is one commit.
+"""
+import datetime
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+
+CACHE_FORMAT_VERSION = 2
+# Bytes an entry takes in the file besides its key: "key":[value,timestamp],
+ENTRY_OVERHEAD = 32
+
+
+def estimate_entry_size(key):
+    """Approximate number of bytes an entry takes in the cache file."""
+    return len(key) + ENTRY_OVERHEAD
+
+
+class CacheStorage(ABC):
+    """
+    Interface of a storage backend. The owner serializes all calls (WeatherForecast holds its lock).
+    Changes may be buffered until save().
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """Returns the entry [precipitation, fetched_at] or None. Does not change the LRU order."""
+
+    @abstractmethod
+    def touch(self, key):
+        """Marks an existing entry as the most recently used one."""
+
+    @abstractmethod
+    def put(self, key, entry):
+        """Adds or replaces an entry as the most recently used one."""
+
+    def put_many(self, entries):
+        """Adds or replaces several entries (an iterable of (key, entry)), the last one becomes the most recent."""
+        for key, entry in entries:
+            self.put(key, entry)
+
+    @abstractmethod
+    def delete(self, key):
+        """Removes an entry. Returns it, or None if there was no such key."""
+
+    @abstractmethod
+    def pop_least_recently_used(self, count):
+        """Removes up to count least recently used entries and returns their keys."""
+
+    @abstractmethod
+    def scan(self, location, start_date_str=None, end_date_str=None):
+        """
+        Yields (date_str, entry) for one location ('latitude,longitude' part of the key),
+        in date order, optionally limited to start_date_str..end_date_str (inclusive).
+        """
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    @property
+    @abstractmethod
+    def size_bytes(self):
+        """Estimated size of all entries, the measure limited by the byte budget."""
+
+    @abstractmethod
+    def save(self):
+        """Makes all changes durable. Returns True on success."""
+
+    def close(self):
+        self.save()
+
+
+class JsonCacheStorage(CacheStorage):
+    def __init__(self, path, legacy_location=None):
+        """
+        Loads the whole cache file into an OrderedDict (least recently used first).
+        A cache in the old format ({date: value}) is taken over for legacy_location with fetch time 0,
+        so its dates count as stale.
+        """
+        self.path = path
+        self.data = OrderedDict()
+        self._size = 0
+        self._dates = {}  # location -> sorted list of its cached dates, so a scan reads only its range
+        for key, entry in self._load(legacy_location).items():
+            self.put(key, entry)
+
+    def _load(self, legacy_location):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Warning: Cache file '{self.path}' is corrupted or empty. Creating a new one.")
+            return {}
+        except Exception as e:
+            print(f"Error loading cache: {e}")
+            return {}
+        if not isinstance(content, dict):
+            return {}
+        if content.get("version") == CACHE_FORMAT_VERSION:
+            return content.get("entries", {})
+        if legacy_location is None:
+            return {}
+        entries = {}
+        for date_str, value in content.items():
+            try:
+                date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                continue
+            entries[f"{legacy_location}|{date_obj.isoformat()}"] = [value, 0]
+        return entries
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def touch(self, key):
+        self.data.move_to_end(key)
+
+    def put(self, key, entry):
+        if self.data.pop(key, None) is None:
+            self._size += estimate_entry_size(key)
+            location, _, date_str = key.partition("|")
+            insort(self._dates.setdefault(location, []), date_str)
+        self.data[key] = entry
+
+    def _forget(self, key):
+        """Updates the size and the date index after key was removed from self.data."""
+        self._size -= estimate_entry_size(key)
+        location, _, date_str = key.partition("|")
+        dates = self._dates[location]
+        del dates[bisect_left(dates, date_str)]
+        if not dates:
+            del self._dates[location]
+
+    def delete(self, key):
+        entry = self.data.pop(key, None)
+        if entry is not None:
+            self._forget(key)
+        return entry
+
+    def pop_least_recently_used(self, count):
+        keys = []
+        while self.data and len(keys) < count:
+            key, _ = self.data.popitem(last=False)
+            self._forget(key)
+            keys.append(key)
+        return keys
+
+    def scan(self, location, start_date_str=None, end_date_str=None):
+        # The date index gives the range with two binary searches, other locations are never looked at
+        dates = self._dates.get(location, [])
+        start = 0 if start_date_str is None else bisect_left(dates, start_date_str)
+        end = len(dates) if end_date_str is None else bisect_right(dates, end_date_str)
+        prefix = location + "|"
+        return iter([(date_str, self.data[prefix + date_str]) for date_str in dates[start:end]])
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def size_bytes(self):
+        return self._size
+
+    def save(self):
+        """
+        Writes the whole cache to a temporary file that replaces the cache file only when it is complete,
+        so a crash leaves the old or the new cache, never a half-written one.
+        """
+        tmp_file = self.path + ".tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                # Compact: with thousands of locations the indented file would be several times bigger
+                json.dump({"version": CACHE_FORMAT_VERSION, "entries": self.data}, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.path)
+            return True
+        except Exception as e:
+            print(f"Error saving cache: {e}")
+            return False
+
+
+class SqliteCacheStorage(CacheStorage):
+    def __init__(self, path, legacy_location=None):
+        """
+        Opens (or creates) the SQLite cache. Nothing is read up front except the entry count.
+        Changes stay in an open transaction until save() commits them.
+        """
+        self.path = path
+        # The flush timer of WeatherForecast saves from its own thread (always under the owner's lock)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        # WITHOUT ROWID: rows are stored in primary key order, so a date range of one location is one contiguous read
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS forecast (
+                location TEXT NOT NULL,
+                day TEXT NOT NULL,
+                precipitation REAL,
+                fetched_at INTEGER NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (location, day)
+            ) WITHOUT ROWID""")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS forecast_used ON forecast (used)")
+        self._connection.commit()
+        self._count, self._size, last_used = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(location) + LENGTH(day) + 1), 0), COALESCE(MAX(used), 0) "
+            "FROM forecast").fetchone()
+        self._size += self._count * ENTRY_OVERHEAD
+        self._used = last_used  # Counter that orders the entries by last use
+        self._touched = {}  # (location, day) -> use counter, written together on save()
+
+    @staticmethod
+    def _split(key):
+        location, _, day = key.partition("|")
+        return location, day
+
+    def _next_used(self):
+        self._used += 1
+        return self._used
+
+    def get(self, key):
+        row = self._connection.execute(
+            "SELECT precipitation, fetched_at FROM forecast WHERE location = ? AND day = ?", self._split(key)).fetchone()
+        return list(row) if row is not None else None
+
+    def touch(self, key):
+        # A lookup should not cost a write, so the new order is only remembered here
+        self._touched[self._split(key)] = self._next_used()
+
+    def put(self, key, entry):
+        self.put_many([(key, entry)])
+
+    def put_many(self, entries):
+        rows = []
+        for key, (value, fetched_at) in entries:
+            location, day = self._split(key)
+            if self.get(key) is None:
+                self._count += 1
+                self._size += estimate_entry_size(key)
+            self._touched.pop((location, day), None)
+            rows.append((location, day, value, fetched_at, self._next_used()))
+        self._connection.executemany(
+            "INSERT INTO forecast (location, day, precipitation, fetched_at, used) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (location, day) DO UPDATE SET precipitation = excluded.precipitation, "
+            "fetched_at = excluded.fetched_at, used = excluded.used", rows)
+
+    def delete(self, key):
+        entry = self.get(key)
+        if entry is not None:
+            location, day = self._split(key)
+            self._connection.execute("DELETE FROM forecast WHERE location = ? AND day = ?", (location, day))
+            self._touched.pop((location, day), None)
+            self._count -= 1
+            self._size -= estimate_entry_size(key)
+        return entry
+
+    def _write_touched(self):
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE forecast SET used = ? WHERE location = ? AND day = ?",
+                [(used, location, day) for (location, day), used in self._touched.items()])
+            self._touched.clear()
+
+    def pop_least_recently_used(self, count):
+        self._write_touched()
+        rows = self._connection.execute(
+            "SELECT location, day FROM forecast ORDER BY used LIMIT ?", (count,)).fetchall()
+        self._connection.executemany("DELETE FROM forecast WHERE location = ? AND day = ?", rows)
+        keys = [f"{location}|{day}" for location, day in rows]
+        self._count -= len(keys)
+        self._size -= sum(estimate_entry_size(key) for key in keys)
+        return keys
+
+    def scan(self, location, start_date_str=None, end_date_str=None):
+        # ISO dates sort like strings, so the range is a primary key range
+        rows = self._connection.execute(
+            "SELECT day, precipitation, fetched_at FROM forecast WHERE location = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (location, start_date_str or "", end_date_str or "9999-99-99")).fetchall()
+        return ((day, [value, fetched_at]) for day, value, fetched_at in rows)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def size_bytes(self):
+        return self._size
+
+    def save(self):
+        try:
+            self._write_touched()
+            self._connection.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error saving cache: {e}")
+            return False
+
+    def close(self):
+        if self._connection is not None:
+            self.save()
+            self._connection.close()
+            self._connection = None
+
+
+STORAGE_BACKENDS = {"json": JsonCacheStorage, "sqlite": SqliteCacheStorage}
+
+
+def open_storage(path, backend="json", legacy_location=None):
+    """Opens the cache at path with the named backend ("json" or "sqlite")."""
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown cache backend: {backend} (expected one of {', '.join(STORAGE_BACKENDS)}).")
+    return STORAGE_BACKENDS[backend](path, legacy_location)
@@ -0,0 +1,123 @@
+"""
+Benchmark of the concurrent WeatherFetcher against the local stub API with injected latency.
+
+The same lookups (many locations, a week each) are fetched:
+- serially, one request per day (the old get_weather_from_api loop);
+- serially, one range request per location;
+- through WeatherForecast.get_many with a WeatherFetcher (thread pool + shared keep-alive session);
+then the script shows request coalescing, retries against a server that fails some requests,
+and the rate limiter.
+
+Usage: python fetcher_benchmark.py [locations] [days] [latency_ms] [workers]
+"""
+import contextlib
+import datetime
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from serial_fetch import get_weather_from_api, get_weather_range_from_api  # noqa: E402
+from weather_checker import WeatherForecast, quantize_location  # noqa: E402
+from weather_fetcher import WeatherFetcher  # noqa: E402
+from weather_stub_server import StubWeatherServer, stub_precipitation  # noqa: E402
+
+START = datetime.date(2025, 6, 1)
+
+
+def report(name, server, elapsed, lookups):
+    print(f"{name:<38} {server.request_count:>8} {server.connections:>11} {elapsed:>8.2f} {lookups / elapsed:>10.0f}")
+
+
+def main():
+    locations_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 30) / 1000
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 16
+    work_dir = tempfile.mkdtemp(prefix="weather_fetcher_")
+
+    locations = [quantize_location(50 + i * 0.1, 15 + i * 0.1) for i in range(locations_count)]
+    end = START + datetime.timedelta(days=days - 1)
+    lookups = [(latitude, longitude, START + datetime.timedelta(days=d))
+               for latitude, longitude in locations for d in range(days)]
+    errors = []
+
+    print(f"{locations_count} locations x {days} days, stub latency {latency * 1000:g} ms, {workers} workers")
+    print(f"{'method':<38} {'requests':>8} {'connections':>11} {'time, s':>8} {'lookups/s':>10}")
+    with StubWeatherServer(latency=latency) as server:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for latitude, longitude, day in lookups:
+                get_weather_from_api(latitude, longitude, day, base_url=server.url)
+        report("serial, one request per day", server, time.perf_counter() - start, len(lookups))
+
+        server.reset()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for latitude, longitude in locations:
+                get_weather_range_from_api(latitude, longitude, START, end, base_url=server.url)
+        report("serial, one range per location", server, time.perf_counter() - start, len(lookups))
+
+        server.reset()
+        with WeatherFetcher(server.url, max_workers=workers) as fetcher:
+            forecast = WeatherForecast(os.path.join(work_dir, "cache.json"), api_url=server.url, fetcher=fetcher)
+            start = time.perf_counter()
+            result = forecast.get_many(lookups)
+            report(f"get_many, {workers} workers", server, time.perf_counter() - start, len(lookups))
+            forecast.close()
+        if any(value != stub_precipitation(latitude, longitude, day.strftime("%Y-%m-%d"))
+               for (latitude, longitude, day), value in result.items()):
+            errors.append("get_many returned wrong values")
+
+        # Coalescing: many threads ask for the same windows at the same time
+        server.reset()
+        windows = [(latitude, longitude, START, end) for latitude, longitude in locations]
+        with WeatherFetcher(server.url, max_workers=workers) as fetcher:
+            threads = [threading.Thread(target=fetcher.fetch_many, args=(windows,)) for _ in range(8)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            report("8 threads asking for the same windows", server, time.perf_counter() - start, 8 * len(lookups))
+            print(f"{'':<38} coalesced requests: {fetcher.stats['coalesced']}")
+        if server.request_count > len(windows):
+            errors.append(f"{server.request_count} requests for {len(windows)} distinct windows")
+
+        # Rate limit: 20 requests per second at most (after a burst of 5)
+        server.reset()
+        with WeatherFetcher(server.url, max_workers=workers, rate_limit=20, burst=5) as fetcher:
+            start = time.perf_counter()
+            fetcher.fetch_many(windows)
+            elapsed = time.perf_counter() - start
+            report("rate limit 20 requests/s", server, elapsed, len(lookups))
+        expected_time = (len(windows) - 5) / 20
+        if elapsed < expected_time * 0.9:
+            errors.append(f"rate limit not respected: {len(windows)} requests in {elapsed:.2f} s")
+
+    # Retries: a server that answers 30% of the requests with 503
+    with StubWeatherServer(latency=latency, failure_rate=0.3) as server:
+        with WeatherFetcher(server.url, max_workers=workers, retries=6, backoff=0.01) as fetcher:
+            start = time.perf_counter()
+            results = fetcher.fetch_many(windows)
+            report("30% of requests fail with 503", server, time.perf_counter() - start, len(lookups))
+            failed = sum(isinstance(values, Exception) for values in results.values())
+            print(f"{'':<38} injected failures: {server.failures}, retries: {fetcher.stats['retries']}, "
+                  f"windows lost: {failed}")
+        if failed:
+            errors.append(f"{failed} windows failed despite retries")
+
+    if errors:
+        print("Checks failed:")
+        for error in errors:
+            print(f"- {error}")
+        sys.exit(1)
+    print("All checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Checks the date-range prefetch of WeatherForecast against the local stub API and counts requests.
+
+- a month with an empty cache costs one request instead of one per day;
+- the same month again costs no request;
+- with some days already cached, every run of missing days costs exactly one request,
+  and bridge_days merges runs separated by a few cached days;
+- every cached value equals what the API returns for that day.
+The script also times the month day by day (the old way) against one range request.
+
+Usage: python prefetch_check.py [json|sqlite]   (the cache backend, json by default)
+"""
+import contextlib
+import datetime
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from serial_fetch import get_weather_from_api  # noqa: E402
+from weather_checker import WeatherForecast, quantize_location, DEFAULT_LATITUDE, DEFAULT_LONGITUDE  # noqa: E402
+from weather_stub_server import StubWeatherServer, stub_precipitation  # noqa: E402
+
+START = datetime.date(2025, 6, 1)
+END = datetime.date(2025, 6, 30)
+
+
+def quiet(func, *args, **kwargs):
+    """Runs func without the "Requesting API data..." lines."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def check(errors, condition, message):
+    print(f"{'ok' if condition else 'FAILED':>6}  {message}")
+    if not condition:
+        errors.append(message)
+
+
+def main():
+    backend = sys.argv[1] if len(sys.argv) > 1 else "json"
+    errors = []
+    work_dir = tempfile.mkdtemp(prefix="weather_prefetch_")
+    print(f"Cache backend: {backend}")
+    with StubWeatherServer() as server:
+        forecast = WeatherForecast(os.path.join(work_dir, f"cache.{backend}"), api_url=server.url, storage=backend)
+        days = (END - START).days + 1
+
+        made = quiet(forecast.prefetch, START, END)
+        check(errors, made == 1 and server.request_count == 1,
+              f"{days} uncached days fetched with {server.request_count} request(s)")
+        check(errors, all(forecast[START + datetime.timedelta(days=i)] ==
+                          stub_precipitation(*quantize_location(DEFAULT_LATITUDE, DEFAULT_LONGITUDE),
+                                             (START + datetime.timedelta(days=i)).strftime("%Y-%m-%d"))
+                          for i in range(days)),
+              "every day of the range is cached with the value returned by the API")
+
+        server.reset()
+        quiet(forecast.get_range, START, END)
+        check(errors, server.request_count == 0, "a fully cached range makes no request")
+
+        # Punch three holes into the cache: June 5-7, June 10 and June 20-22
+        for day in (5, 6, 7, 10, 20, 21, 22):
+            del forecast[START.replace(day=day)]
+        windows = forecast.missing_windows(START, END)
+        check(errors, [(a.day, b.day) for a, b in windows] == [(5, 7), (10, 10), (20, 22)],
+              f"missing days are merged into contiguous windows: {[(a.day, b.day) for a, b in windows]}")
+        bridged = forecast.missing_windows(START, END, bridge_days=2)
+        check(errors, [(a.day, b.day) for a, b in bridged] == [(5, 10), (20, 22)],
+              f"bridge_days=2 joins windows two cached days apart: {[(a.day, b.day) for a, b in bridged]}")
+
+        server.reset()
+        quiet(forecast.prefetch, START, END)
+        # The windows are fetched concurrently, so they may arrive in any order
+        fetched = sorted((request[2].day, request[3].day) for request in server.requests)
+        check(errors, fetched == [(5, 7), (10, 10), (20, 22)],
+              f"one request per window, only the missing days are asked for: {fetched}")
+
+        forecast.flush()  # The cache is written behind; flush before reading the file
+        reloaded = WeatherForecast(forecast.cache_file, api_url=server.url, storage=backend)
+        check(errors, list(reloaded.items()) == list(forecast.items()) and len(reloaded.storage) == days,
+              "the cache file holds the prefetched days")
+        reloaded.close()
+
+        # Old way against the new one, both on an empty cache
+        server.reset()
+        start_time = time.perf_counter()
+        for i in range(days):
+            quiet(get_weather_from_api, DEFAULT_LATITUDE, DEFAULT_LONGITUDE, START + datetime.timedelta(days=i),
+                  base_url=server.url)
+        day_by_day_time = time.perf_counter() - start_time
+        day_by_day_requests = server.request_count
+
+        server.reset()
+        empty = WeatherForecast(os.path.join(work_dir, f"empty.{backend}"), api_url=server.url, storage=backend)
+        start_time = time.perf_counter()
+        quiet(empty.get_range, START, END)
+        range_time = time.perf_counter() - start_time
+        print(f"\n{days} days day by day: {day_by_day_requests} requests, {day_by_day_time * 1000:.1f} ms; "
+              f"as a range: {server.request_count} request(s), {range_time * 1000:.1f} ms")
+
+    if errors:
+        sys.exit(1)
+    print("All checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+The serial way of asking the Open-Meteo API, one blocking request at a time, without the cache.
+
+WeatherForecast fetches through WeatherFetcher (weather_fetcher.py); these functions are only kept
+as the baseline that fetcher_benchmark.py and prefetch_check.py measure it against.
+"""
+import json
+
+import requests
+
+from weather_checker import BASE_API_URL, DEFAULT_TIMEZONE
+
+
+def get_weather_range_from_api(latitude, longitude, start_date, end_date, base_url=BASE_API_URL):
+    """
+    Makes one request to the Open-Meteo API for all days from start_date to end_date (inclusive).
+    Returns a dictionary {'YYYY-MM-DD': precipitation} (days without data are left out)
+    or None in case of an error.
+    """
+    start_str = start_date.strftime("%Y-%m-%d")
+    end_str = end_date.strftime("%Y-%m-%d")
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "daily": "precipitation_sum",
+        "timezone": DEFAULT_TIMEZONE,
+        "start_date": start_str,
+        "end_date": end_str
+    }
+
+    days_text = start_str if start_str == end_str else f"{start_str} - {end_str}"
+    print(f"Requesting API data for {days_text} at ({latitude}, {longitude})...")
+    try:
+        response = requests.get(base_url, params=params, timeout=10)
+        response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
+        data = response.json()
+
+        # 'time' and 'precipitation_sum' are parallel lists, one entry per requested day
+        daily = data.get('daily', {})
+        days = daily.get('time')
+        values = daily.get('precipitation_sum')
+        if days and values:
+            return {day: value for day, value in zip(days, values) if value is not None}
+        else:
+            print("Warning: Could not find precipitation data in the API response.")
+            return None
+    except requests.exceptions.Timeout:
+        print("Error: API request timed out.")
+        return None
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to the internet or API is unreachable.")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Error during API request: {e}")
+        return None
+    except json.JSONDecodeError:
+        print("Error: Failed to decode API response as JSON.")
+        return None
+    except Exception as e:
+        print(f"Unknown error fetching weather data: {e}")
+        return None
+
+
+def get_weather_from_api(latitude, longitude, search_date, base_url=BASE_API_URL):
+    """
+    Makes a request to the Open-Meteo API to fetch precipitation data.
+    Returns the precipitation value or None in case of an error.
+    """
+    values = get_weather_range_from_api(latitude, longitude, search_date, search_date, base_url)
+    if values is None:
+        return None
+    return values.get(search_date.strftime("%Y-%m-%d"))
@@ -0,0 +1,119 @@
+"""
+Benchmark of the WeatherForecast cache backends (see cache_storage.py).
+
+Both backends get the same cache of many locations times several years of days, then the script measures:
+- the file size and the time to open the cache (what every start of the program pays) and the memory it takes;
+- point lookups (weather_forecast[latitude, longitude, date]) at random locations and dates;
+- month range scans (missing_windows) and whole-location scans (items()).
+It also checks that both backends return the same values.
+
+Usage: python storage_benchmark.py [locations] [years]
+"""
+import datetime
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cache_storage import STORAGE_BACKENDS, open_storage  # noqa: E402
+from weather_checker import WeatherForecast, make_location_key  # noqa: E402
+
+FIRST_DAY = datetime.date(2020, 1, 1)
+# Every value was fetched after its day was over, so nothing expires during the benchmark
+FETCHED_AT = int(datetime.datetime(2030, 1, 1).timestamp())
+LOOKUPS = 20000
+MONTH_SCANS = 200
+LOCATION_SCANS = 20
+
+
+def measure(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def build_cache(path, backend, locations, days):
+    """Writes the cache file directly through the storage backend."""
+    storage = open_storage(path, backend)
+    for latitude, longitude in locations:
+        location = make_location_key(latitude, longitude)
+        storage.put_many((f"{location}|{(FIRST_DAY + datetime.timedelta(days=i)).isoformat()}",
+                          [round((latitude + longitude + i) % 7 / 3, 1), FETCHED_AT]) for i in range(days))
+    storage.close()
+
+
+def open_forecast(path, backend):
+    return WeatherForecast(path, storage=backend, max_entries=10 ** 9, max_bytes=10 ** 12, clock=lambda: FETCHED_AT)
+
+
+def main():
+    locations_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    days = (FIRST_DAY.replace(year=FIRST_DAY.year + years) - FIRST_DAY).days
+    rng = random.Random(1)
+    locations = [(round(rng.uniform(-60, 70), 2), round(rng.uniform(-180, 180), 2)) for _ in range(locations_count)]
+    lookups = [(*rng.choice(locations), FIRST_DAY + datetime.timedelta(days=rng.randrange(days)))
+               for _ in range(LOOKUPS)]
+    months = [(rng.choice(locations), FIRST_DAY + datetime.timedelta(days=rng.randrange(days - 31)))
+              for _ in range(MONTH_SCANS)]
+
+    work_dir = tempfile.mkdtemp(prefix="weather_storage_")
+    print(f"{locations_count} locations x {days} days = {locations_count * days} entries")
+    print(f"{'backend':>8} {'size, MB':>9} {'build, s':>9} {'open, ms':>9} {'open memory, MB':>16} "
+          f"{'first answer, ms':>17} {'lookups/s':>10} {'month scans/s':>14} {'location scans/s':>17}")
+    answers = {}
+    try:
+        for backend in STORAGE_BACKENDS:
+            path = os.path.join(work_dir, f"cache.{backend}")
+            _, build_time = measure(lambda: build_cache(path, backend, locations, days))
+
+            # Memory is measured on a separate open, tracemalloc would distort the time
+            tracemalloc.start()
+            open_forecast(path, backend).close()
+            open_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            forecast, open_time = measure(lambda: open_forecast(path, backend))
+            _, first_time = measure(lambda: forecast[lookups[0]])
+
+            values, lookup_time = measure(lambda: [forecast[lookup] for lookup in lookups])
+            windows, month_time = measure(lambda: [
+                forecast.missing_windows(start, start + datetime.timedelta(days=30), latitude=latitude, longitude=longitude)
+                for (latitude, longitude), start in months])
+            scanned = 0
+            start_time = time.perf_counter()
+            for latitude, longitude in locations[:LOCATION_SCANS]:
+                forecast.latitude, forecast.longitude = latitude, longitude
+                scanned += sum(1 for _ in forecast.items())
+            location_time = time.perf_counter() - start_time
+            forecast.close()
+            answers[backend] = (values, windows, scanned)
+
+            print(f"{backend:>8} {os.path.getsize(path) / 2 ** 20:>9.1f} {build_time:>9.2f} {open_time * 1000:>9.1f} "
+                  f"{open_memory / 2 ** 20:>16.1f} {(open_time + first_time) * 1000:>17.1f} "
+                  f"{LOOKUPS / lookup_time:>10.0f} {MONTH_SCANS / month_time:>14.0f} "
+                  f"{LOCATION_SCANS / location_time:>17.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    errors = []
+    reference_backend, reference = next(iter(answers.items()))
+    for backend, answer in answers.items():
+        if answer != reference:
+            errors.append(f"{backend} returns other values than {reference_backend}")
+    if any(windows for windows in reference[1]) or reference[2] != LOCATION_SCANS * days:
+        errors.append("some cached days were not found")
+    if errors:
+        for error in errors:
+            print(f"FAILED  {error}")
+        sys.exit(1)
+    print("Both backends return the same values.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,17 @@
-import requests
 import datetime
-import os
-import json
 from dateutil.relativedelta import relativedelta
 import sys
+import threading
+import atexit
+import time
+
+from cache_storage import CacheStorage, open_storage
+from weather_fetcher import WeatherFetcher, WeatherFetchError
 
 # --- Constants and Settings ---
 CACHE_FILE = "weather_cache.json"
+# Storage backend of the cache (see cache_storage.py): "json" or "sqlite"
+CACHE_BACKEND = "json"
 BASE_API_URL = "https://api.open-meteo.com/v1/forecast"
 
 # Default coordinates for Szczecin, Poland (as per previous context)
@@ -14,6 +19,24 @@ DEFAULT_LATITUDE = 53.4289
 DEFAULT_LONGITUDE = 14.5530
 DEFAULT_TIMEZONE = "Europe/Berlin" # A common timezone for Central Europe
 
+# Write-behind cache: changed dates are written to the file at most FLUSH_INTERVAL seconds after the change,
+# or at once when FLUSH_THRESHOLD dates are waiting (and always on close / interpreter exit)
+FLUSH_INTERVAL = 5.0
+FLUSH_THRESHOLD = 100
+
+# Cache keys are 'latitude,longitude|YYYY-MM-DD' with the coordinates rounded to COORDINATE_PRECISION
+# decimal places (0.01 degree is about 1 km), so requests for nearly the same place share entries
+COORDINATE_PRECISION = 2
+# How long a cached value stays valid, by how far the date was from the day it was fetched:
+# a date that was already over is final and never expires, today and the next NEAR_FUTURE_DAYS days
+# expire after NEAR_FUTURE_TTL seconds, later (less certain, often updated) forecasts after FAR_FUTURE_TTL
+NEAR_FUTURE_DAYS = 2
+NEAR_FUTURE_TTL = 60 * 60
+FAR_FUTURE_TTL = 6 * 60 * 60
+# LRU budget: beyond either limit the least recently used entries are dropped
+MAX_CACHE_ENTRIES = 100000
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+
 # --- Helper Functions (these remain outside the class as they are general utilities) ---
 
 def get_precipitation_status(precipitation_value):
@@ -27,192 +50,462 @@ def get_precipitation_status(precipitation_value):
     else: # precipitation_value == 0.0
         return "It will not rain"
 
-def get_weather_from_api(latitude, longitude, search_date):
+def quantize_location(latitude, longitude):
+    """Rounds the coordinates to COORDINATE_PRECISION decimal places."""
+    # + 0.0 turns -0.0 into 0.0, so both round to the same location
+    return round(latitude, COORDINATE_PRECISION) + 0.0, round(longitude, COORDINATE_PRECISION) + 0.0
+
+def make_location_key(latitude, longitude):
+    """Returns the location part 'latitude,longitude' of cache keys, with quantized coordinates."""
+    latitude, longitude = quantize_location(latitude, longitude)
+    return f"{latitude:.{COORDINATE_PRECISION}f},{longitude:.{COORDINATE_PRECISION}f}"
+
+def make_cache_key(latitude, longitude, search_date):
+    """Returns the cache key 'latitude,longitude|YYYY-MM-DD' with quantized coordinates."""
+    return f"{make_location_key(latitude, longitude)}|{search_date.isoformat()}"
+
+def merge_into_windows(sorted_dates, bridge_days=0):
     """
-    Makes a request to the Open-Meteo API to fetch precipitation data.
-    Returns the precipitation value or None in case of an error.
+    Merges sorted dates into contiguous (first_date, last_date) windows.
+    Windows separated by at most bridge_days other days are joined into one.
     """
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "daily": "precipitation_sum",
-        "timezone": DEFAULT_TIMEZONE,
-        "start_date": search_date.strftime("%Y-%m-%d"),
-        "end_date": search_date.strftime("%Y-%m-%d")
-    }
-
-    print(f"Requesting API data for {search_date.strftime('%Y-%m-%d')} at ({latitude}, {longitude})...")
-    try:
-        response = requests.get(BASE_API_URL, params=params, timeout=10)
-        response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-        data = response.json()
-
-        # Check if 'daily' and 'precipitation_sum' exist and have data for the requested date
-        if 'daily' in data and 'precipitation_sum' in data['daily'] and len(data['daily']['precipitation_sum']) > 0:
-            precipitation = data['daily']['precipitation_sum'][0] # Get the precipitation for the single requested day
-            return precipitation
+    windows = []
+    for day in sorted_dates:
+        if windows and (day - windows[-1][1]).days <= bridge_days + 1:
+            windows[-1] = (windows[-1][0], day)
         else:
-            print("Warning: Could not find precipitation data in the API response.")
-            return None
-    except requests.exceptions.Timeout:
-        print("Error: API request timed out.")
-        return None
-    except requests.exceptions.ConnectionError:
-        print("Error: Could not connect to the internet or API is unreachable.")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"Error during API request: {e}")
-        return None
-    except json.JSONDecodeError:
-        print("Error: Failed to decode API response as JSON.")
-        return None
-    except Exception as e:
-        print(f"Unknown error fetching weather data: {e}")
-        return None
+            windows.append((day, day))
+    return windows
+
+def entry_ttl(search_date, fetched_at):
+    """
+    Returns how many seconds a value for search_date fetched at fetched_at (a timestamp) stays valid,
+    or None if it never expires.
+    """
+    fetched_day = datetime.date.fromtimestamp(fetched_at)
+    if search_date < fetched_day:
+        return None # The day was already over when it was fetched, the value is final
+    if (search_date - fetched_day).days <= NEAR_FUTURE_DAYS:
+        return NEAR_FUTURE_TTL
+    return FAR_FUTURE_TTL
+
+def is_fresh(search_date, fetched_at, now):
+    """Checks whether a value for search_date fetched at fetched_at is still valid at now."""
+    ttl = entry_ttl(search_date, fetched_at)
+    return ttl is None or now - fetched_at < ttl
 
 # --- NEW CLASS DEFINITION ---
 class WeatherForecast:
-    def __init__(self, cache_file):
+    def __init__(self, cache_file, api_url=BASE_API_URL, flush_interval=FLUSH_INTERVAL, flush_threshold=FLUSH_THRESHOLD,
+                 latitude=DEFAULT_LATITUDE, longitude=DEFAULT_LONGITUDE,
+                 max_entries=MAX_CACHE_ENTRIES, max_bytes=MAX_CACHE_BYTES, clock=time.time, fetcher=None,
+                 storage=CACHE_BACKEND):
         """
-        Initializes the WeatherForecast class, loads data from the cache.
-        The cache is stored as a dictionary, where the key is a date string (YYYY-MM-DD).
+        Initializes the WeatherForecast class and opens the cache.
+        The cache maps 'lat,lon|YYYY-MM-DD' keys to [precipitation, fetch timestamp] entries
+        for any number of locations; plain date keys (weather_forecast[date]) use the location
+        given by self.latitude / self.longitude, (latitude, longitude, date) keys any other one.
+        Values go stale according to entry_ttl() and the least recently used entries are dropped
+        beyond max_entries or max_bytes.
+        storage is a backend name from cache_storage.STORAGE_BACKENDS ("json" loads the whole file,
+        "sqlite" reads entries only when they are needed) or a ready CacheStorage object.
+        Changes are written to the cache file in batches (see flush()).
+        Missing days are fetched through a WeatherFetcher (a default one is created on first use).
+        Use the object as a context manager, or call close(), to write the last changes.
         """
         self.cache_file = cache_file
-        self.data = self._load_cache() # Internal dictionary for storing data
+        self.api_url = api_url
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.latitude = latitude
+        self.longitude = longitude
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock # Source of the current time as a timestamp, replaceable in checks
+        self._fetcher = fetcher
+        self._owns_fetcher = False # A fetcher created here is also closed here
+        self._lock = threading.RLock() # self.storage and self._dirty are also used by the flush timer
+        self._dirty = set() # Keys changed (or evicted) since the last flush
+        self._flush_timer = None
+        if isinstance(storage, CacheStorage):
+            self.storage = storage
+        else:
+            # A cache in the old format belongs to the default location
+            self.storage = open_storage(cache_file, storage, make_location_key(DEFAULT_LATITUDE, DEFAULT_LONGITUDE))
+        with self._lock:
+            self._evict() # The limits may be lower than when the cache was saved
+        atexit.register(self.close) # Changes made without close() are still written at interpreter shutdown
 
-    def _load_cache(self):
-        """
-        Loads the query cache from a file.
-        """
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print(f"Warning: Cache file '{self.cache_file}' is corrupted or empty. Creating a new one.")
-                return {}
-            except Exception as e:
-                print(f"Error loading cache: {e}")
-                return {}
-        return {}
+    # --- Entries, freshness and LRU eviction ---
+    def _resolve(self, key):
+        """Turns a date or a (latitude, longitude, date) key into (latitude, longitude, date_obj)."""
+        if isinstance(key, tuple) and len(key) == 3 and isinstance(key[2], datetime.date):
+            return key
+        if isinstance(key, datetime.date):
+            return self.latitude, self.longitude, key
+        raise TypeError("The key must be a datetime.date object or a (latitude, longitude, date) tuple.")
+
+    def _put(self, key, entry):
+        """Adds or replaces an entry as the most recently used one. Must be called while holding self._lock."""
+        self.storage.put(key, entry)
+        self._evict()
+
+    def _evict(self):
+        """Drops least recently used entries while the cache is over budget. Must be called while holding self._lock."""
+        evicted = []
+        while len(self.storage) > 0 and (len(self.storage) > self.max_entries or self.storage.size_bytes > self.max_bytes):
+            evicted.extend(self.storage.pop_least_recently_used(max(len(self.storage) - self.max_entries, 1)))
+        if evicted:
+            self._dirty.update(evicted) # The file must lose them too
+
+    def _get_fresh(self, key, search_date):
+        """Returns the value of a fresh entry (and marks it as recently used) or raises KeyError."""
+        with self._lock:
+            entry = self.storage.get(key)
+            if entry is None or not is_fresh(search_date, entry[1], self._clock()):
+                raise KeyError(key)
+            self.storage.touch(key)
+            return entry[0]
+
+    def is_fresh(self, key):
+        """True if the cache has a value for the date (or (latitude, longitude, date)) key that is still valid."""
+        try:
+            latitude, longitude, search_date = self._resolve(key)
+            self._get_fresh(make_cache_key(latitude, longitude, search_date), search_date)
+            return True
+        except KeyError:
+            return False
 
-    def _save_cache(self):
+    @property
+    def size_bytes(self):
+        """Estimated size of the cache file, the measure limited by max_bytes."""
+        with self._lock:
+            return self.storage.size_bytes
+
+    # --- Write-behind persistence ---
+    def _mark_dirty(self, keys):
         """
-        Saves the query cache to a file.
+        Remembers changed keys. Must be called while holding self._lock.
+        Flushes at once when flush_threshold keys are waiting, otherwise makes sure the timer is running.
         """
-        try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=4)
-        except Exception as e:
-            print(f"Error saving cache: {e}")
+        self._dirty.update(keys)
+        if len(self._dirty) >= self.flush_threshold:
+            self.flush()
+        elif self._dirty and self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self._on_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._flush_timer = None
+            self.flush()
+
+    def flush(self):
+        """Writes the cache file if any entry changed since the last flush. Returns True if nothing is left unsaved."""
+        with self._lock:
+            if not self._dirty:
+                return True
+            if self.storage.save():
+                self._dirty.clear()
+                return True
+            return False # The keys stay dirty and the next flush tries again
+
+    @property
+    def dirty_count(self):
+        """Number of changed entries that are not in the cache file yet."""
+        with self._lock:
+            return len(self._dirty)
+
+    def close(self):
+        """Stops the flush timer, writes the remaining changes and closes the storage."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self.flush()
+            self.storage.close()
+            if self._owns_fetcher:
+                self._fetcher.close()
+                self._fetcher = None
+                self._owns_fetcher = False
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     # --- Special methods (Dunder methods) ---
-    def __setitem__(self, date_obj, precipitation_value):
+    def __setitem__(self, key, precipitation_value):
         """
         Allows you to set the weather forecast for a specific date.
-        Used as: weather_forecast[date] = value
-        date_obj must be a datetime.date object.
+        Used as: weather_forecast[date] = value, or weather_forecast[latitude, longitude, date] = value
+        date must be a datetime.date object. The value is stored with the current time as its fetch time.
         """
-        if not isinstance(date_obj, datetime.date):
-            raise TypeError("The key must be a datetime.date object.")
-        self.data[date_obj.strftime("%Y-%m-%d")] = precipitation_value
-        self._save_cache() # Save cache after each change
+        latitude, longitude, search_date = self._resolve(key)
+        cache_key = make_cache_key(latitude, longitude, search_date)
+        with self._lock:
+            self._put(cache_key, [precipitation_value, int(self._clock())])
+            self._mark_dirty([cache_key]) # Saved later, together with other changes
 
-    def __getitem__(self, date_obj):
+    def __getitem__(self, key):
         """
         Allows you to get the weather forecast for a specific date.
-        Usable as: value = weather_forecast[date]
-        date_obj must be a datetime.date object.
-        Returns the value or raises KeyError if there is no date.
+        Usable as: value = weather_forecast[date], or weather_forecast[latitude, longitude, date]
+        date must be a datetime.date object.
+        Returns the value or raises KeyError if there is no date or its value is stale.
+        """
+        latitude, longitude, search_date = self._resolve(key)
+        return self._get_fresh(make_cache_key(latitude, longitude, search_date), search_date)
+
+    def __delitem__(self, key):
+        """
+        Removes the weather forecast for a specific date, so the next lookup asks the API again.
+        Used as: del weather_forecast[date], or del weather_forecast[latitude, longitude, date]
+        Raises KeyError if there is no date.
         """
-        if not isinstance(date_obj, datetime.date):
-            raise TypeError("The key must be a datetime.date object.")
-        return self.data[date_obj.strftime("%Y-%m-%d")]
+        latitude, longitude, search_date = self._resolve(key)
+        cache_key = make_cache_key(latitude, longitude, search_date)
+        with self._lock:
+            if self.storage.delete(cache_key) is None:
+                raise KeyError(key)
+            self._mark_dirty([cache_key])
 
     def __iter__(self):
         """
-        Allows you to iterate over all dates for which the weather forecast is known.
+        Allows you to iterate over all dates for which the weather forecast is known at the current location.
         Returns an iterator over string representations of dates (YYYY-MM-DD).
         """
-        return iter(self.data.keys())
+        return (date_obj.isoformat() for date_obj, _ in self.items())
 
     def items(self):
         """
         Returns a generator of tuples in the format (date_obj, weather_value)
-        for all saved results.
-        date_obj will be a datetime.date object.
+        for all saved results at the current location that are still fresh.
+        date_obj will be a datetime.date object. Dates come in order.
         """
-        for date_str, weather_value in self.data.items():
-            try:
-                # Convert the string key back to a datetime.date object
-                date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        return self._scan(self.latitude, self.longitude)
+
+    def _scan(self, latitude, longitude, start_date=None, end_date=None, fresh_only=True):
+        """Yields (date_obj, weather_value) for the (fresh) entries of one location, optionally in a date range."""
+        with self._lock:
+            entries = list(self.storage.scan(make_location_key(latitude, longitude),
+                                             start_date and start_date.isoformat(), end_date and end_date.isoformat()))
+        now = self._clock()
+        for date_str, (weather_value, fetched_at) in entries:
+            # Keys are always written by isoformat(), so the fast ISO parser is enough
+            date_obj = datetime.date.fromisoformat(date_str)
+            if not fresh_only or is_fresh(date_obj, fetched_at, now):
                 yield date_obj, weather_value
+
+    # --- Fetching ---
+    @property
+    def fetcher(self):
+        with self._lock:
+            if self._fetcher is None:
+                self._fetcher = WeatherFetcher(self.api_url, timezone=DEFAULT_TIMEZONE)
+                self._owns_fetcher = True
+            return self._fetcher
+
+    def _fetch_windows(self, windows):
+        """
+        Fetches (latitude, longitude, first_date, last_date) windows concurrently and caches every returned day.
+        Windows that failed are reported and their days stay uncached.
+        """
+        if not windows:
+            return
+        results = self.fetcher.fetch_many(windows)
+        fetched_at = int(self._clock())
+        with self._lock:
+            entries = []
+            for (latitude, longitude, _, _), values in results.items():
+                if isinstance(values, WeatherFetchError):
+                    print(f"Warning: {values}")
+                    continue
+                location = make_location_key(latitude, longitude)
+                entries.extend((f"{location}|{date_str}", [value, fetched_at]) for date_str, value in values.items())
+            if entries:
+                self.storage.put_many(entries)
+                self._evict()
+                self._mark_dirty([key for key, _ in entries])
+
+    def get_many(self, lookups, bridge_days=0):
+        """
+        Looks up many (latitude, longitude, date) tuples at once.
+        Days that are missing or stale are grouped per (quantized) location into contiguous windows
+        and all windows are fetched concurrently, one request each.
+        Returns {lookup: precipitation}, None for days without data.
+        """
+        lookups = list(lookups)
+        missing = {} # (latitude, longitude) -> set of dates
+        for latitude, longitude, search_date in lookups:
+            if not self.is_fresh((latitude, longitude, search_date)):
+                missing.setdefault(quantize_location(latitude, longitude), set()).add(search_date)
+        self._fetch_windows([(latitude, longitude, first_date, last_date)
+                             for (latitude, longitude), dates in missing.items()
+                             for first_date, last_date in merge_into_windows(sorted(dates), bridge_days)])
+
+        result = {}
+        with self._lock:
+            for lookup in lookups:
+                entry = self.storage.get(make_cache_key(*lookup))
+                result[lookup] = entry[0] if entry is not None else None
+        return result
+
+    # --- Date ranges ---
+    def missing_windows(self, start_date, end_date, bridge_days=0, latitude=None, longitude=None):
+        """
+        Returns the days from start_date to end_date that are not cached (or stale), merged into contiguous
+        windows: a list of (first_date, last_date) tuples, one API request each.
+        Windows separated by at most bridge_days cached days are joined into one, so a few known days
+        are fetched again to save a request. The location defaults to self.latitude / self.longitude.
+        """
+        latitude = self.latitude if latitude is None else latitude
+        longitude = self.longitude if longitude is None else longitude
+        # One range scan instead of a lookup per day
+        known_days = {date_obj for date_obj, _ in self._scan(latitude, longitude, start_date, end_date)}
+        missing_days = []
+        day = start_date
+        while day <= end_date:
+            if day not in known_days:
+                missing_days.append(day)
+            day += datetime.timedelta(days=1)
+        return merge_into_windows(missing_days, bridge_days)
+
+    def prefetch(self, start_date, end_date, latitude=None, longitude=None, bridge_days=0):
+        """
+        Fills the cache for every day from start_date to end_date with one API request per missing window,
+        all windows at once. Days the API has no data for stay uncached.
+        Returns the number of API requests needed (windows).
+        """
+        latitude, longitude = quantize_location(self.latitude if latitude is None else latitude,
+                                                self.longitude if longitude is None else longitude)
+        windows = self.missing_windows(start_date, end_date, bridge_days, latitude, longitude)
+        self._fetch_windows([(latitude, longitude, first_date, last_date) for first_date, last_date in windows])
+        return len(windows)
+
+    def get_range(self, start_date, end_date, latitude=None, longitude=None, bridge_days=0):
+        """
+        Returns a dictionary {date_obj: precipitation} for every day from start_date to end_date,
+        fetching the missing days first. Days without data have the value None.
+        """
+        latitude = self.latitude if latitude is None else latitude
+        longitude = self.longitude if longitude is None else longitude
+        self.prefetch(start_date, end_date, latitude, longitude, bridge_days)
+        # Days whose refresh failed keep their last known value
+        known = dict(self._scan(latitude, longitude, start_date, end_date, fresh_only=False))
+        result = {}
+        day = start_date
+        while day <= end_date:
+            result[day] = known.get(day)
+            day += datetime.timedelta(days=1)
+        return result
+
+# --- Main Program Logic ---
+
+def main():
+    # Load the cache at program start using the new class; leaving the with block writes the last changes
+    with WeatherForecast(CACHE_FILE) as weather_forecast:
+        run_checks(weather_forecast)
+
+
+def run_checks(weather_forecast):
+    """Asks for locations and dates and prints their forecasts until the user stops."""
+    while True:
+        # --- Step 0: Get Location (the previous one is kept on Enter) ---
+        user_input_location = input(
+            f"\nEnter location as latitude,longitude (e.g., 52.23,21.01) "
+            f"or press Enter for ({weather_forecast.latitude}, {weather_forecast.longitude}): "
+        ).strip()
+        if user_input_location:
+            try:
+                latitude, longitude = (float(part) for part in user_input_location.split(","))
             except ValueError:
-                print(f"Warning: Invalid date format in cache key: {date_str}. Skipping.")
+                print("Error: Invalid location format. Please use latitude,longitude.")
                 continue
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                print("Error: Latitude must be between -90 and 90, longitude between -180 and 180.")
+                continue
+            weather_forecast.latitude, weather_forecast.longitude = latitude, longitude
+
+        # --- Step 1: Get Date ---
+        user_input_date = input(
+            f"\nEnter date in YYYY-MM-DD format (e.g., {datetime.date.today().year}-"
+            f"{str(datetime.date.today().month).zfill(2)}-"
+            f"{str(datetime.date.today().day).zfill(2)}) "
+            "or press Enter for tomorrow (two dates separated by a space check a range): "
+        ).strip()
 
-# --- Main Program Logic (executes directly) ---
-
-# Load the cache at program start using the new class
-weather_forecast = WeatherForecast(CACHE_FILE) # **MODIFIED**
-
-while True:
-    # --- Step 1: Get Date ---
-    user_input_date = input(
-        f"\nEnter date in YYYY-MM-DD format (e.g., {datetime.date.today().year}-"
-        f"{str(datetime.date.today().month).zfill(2)}-"
-        f"{str(datetime.date.today().day).zfill(2)}) "
-        "or press Enter for tomorrow: "
-    ).strip()
-
-    search_date = None
-    if not user_input_date:
-        # If no date is provided, consider the next day
-        search_date = datetime.date.today() + relativedelta(days=1)
-        print(f"No date specified. Checking weather for tomorrow: {search_date.strftime('%Y-%m-%d')}")
-    else:
-        # Validate the user input date format
+        range_dates = user_input_date.split()
+        if len(range_dates) == 2:
+            # A whole range is fetched with one API request per run of days missing from the cache
+            try:
+                start_date, end_date = (datetime.datetime.strptime(part, "%Y-%m-%d").date() for part in range_dates)
+            except ValueError:
+                print("Error: Invalid date format. Please use YYYY-MM-DD YYYY-MM-DD.")
+                continue
+            if start_date > end_date:
+                print("Error: The first date must not be later than the second one.")
+                continue
+            for day, precipitation_value in weather_forecast.get_range(start_date, end_date).items():
+                print(f"Forecast for {day.strftime('%Y-%m-%d')}: {get_precipitation_status(precipitation_value)}")
+
+            another_check = input("\nDo you want to check another date? (yes/no): ").strip().lower()
+            if another_check not in ['yes', 'y']:
+                sys.exit(0)
+            continue
+
+        search_date = None
+        if not user_input_date:
+            # If no date is provided, consider the next day
+            search_date = datetime.date.today() + relativedelta(days=1)
+            print(f"No date specified. Checking weather for tomorrow: {search_date.strftime('%Y-%m-%d')}")
+        else:
+            # Validate the user input date format
+            try:
+                search_date = datetime.datetime.strptime(user_input_date, "%Y-%m-%d").date()
+            except ValueError:
+                print("Error: Invalid date format. Please use YYYY-MM-DD.")
+                continue # Ask for date again
+
+        # --- Step 2: Make API Request or Get from Cache ---
+        # We now use the WeatherForecast object directly
+        precipitation_result = None
         try:
-            search_date = datetime.datetime.strptime(user_input_date, "%Y-%m-%d").date()
-        except ValueError:
-            print("Error: Invalid date format. Please use YYYY-MM-DD.")
-            continue # Ask for date again
-
-    # --- Step 2: Make API Request or Get from Cache ---
-    # We now use the WeatherForecast object directly
-    precipitation_result = None
-    try:
-        # Try to get data from cache using __getitem__
-        precipitation_result = weather_forecast[search_date] # **MODIFIED**
-        print(f"Result for {search_date.strftime('%Y-%m-%d')} found in cache.")
-    except KeyError:
-        # If not in cache, make a request to the API
-        print(f"Result for {search_date.strftime('%Y-%m-%d')} not found in cache. Requesting API.")
-        precipitation_result = get_weather_from_api(
-            DEFAULT_LATITUDE, DEFAULT_LONGITUDE, search_date
-        )
-        if precipitation_result is not None:
-            # Save to cache using __setitem__
-            weather_forecast[search_date] = precipitation_result # **MODIFIED**
-
-
-    # --- Step 3: Determine and Print Precipitation Status ---
-    status = get_precipitation_status(precipitation_result)
-    print(f"Forecast for {search_date.strftime('%Y-%m-%d')}: {status}")
-
-    # --- Step 4: Demonstrate new class methods (Optional for testing) ---
-    print("\n--- Demonstrating WeatherForecast class methods ---")
-    print("All cached dates (using __iter__):")
-    for date_str in weather_forecast: # **MODIFIED**
-        print(f"  - {date_str}")
-
-    print("All cached items (using items() method):")
-    for date_obj, weather_val in weather_forecast.items(): # **MODIFIED**
-        print(f"  - Date: {date_obj.strftime('%Y-%m-%d')}, Weather: {get_precipitation_status(weather_val)}") # **MODIFIED**
-    print("-------------------------------------------------")
-
-
-    # --- Step 5: Continue or Exit ---
-    another_check = input("\nDo you want to check another date? (yes/no): ").strip().lower()
-    if another_check not in ['yes', 'y']:
-        sys.exit(0) # Exit the program
\ No newline at end of file
+            # Try to get data from cache using __getitem__
+            precipitation_result = weather_forecast[search_date] # **MODIFIED**
+            print(f"Result for {search_date.strftime('%Y-%m-%d')} found in cache.")
+        except KeyError:
+            # If not in cache (or no longer fresh), make a request to the API
+            print(f"Result for {search_date.strftime('%Y-%m-%d')} not found in cache. Requesting API.")
+            # Through the shared fetcher with the quantized coordinates; the value is cached by get_many
+            lookup = (weather_forecast.latitude, weather_forecast.longitude, search_date)
+            precipitation_result = weather_forecast.get_many([lookup])[lookup]
+
+
+        # --- Step 3: Determine and Print Precipitation Status ---
+        status = get_precipitation_status(precipitation_result)
+        print(f"Forecast for {search_date.strftime('%Y-%m-%d')}: {status}")
+
+        # --- Step 4: Demonstrate new class methods (Optional for testing) ---
+        print("\n--- Demonstrating WeatherForecast class methods ---")
+        print("All cached dates (using __iter__):")
+        for date_str in weather_forecast: # **MODIFIED**
+            print(f"  - {date_str}")
+
+        print("All cached items (using items() method):")
+        for date_obj, weather_val in weather_forecast.items(): # **MODIFIED**
+            print(f"  - Date: {date_obj.strftime('%Y-%m-%d')}, Weather: {get_precipitation_status(weather_val)}") # **MODIFIED**
+        print("-------------------------------------------------")
+
+
+        # --- Step 5: Continue or Exit ---
+        another_check = input("\nDo you want to check another date? (yes/no): ").strip().lower()
+        if another_check not in ['yes', 'y']:
+            sys.exit(0) # Exit the program
+
+
+if __name__ == "__main__":
+    main()
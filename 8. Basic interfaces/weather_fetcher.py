@@ -0,0 +1,183 @@
+"""
+Concurrent fetch engine for the Open-Meteo API.
+
+WeatherFetcher runs many (location, date window) requests at once on a bounded thread pool.
+All of them share one requests.Session, so connections are kept alive and reused instead of
+opened for every request. Identical requests that are already in flight are coalesced into one,
+an optional token bucket limits the request rate, and temporary failures (timeouts, connection
+errors, 429 and 5xx answers) are retried with exponential backoff.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# HTTP statuses worth another attempt: rate limited or a temporary problem on the server
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class WeatherFetchError(Exception):
+    """A request failed for good (after all retries, or with an error that retrying cannot fix)."""
+
+
+class RateLimiter:
+    """Token bucket: on average `rate` requests per second, at most `burst` at once."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Waits until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class WeatherFetcher:
+    """
+    Fetches daily precipitation for many locations and date windows concurrently.
+    submit() returns a Future with {'YYYY-MM-DD': precipitation}; fetch_many() waits for a whole set.
+    Use it as a context manager, or call close(), to stop the workers and close the connections.
+    """
+
+    def __init__(self, api_url, max_workers=8, rate_limit=None, burst=None, retries=3, backoff=0.5,
+                 backoff_max=8.0, timeout=10, timezone="Europe/Berlin"):
+        """
+        rate_limit is in requests per second (None for no limit), burst defaults to max_workers.
+        A failed attempt is retried up to `retries` times, waiting backoff * 2**attempt seconds
+        (with jitter, at most backoff_max, or as long as a Retry-After header asks).
+        """
+        self.api_url = api_url
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.timezone = timezone
+        self.rate_limiter = RateLimiter(rate_limit, burst or max_workers) if rate_limit else None
+
+        self.session = requests.Session()
+        # One connection per worker stays open; retries are done here, not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather-fetch")
+
+        self._lock = threading.Lock()
+        self._in_flight = {}  # (latitude, longitude, start, end) -> Future of the running request
+        self.stats = {"requests": 0, "retries": 0, "coalesced": 0, "failed": 0}
+
+    # --- Public interface ---
+    def submit(self, latitude, longitude, start_date, end_date):
+        """
+        Schedules one request for the days from start_date to end_date (inclusive) and returns its Future.
+        A request identical to one that is still running gets the same Future instead of a new request.
+        """
+        key = (latitude, longitude, start_date, end_date)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future
+            future = self._executor.submit(self._fetch, latitude, longitude, start_date, end_date)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def fetch_many(self, windows):
+        """
+        Fetches a list of (latitude, longitude, start_date, end_date) windows concurrently.
+        Returns {window: {'YYYY-MM-DD': precipitation} or the WeatherFetchError it failed with}.
+        """
+        futures = {window: self.submit(*window) for window in windows}
+        results = {}
+        for window, future in futures.items():
+            try:
+                results[window] = future.result()
+            except WeatherFetchError as e:
+                results[window] = e
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # --- Workers ---
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _fetch(self, latitude, longitude, start_date, end_date):
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "daily": "precipitation_sum",
+            "timezone": self.timezone,
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d"),
+        }
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            self._count("requests")
+            retry_after = None
+            try:
+                response = self.session.get(self.api_url, params=params, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    payload = response.json()
+                    daily = payload.get("daily", {}) if isinstance(payload, dict) else None
+                    if not isinstance(daily, dict):
+                        raise ValueError(f"unexpected response body: {payload!r:.100}")
+                    days = daily.get("time") or []
+                    values = daily.get("precipitation_sum") or []
+                    return {day: value for day, value in zip(days, values) if value is not None}
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                error = str(e) or e.__class__.__name__
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # A 4xx answer or a broken JSON body: another attempt would fail the same way
+                self._count("failed")
+                raise WeatherFetchError(f"Error during API request: {e}") from e
+
+            if attempt >= self.retries:
+                self._count("failed")
+                raise WeatherFetchError(f"API request failed after {attempt + 1} attempts: {error}")
+            self._count("retries")
+            time.sleep(self._retry_delay(attempt, retry_after))
+            attempt += 1
+
+    def _retry_delay(self, attempt, retry_after=None):
+        """Exponential backoff with full jitter, or the delay the server asked for in Retry-After."""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff * 2 ** attempt, self.backoff_max))
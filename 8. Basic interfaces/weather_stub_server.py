@@ -0,0 +1,136 @@
+"""
+Local stand-in for the Open-Meteo forecast API, for running the weather checker without the internet.
+
+It answers GET requests with latitude, longitude, start_date and end_date like the real API
+(daily "time" and "precipitation_sum" lists), with deterministic fake values, and records every
+request so a check can count them. An optional latency simulates a slow network
+and an optional failure rate answers some requests with 503 to exercise retries.
+"""
+import datetime
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def stub_precipitation(latitude, longitude, date_str):
+    """Fake but repeatable precipitation for a place and a day; about every third day is dry."""
+    seed = zlib.crc32(f"{float(latitude)}|{float(longitude)}|{date_str}".encode("utf-8"))
+    return 0.0 if seed % 3 == 0 else round(seed % 200 / 10, 1)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog of 5 drops connections when many workers connect at once
+    request_queue_size = 128
+
+
+class StubWeatherServer:
+    """
+    Threaded HTTP server on 127.0.0.1 (a free port by default). Use it as a context manager:
+        with StubWeatherServer() as server:
+            WeatherForecast(cache_file, api_url=server.url).get_range(start_date, end_date)
+    """
+
+    def __init__(self, latency=0.0, port=0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = []  # (latitude, longitude, start_date, end_date) of every request, in arrival order
+        self.failures = 0  # Requests answered with an injected 503
+        self.connections = 0  # TCP connections accepted; with keep-alive far fewer than requests
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, format, *args):
+                pass  # Keep the output of the checks readable
+
+        self._server = _Server(("127.0.0.1", port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/v1/forecast"
+
+    @property
+    def request_count(self):
+        with self._lock:
+            return len(self.requests)
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.failures = 0
+            self.connections = 0
+
+    def _handle(self, handler):
+        query = parse_qs(urlparse(handler.path).query)
+        try:
+            latitude = float(query["latitude"][0])
+            longitude = float(query["longitude"][0])
+            start_date = datetime.datetime.strptime(query["start_date"][0], "%Y-%m-%d").date()
+            end_date = datetime.datetime.strptime(query["end_date"][0], "%Y-%m-%d").date()
+        except (KeyError, ValueError) as e:
+            self._send(handler, 400, {"error": True, "reason": f"Invalid parameters: {e}"})
+            return
+
+        with self._lock:
+            self.requests.append((latitude, longitude, start_date, end_date))
+            fail = self._random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            self._send(handler, 503, {"error": True, "reason": "Injected failure"})
+            return
+
+        days = []
+        day = start_date
+        while day <= end_date:
+            days.append(day.strftime("%Y-%m-%d"))
+            day += datetime.timedelta(days=1)
+        self._send(handler, 200, {
+            "latitude": latitude,
+            "longitude": longitude,
+            "daily_units": {"time": "iso8601", "precipitation_sum": "mm"},
+            "daily": {"time": days, "precipitation_sum": [stub_precipitation(latitude, longitude, d) for d in days]},
+        })
+
+    @staticmethod
+    def _send(handler, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,120 @@
+"""
+Benchmark of bulk changes in reader.py.
+
+Builds a CSV file and a million random changes (a few of them invalid or outside the table),
+then applies them in several ways and checks that every way writes the same, expected file:
+- the changes as a list of 'X,Y,value' strings with a message per cell (the old way of reporting);
+- a .csv and a .jsonl changes file with a summary report, in memory and streaming.
+
+Usage: python changes_benchmark.py [changes] [rows] [columns]
+"""
+import contextlib
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import reader  # noqa: E402
+
+
+def build_files(work_dir, changes_count, rows, columns):
+    """Writes the source table and the changes; returns (src_path, change strings, expected table, valid changes)."""
+    rng = random.Random(1)
+    table = [[f"r{row}c{col}" for col in range(columns)] for row in range(rows)]
+    src_path = os.path.join(work_dir, "source.csv")
+    with open(src_path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(table)
+
+    change_rows = []
+    valid = 0
+    for i in range(changes_count):
+        # About 1% of the changes point outside the table
+        row = rng.randrange(rows + rows // 100)
+        col = rng.randrange(columns + 1) if rng.random() < 0.01 else rng.randrange(columns)
+        value = f"v{i}"
+        change_rows.append((col, row, value))
+        if row < rows and col < columns:
+            table[row][col] = value  # The last change of a cell wins
+            valid += 1
+
+    with open(os.path.join(work_dir, "changes.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["col", "row", "value"])
+        writer.writerows(change_rows)
+        f.write("not a change\n")
+    with open(os.path.join(work_dir, "changes.jsonl"), "w", encoding="utf-8") as f:
+        for col, row, value in change_rows:
+            f.write(json.dumps({"col": col, "row": row, "value": value}) + "\n")
+        f.write("{broken\n")
+    return src_path, [f"{col},{row},{value}" for col, row, value in change_rows], table, valid
+
+
+def run(name, manager, streaming, detailed=False):
+    """Runs a file manager with its output discarded; returns (seconds, report)."""
+    limit = reader.DETAILED_REPORT_LIMIT
+    reader.DETAILED_REPORT_LIMIT = float("inf") if detailed else limit
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if streaming:
+                manager.run_streaming(preview_rows=0)
+            else:
+                # The in-memory run prints the whole table twice; keep that out of the measurement
+                manager._display_content = lambda *args, **kwargs: None
+                manager.run()
+    finally:
+        reader.DETAILED_REPORT_LIMIT = limit
+    return time.perf_counter() - start, manager.report
+
+
+def main():
+    changes_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    columns = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    work_dir = tempfile.mkdtemp(prefix="reader_changes_")
+    try:
+        src_path, change_strings, expected, valid = build_files(work_dir, changes_count, rows, columns)
+        print(f"{changes_count} changes ({valid} valid) on {rows} rows x {columns} columns")
+        print(f"{'method':<42} {'time, s':>8} {'changes/s':>11}")
+
+        def manager(dst_name, changes=(), changes_file=None):
+            return reader.CsvFileManager(src_path, os.path.join(work_dir, dst_name), list(changes),
+                                         changes_file and os.path.join(work_dir, changes_file))
+
+        runs = [
+            ("argument strings, a message per cell", manager("out_argv.csv", change_strings), False, True),
+            ("changes.csv, in memory, summary", manager("out_csv.csv", changes_file="changes.csv"), False, False),
+            ("changes.jsonl, in memory, summary", manager("out_jsonl.csv", changes_file="changes.jsonl"), False, False),
+            ("changes.csv, streaming, summary", manager("out_stream.csv", changes_file="changes.csv"), True, False),
+        ]
+        errors = []
+        for name, file_manager, streaming, detailed in runs:
+            elapsed, report = run(name, file_manager, streaming, detailed)
+            print(f"{name:<42} {elapsed:>8.2f} {changes_count / elapsed:>11.0f}")
+            with open(file_manager.dst_path, newline="", encoding="utf-8") as f:
+                if list(csv.reader(f)) != expected:
+                    errors.append(f"{name}: the written file differs from the expected one")
+            if report.counts["applied"] != valid:
+                errors.append(f"{name}: {report.counts['applied']} changes applied, expected {valid}")
+            # Each changes file ends with one broken line
+            expected_invalid = 0 if not file_manager.changes_file else 1
+            if report.counts["invalid"] != expected_invalid:
+                errors.append(f"{name}: {report.counts['invalid']} invalid changes, expected {expected_invalid}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if errors:
+        for error in errors:
+            print(f"FAILED  {error}")
+        sys.exit(1)
+    print("All methods wrote the expected file.")
+
+
+if __name__ == "__main__":
+    main()
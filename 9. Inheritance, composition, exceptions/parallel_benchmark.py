@@ -0,0 +1,90 @@
+"""
+Benchmark of the parallel CSV mode of reader.py against the serial streaming mode.
+
+Builds a CSV file with awkward cells (quoted commas, quotes and line breaks, non-ASCII text) and
+a changes file, patches it serially and in parallel with several worker counts and chunk sizes,
+prints the throughput of each run and checks that every parallel output is byte for byte
+the serial output and that the change counts agree.
+
+Usage: python parallel_benchmark.py [rows] [changes]
+"""
+import contextlib
+import csv
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import reader  # noqa: E402
+
+CELLS = ["plain", "with, comma", 'with "quotes"', "two\nlines", "żółw", "", "  spaced  ", "12345"]
+
+
+def build_files(work_dir, rows, changes_count):
+    rng = random.Random(7)
+    src_path = os.path.join(work_dir, "source.csv")
+    with open(src_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for row in range(rows):
+            writer.writerow([row] + [rng.choice(CELLS) for _ in range(rng.randint(3, 8))])
+    changes_path = os.path.join(work_dir, "changes.csv")
+    with open(changes_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for i in range(changes_count):
+            # A few changes point past the last row or column
+            writer.writerow([rng.randrange(10), rng.randrange(rows + rows // 100), rng.choice(CELLS + [f"v{i}"])])
+    return src_path, changes_path
+
+
+def run(manager, method, *args):
+    """Runs a file manager method with its output discarded; returns the seconds it took."""
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        getattr(manager, method)(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    changes_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    work_dir = tempfile.mkdtemp(prefix="reader_parallel_")
+    errors = []
+    try:
+        src_path, changes_path = build_files(work_dir, rows, changes_count)
+        size_mb = os.path.getsize(src_path) / 2 ** 20
+        print(f"{rows} rows ({size_mb:.1f} MB), {changes_count} changes, {os.cpu_count()} CPUs")
+        print(f"{'method':<36} {'time, s':>8} {'MB/s':>7}")
+
+        serial = reader.CsvFileManager(src_path, os.path.join(work_dir, "serial.csv"), [], changes_path)
+        elapsed = run(serial, "run_streaming", 0)
+        print(f"{'serial streaming':<36} {elapsed:>8.2f} {size_mb / elapsed:>7.1f}")
+        with open(serial.dst_path, "rb") as f:
+            expected = f.read()
+
+        for workers in (1, 2, 4):
+            for chunk_bytes in (64 * 1024, reader.PARALLEL_CHUNK_BYTES):
+                name = f"parallel, {workers} processes, {chunk_bytes // 1024} KB chunks"
+                parallel = reader.CsvFileManager(src_path, os.path.join(work_dir, "parallel.csv"), [], changes_path)
+                elapsed = run(parallel, "run_parallel", workers, chunk_bytes)
+                print(f"{name:<36} {elapsed:>8.2f} {size_mb / elapsed:>7.1f}")
+                with open(parallel.dst_path, "rb") as f:
+                    if f.read() != expected:
+                        errors.append(f"{name}: the output differs from the serial output")
+                if parallel.report.counts != serial.report.counts:
+                    errors.append(f"{name}: counts {parallel.report.counts} != serial {serial.report.counts}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if errors:
+        for error in errors:
+            print(f"FAILED  {error}")
+        sys.exit(1)
+    print("Every parallel output is identical to the serial output.")
+
+
+if __name__ == "__main__":
+    main()
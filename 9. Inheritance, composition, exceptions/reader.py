@@ -1,17 +1,133 @@
 import sys
 import csv
+import io
 import json
+import mmap
+import operator
 import os
+import struct
+import time
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, compress, repeat
+from multiprocessing import Pool
+
+# How many rows of the original and the modified file a streaming run prints
+PREVIEW_ROWS = 10
+# Up to this many changes every cell change and warning is printed; bigger runs print a summary
+DETAILED_REPORT_LIMIT = 50
+# How many warnings the summary of a big run lists
+MAX_REPORTED_WARNINGS = 20
+# Types a column or row index may have in a .jsonl changes file (not float or bool, which int() would accept)
+INDEX_TYPES = (int, str)
+# How many characters the streaming JSON reader reads at a time
+JSON_CHUNK_SIZE = 1024 * 1024
+# Sidecar file with the row offsets of a CSV file patched in place ("<file>.rowidx")
+ROW_INDEX_SUFFIX = ".rowidx"
+# How many bytes of the CSV file the row index scan handles at a time
+ROW_INDEX_BLOCK_BYTES = 16 * 1024 * 1024
+# Size and modification time (ns) of the CSV file the row index belongs to
+_ROW_INDEX_HEADER = struct.Struct("<QQ")
+# Target size of the pieces a parallel run hands to its worker processes
+PARALLEL_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+# --- Changes ---
+def read_changes_file(path):
+    """
+    Yields (line_number, parts) for every change in a changes file, parts being [col, row, value]:
+    - .csv   - one col,row,value row per line (a 'col,row,value' header line is skipped);
+    - .jsonl - one [col, row, value] list or {"col": ..., "row": ..., "value": ...} object per line.
+    parts is None for a line that cannot be read.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, 'r', newline='', encoding='utf-8') as changes_file:
+        if ext == '.csv':
+            for line_number, parts in enumerate(csv.reader(changes_file), start=1):
+                if not parts or (line_number == 1 and [part.strip().lower() for part in parts] == ['col', 'row', 'value']):
+                    continue
+                yield line_number, parts
+        elif ext == '.jsonl':
+            for line_number, line in enumerate(changes_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    yield line_number, None
+                    continue
+                if isinstance(item, dict):
+                    item = [item.get('col'), item.get('row'), item.get('value')]
+                if type(item) is not list or len(item) != 3 or \
+                        type(item[0]) not in INDEX_TYPES or type(item[1]) not in INDEX_TYPES:
+                    yield line_number, None
+                    continue
+                if type(item[2]) is not str:
+                    item[2] = json.dumps(item[2], ensure_ascii=False)  # A number or null
+                yield line_number, item
+        else:
+            raise ValueError(f"Unsupported changes file type for {path}. Supported types are .csv, .jsonl.")
+
+
+class ChangeReport:
+    """
+    Counts what happened to the changes of a run. In detailed mode every message is printed at once,
+    otherwise only the first MAX_REPORTED_WARNINGS warnings are kept for the summary.
+    """
+
+    def __init__(self, detailed):
+        self.detailed = detailed
+        self.counts = {"applied": 0, "invalid": 0, "missing_row": 0, "missing_column": 0}
+        self.warnings = []
+        self.rows = 0  # Rows that had at least one change
+        self.started = time.perf_counter()
+
+    def cell_changed(self, row_index, col, old_value, value):
+        if self.detailed:
+            print(f"  - Changing cell [{row_index},{col}] from '{old_value}' to '{value}'")
+
+    def warn(self, kind, message):
+        self.counts[kind] += 1
+        if self.detailed:
+            print(f"  - {message}")
+        elif len(self.warnings) < MAX_REPORTED_WARNINGS:
+            self.warnings.append(message)
+
+    def merge(self, other):
+        """Adds the counts and warnings of a report made elsewhere (by a worker process)."""
+        for kind, count in other.counts.items():
+            self.counts[kind] += count
+        for message in other.warnings:
+            if self.detailed:
+                print(f"  - {message}")
+            elif len(self.warnings) < MAX_REPORTED_WARNINGS:
+                self.warnings.append(message)
+
+    def print_summary(self):
+        counts = self.counts
+        total = sum(counts.values())
+        print(f"\nSummary: {total} changes in {self.rows} rows: {counts['applied']} applied, "
+              f"{counts['invalid']} invalid, {counts['missing_row']} outside the rows, "
+              f"{counts['missing_column']} outside the columns ({time.perf_counter() - self.started:.2f} s).")
+        if self.warnings:
+            print("First warnings:")
+            for message in self.warnings:
+                print(f"  - {message}")
+            skipped = total - counts['applied'] - len(self.warnings)
+            if skipped > 0:
+                print(f"  ... and {skipped} more.")
 
 
 # --- Base File Manager Class ---
 class FileManager(ABC):
-    def __init__(self, src_path, dst_path, changes):
+    def __init__(self, src_path, dst_path, changes, changes_file=None):
         self.src_path = src_path
         self.dst_path = dst_path
         self.changes = changes
+        self.changes_file = changes_file  # Optional .csv / .jsonl file with more changes
         self.data = []
+        self.report = None
 
     def _check_source_file(self):
         """Checks if the source file exists and is a valid file."""
@@ -39,42 +155,98 @@ class FileManager(ABC):
         """Abstract method to save data from self.data to the destination file."""
         pass
 
-    def _apply_changes(self):
-        """Applies the given changes (X,Y,value) to the internal data (list of lists)."""
-        print("\nApplying changes:")
+    @abstractmethod
+    def _iter_rows(self):
+        """Abstract method that yields the rows of the source file one by one (streaming mode)."""
+        pass
+
+    @abstractmethod
+    def _write_rows(self, path, rows):
+        """Abstract method that writes rows (any iterable) to path, consuming them one by one (streaming mode)."""
+        pass
+
+    def _describe_change(self, source):
+        """Names a change in messages: the argument itself, or its line in the changes file."""
+        if isinstance(source, int):
+            return f"at line {source} of '{self.changes_file}'"
+        return f"'{source}'"
+
+    def _iter_change_specs(self):
+        """Yields (source, parts) for every change: first the command-line ones, then the changes file."""
         for change in self.changes:
-            try:
-                parts = change.split(',')
-                if len(parts) != 3:
-                    raise ValueError("Incorrect number of parts.")
+            yield change, change.split(',')
+        if self.changes_file:
+            yield from read_changes_file(self.changes_file)
 
+    def _parse_changes(self):
+        """
+        Parses the changes (X,Y,value) and groups them by row: {row: [(col, value, source), ...]}.
+        Invalid changes are reported and left out; changes of one row keep their order.
+        """
+        self.report = ChangeReport(detailed=not self.changes_file and len(self.changes) <= DETAILED_REPORT_LIMIT)
+        changes_by_row = {}
+        # This loop runs once per change, so it is kept lean: int() itself ignores surrounding spaces
+        for source, parts in self._iter_change_specs():
+            try:
                 col_str, row_str, value = parts
-                col = int(col_str.strip())
-                row = int(row_str.strip())
+                col = int(col_str)
+                row = int(row_str)
+            except (ValueError, TypeError) as e:
+                if parts is None:
+                    e = "Unreadable line"
+                elif len(parts) != 3:
+                    e = "Incorrect number of parts"
+                self.report.warn("invalid", f"Warning: Invalid change format {self._describe_change(source)}. "
+                                            f"Expected 'X,Y,value'. Error: {e}. Skipping.")
+                continue
+            row_changes = changes_by_row.get(row)
+            if row_changes is None:
+                changes_by_row[row] = row_changes = []
+            row_changes.append((col, value, source))
+        self.report.rows = len(changes_by_row)
+        return changes_by_row
 
-                if 0 <= row < len(self.data) and 0 <= col < len(self.data[row]):
-                    print(f"  - Changing cell [{row},{col}] from '{self.data[row][col]}' to '{value}'")
-                    self.data[row][col] = value
-                else:
-                    if not (0 <= row < len(self.data)):
-                        print(f"  - Warning: Row index {row} out of bounds for change '{change}'. Skipping.")
-                    else:
-                        print(
-                            f"  - Warning: Column index {col} out of bounds for row {row} in change '{change}'. Skipping.")
-            except ValueError as e:
-                print(f"  - Warning: Invalid change format '{change}'. Expected 'X,Y,value'. Error: {e}. Skipping.")
-            except IndexError:
-                print(f"  - Warning: Insufficient values in change '{change}'. Expected 'X,Y,value'. Skipping.")
-            except Exception as e:
-                print(f"  - An unexpected error occurred applying change '{change}': {e}. Skipping.")
-
-    def _display_content(self, title):
-        """Helper to display the 2D list content."""
+    def _patch_row(self, row_index, row, row_changes):
+        """Applies the changes of one row to it in place."""
+        report = self.report
+        width = len(row)
+        applied = 0
+        for col, value, source in row_changes:
+            if 0 <= col < width:
+                if report.detailed:
+                    report.cell_changed(row_index, col, row[col], value)
+                row[col] = value
+                applied += 1
+            else:
+                report.warn("missing_column", f"Warning: Column index {col} out of bounds for row {row_index} "
+                                              f"in change {self._describe_change(source)}. Skipping.")
+        report.counts["applied"] += applied
+
+    def _report_missing_rows(self, changes_by_row):
+        """Reports the changes whose rows do not exist in the file."""
+        for row_index, row_changes in sorted(changes_by_row.items()):
+            for _, _, source in row_changes:
+                self.report.warn("missing_row", f"Warning: Row index {row_index} out of bounds "
+                                                f"for change {self._describe_change(source)}. Skipping.")
+
+    def _apply_changes(self):
+        """Applies the given changes (X,Y,value) to the internal data (list of lists) in one pass over the rows."""
+        print("\nApplying changes:")
+        changes_by_row = self._parse_changes()
+        for row_index in sorted(changes_by_row):
+            if 0 <= row_index < len(self.data):
+                self._patch_row(row_index, self.data[row_index], changes_by_row.pop(row_index))
+        self._report_missing_rows(changes_by_row)
+        self.report.print_summary()
+
+    def _display_content(self, title, rows=None):
+        """Helper to display the 2D list content (self.data unless other rows are given)."""
+        rows = self.data if rows is None else rows
         print(f"\n{title} content:")
-        if not self.data:
+        if not rows:
             print("[Empty]")
             return
-        for row in self.data:
+        for row in rows:
             print(','.join(map(str, row)))
 
     def run(self):
@@ -108,6 +280,197 @@ class FileManager(ABC):
         except Exception as e:
             print(f"Error saving modified file to '{self.dst_path}': {e}")
 
+    def _stream_patched_rows(self, changes_by_row, preview, preview_rows):
+        """
+        Yields the source rows with their changes applied. Patched rows are removed from changes_by_row,
+        so what is left afterwards are rows missing from the file.
+        The first rows are also copied to preview ("original" and "modified" lists).
+        """
+        for row_index, row in enumerate(self._iter_rows()):
+            in_preview = row_index < preview_rows
+            if in_preview:
+                preview["original"].append(list(row))
+            row_changes = changes_by_row.pop(row_index, None)
+            if row_changes:
+                self._patch_row(row_index, row, row_changes)
+            if in_preview:
+                preview["modified"].append(row)
+            yield row
+
+    def run_streaming(self, preview_rows=PREVIEW_ROWS, changes_by_row=None):
+        """
+        Streaming execution flow for files too big for memory: rows go one at a time from the source file
+        to the destination file and are patched on the way, so memory is bounded by the largest row
+        (plus the changes themselves). Only the first preview_rows rows are displayed (0 displays none).
+        The output is written to a temporary file next to the destination and renamed at the end,
+        so the destination may even be the source file.
+        changes_by_row may hold changes already parsed by _parse_changes().
+        """
+        if not self._check_source_file():
+            return
+
+        if changes_by_row is None:
+            print("\nApplying changes:")
+            changes_by_row = self._parse_changes()
+        preview = {"original": [], "modified": []}
+        tmp_path = self.dst_path + ".tmp"
+        try:
+            row_count = self._write_rows(tmp_path, self._stream_patched_rows(changes_by_row, preview, preview_rows))
+            os.replace(tmp_path, self.dst_path)
+        except FileNotFoundError:
+            print(f"Error: Source file '{self.src_path}' not found during load.")
+            return
+        except PermissionError as e:
+            print(f"Error: Permission denied: {e}")
+            return
+        except Exception as e:
+            print(f"Error streaming '{self.src_path}' to '{self.dst_path}': {e}")
+            return
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._report_missing_rows(changes_by_row)
+        self.report.print_summary()
+
+        if preview_rows > 0:
+            for title in ("original", "modified"):
+                self._display_content(f"{title.capitalize()} (first {len(preview[title])} of {row_count} rows)",
+                                      preview[title])
+        print(f"\nModified file saved to '{self.dst_path}' ({row_count} rows)")
+
+    def run_in_place(self, save_index=False):
+        """In-place execution flow; only formats with addressable cells support it."""
+        print(f"Error: In-place patching is not supported for {type(self).__name__}. Use --stream instead.")
+
+    def run_parallel(self, workers=None):
+        """Parallel execution flow; only formats that can be split at row boundaries support it."""
+        print(f"Error: Parallel processing is not supported for {type(self).__name__}. Use --stream instead.")
+
+
+# --- CSV row index and in-place patching ---
+class CsvRowIndex:
+    """
+    Start offsets (uint64) of the rows of a CSV file, as csv.reader counts rows:
+    a line break inside a quoted field does not end the row. Quoting must be standard, as csv.writer
+    writes it (a quote character opens or closes a field, or is doubled inside one).
+    The index can be kept in a sidecar file (ROW_INDEX_SUFFIX) together with the size and modification
+    time of the CSV file, so it is only rebuilt when the file was changed by something else.
+    """
+
+    def __init__(self, offsets, file_size):
+        self.offsets = offsets
+        self.file_size = file_size
+
+    @classmethod
+    def build(cls, data):
+        """
+        Scans the file contents (bytes or mmap) once for row starts.
+        A line ends a row when the number of quote characters before its end is even. The file is split
+        into blocks of whole lines and every block is handled by split/count/accumulate, which run in C,
+        instead of a Python loop per line.
+        """
+        offsets = array("Q")
+        size = len(data)
+        if not size:
+            return cls(offsets, 0)
+        offsets.append(0)
+        block_start = 0
+        quotes = 0  # Quote characters before block_start (only the parity matters)
+        while block_start < size:
+            block_end = min(block_start + ROW_INDEX_BLOCK_BYTES, size)
+            if block_end < size:
+                newline = data.rfind(b"\n", block_start, block_end)
+                if newline < 0:
+                    newline = data.find(b"\n", block_end)  # A line longer than a block
+                block_end = size if newline < 0 else newline + 1
+            lines = data[block_start:block_end].split(b"\n")
+            if not lines[-1]:
+                lines.pop()  # The block ends with a line break
+            # End offset of every line (past its line break) and the running number of quote characters there
+            line_ends = accumulate(map((1).__add__, map(len, lines)), initial=block_start)
+            next(line_ends)  # The block start itself
+            if quotes % 2 == 0 and data.find(b'"', block_start, block_end) < 0:
+                offsets.extend(line_ends)  # No quotes in the block: every line is a row
+            else:
+                quote_counts = list(accumulate(map(bytes.count, lines, repeat(b'"')), initial=quotes))[1:]
+                offsets.extend(compress(line_ends, map(operator.not_, map((1).__and__, quote_counts))))
+                quotes = quote_counts[-1] if quote_counts else quotes
+            block_start = block_end
+        if offsets[-1] >= size:
+            offsets.pop()  # The end of the last row is not the start of another one
+        return cls(offsets, size)
+
+    @classmethod
+    def load(cls, path):
+        """Returns the saved index of the CSV file at path, or None if there is none or it is out of date."""
+        try:
+            stat = os.stat(path)
+            with open(path + ROW_INDEX_SUFFIX, "rb") as f:
+                file_size, mtime_ns = _ROW_INDEX_HEADER.unpack(f.read(_ROW_INDEX_HEADER.size))
+                data = f.read()
+        except (OSError, struct.error):
+            return None
+        if (file_size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        offsets = array("Q")
+        offsets.frombytes(data[:len(data) - len(data) % offsets.itemsize])
+        return cls(offsets, file_size)
+
+    def save(self, path):
+        """Writes the index next to the CSV file, stamped with its current size and modification time."""
+        stat = os.stat(path)
+        tmp_path = path + ROW_INDEX_SUFFIX + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_ROW_INDEX_HEADER.pack(stat.st_size, stat.st_mtime_ns))
+            self.offsets.tofile(f)
+        os.replace(tmp_path, path + ROW_INDEX_SUFFIX)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def row_span(self, row_index):
+        """Returns (start, end) of the row without its line break."""
+        start = self.offsets[row_index]
+        end = self.offsets[row_index + 1] if row_index + 1 < len(self.offsets) else self.file_size
+        return start, end
+
+
+def split_csv_fields(raw_row):
+    """Returns the (start, end) byte span of every field of one CSV row (without its line break)."""
+    if not raw_row:
+        return []  # csv.reader reads an empty line as a row without fields
+    spans = []
+    position = 0
+    field_start = 0
+    quotes = 0
+    # A comma inside quotes leaves an odd number of quote characters before it in the field
+    for piece in raw_row.split(b","):
+        quotes += piece.count(b'"')
+        position += len(piece)
+        if quotes % 2 == 0:
+            spans.append((field_start, position))
+            field_start = position + 1
+            quotes = 0
+        position += 1
+    if field_start < len(raw_row) + 1 and quotes:
+        spans.append((field_start, len(raw_row)))  # Unterminated quote
+    return spans
+
+
+def encode_csv_field(value, quoted):
+    """Encodes a value the way csv.writer would, quoting it also when the original field was quoted."""
+    if quoted or any(char in value for char in ',"\r\n'):
+        return ('"' + value.replace('"', '""') + '"').encode('utf-8')
+    return value.encode('utf-8')
+
+
+def decode_csv_field(raw):
+    """Returns the value of one raw CSV field."""
+    text = raw.decode('utf-8', errors='replace')
+    if text.startswith('"') and text.endswith('"') and len(text) > 1:
+        return text[1:-1].replace('""', '"')
+    return text
+
 
 # --- Concrete CSV File Manager ---
 class CsvFileManager(FileManager):
@@ -137,9 +500,300 @@ class CsvFileManager(FileManager):
             print(f"Error writing CSV file to '{self.dst_path}': {e}")
             raise
 
+    def run_in_place(self, save_index=False):
+        """
+        Patches the source file itself (the destination must be the same file) through a memory map.
+        Rows are found through a CsvRowIndex (loaded from its sidecar file when it is up to date, else built
+        with one scan) and only the changed cells are overwritten, as long as every new value has
+        exactly the byte length of the old one. Otherwise the whole file is rewritten as by run_streaming().
+        With save_index (or when a saved index already exists) the index is kept next to the file.
+        Same-length writes are not atomic: a crash may leave only some of the cells changed.
+        """
+        if not self._check_source_file():
+            return
+        if not os.path.exists(self.dst_path) or not os.path.samefile(self.src_path, self.dst_path):
+            print(f"Error: In-place patching needs the destination to be the source file '{self.src_path}'.")
+            return
+
+        print("\nApplying changes:")
+        changes_by_row = self._parse_changes()
+        started = time.perf_counter()
+        save_index = save_index or os.path.exists(self.src_path + ROW_INDEX_SUFFIX)
+        try:
+            with open(self.src_path, 'r+b') as csvfile:
+                if os.fstat(csvfile.fileno()).st_size == 0:
+                    self._report_missing_rows(changes_by_row)
+                    self.report.print_summary()
+                    return
+                with mmap.mmap(csvfile.fileno(), 0) as data:
+                    index = CsvRowIndex.load(self.src_path)
+                    index_source = "loaded"
+                    if index is None:
+                        index, index_source = CsvRowIndex.build(data), "built"
+                    index_time = time.perf_counter() - started
+
+                    writes, column_misses = self._plan_in_place(data, index, changes_by_row)
+                    if writes is not None:
+                        for offset, new_raw, row_index, col, old_value, value in writes:
+                            self.report.cell_changed(row_index, col, old_value, value)
+                            data[offset:offset + len(new_raw)] = new_raw
+                        data.flush()
+        except PermissionError:
+            print(f"Error: Permission denied when patching '{self.src_path}'.")
+            return
+        except Exception as e:
+            print(f"Error patching '{self.src_path}' in place: {e}")
+            return
+
+        if writes is None:
+            print("  - A new value changes the length of its cell; rewriting the whole file.")
+            self._remove_row_index()
+            self.run_streaming(preview_rows=0, changes_by_row=changes_by_row)
+            return
+        self.report.counts["applied"] += len(writes)
+        for row_index, col, source in column_misses:
+            self.report.warn("missing_column", f"Warning: Column index {col} out of bounds for row {row_index} "
+                                               f"in change {self._describe_change(source)}. Skipping.")
+        self._report_missing_rows({row_index: row_changes for row_index, row_changes in changes_by_row.items()
+                                   if not 0 <= row_index < len(index)})
+        if save_index:
+            index.save(self.src_path)  # Same offsets, new modification time
+        self.report.print_summary()
+        print(f"\nPatched {len(writes)} cells of '{self.src_path}' in place in "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms (row index of {len(index)} rows {index_source} "
+              f"in {index_time * 1000:.1f} ms)")
+
+    def _plan_in_place(self, data, index, changes_by_row):
+        """
+        Works out the in-place writes: returns ([(offset, new_raw, row, col, old_value, value), ...], column misses),
+        or (None, None) as soon as a new value does not have the byte length of the old one.
+        """
+        writes = []
+        column_misses = []
+        for row_index in sorted(changes_by_row):
+            if not 0 <= row_index < len(index):
+                continue
+            start, end = index.row_span(row_index)
+            raw_row = data[start:end]
+            terminator = len(raw_row) - len(raw_row.rstrip(b"\r\n"))
+            raw_row = raw_row[:len(raw_row) - terminator]
+            spans = split_csv_fields(raw_row)
+            for col, value, source in changes_by_row[row_index]:
+                if not 0 <= col < len(spans):
+                    column_misses.append((row_index, col, source))
+                    continue
+                field_start, field_end = spans[col]
+                old_raw = raw_row[field_start:field_end]
+                new_raw = encode_csv_field(value, quoted=old_raw.startswith(b'"'))
+                if len(new_raw) != len(old_raw):
+                    return None, None
+                # A later change of the same cell must see this value as the old one
+                raw_row = raw_row[:field_start] + new_raw + raw_row[field_end:]
+                writes.append((start + field_start, new_raw, row_index, col, decode_csv_field(old_raw), value))
+        return writes, column_misses
+
+    def run_parallel(self, workers=None, chunk_bytes=PARALLEL_CHUNK_BYTES):
+        """
+        Patches the file with a pool of worker processes (os.cpu_count() by default).
+        The file is cut at row boundaries taken from a CsvRowIndex (the saved one when it is up to date),
+        so no chunk starts inside a quoted field; every worker gets one chunk of about chunk_bytes bytes
+        together with the changes of its rows, and the patched chunks are written to the destination
+        in their original order. The output is byte for byte the output of run_streaming().
+        Cell changes are counted in the summary, not printed one by one.
+        """
+        if not self._check_source_file():
+            return
+
+        print("\nApplying changes:")
+        changes_by_row = self._parse_changes()
+        workers = workers or os.cpu_count() or 1
+        started = time.perf_counter()
+        file_size = os.path.getsize(self.src_path)
+        index = CsvRowIndex.load(self.src_path)
+        if index is None:
+            with open(self.src_path, 'rb') as csvfile:
+                if file_size:
+                    with mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        index = CsvRowIndex.build(data)
+                else:
+                    index = CsvRowIndex(array("Q"), 0)
+
+        # Chunks of whole rows: rows first_row..next_row-1 start at least chunk_bytes apart
+        changed_rows = sorted(row_index for row_index in changes_by_row if 0 <= row_index < len(index))
+        tasks = []
+        first_row = 0
+        while first_row < len(index):
+            next_row = bisect_left(index.offsets, index.offsets[first_row] + chunk_bytes, first_row + 1)
+            start = index.offsets[first_row]
+            end = index.offsets[next_row] if next_row < len(index) else index.file_size
+            chunk_rows = changed_rows[bisect_left(changed_rows, first_row):bisect_left(changed_rows, next_row)]
+            tasks.append((self.src_path, self.changes_file, start, end, first_row,
+                          {row_index: changes_by_row.pop(row_index) for row_index in chunk_rows}))
+            first_row = next_row
+
+        tmp_path = self.dst_path + ".tmp"
+        try:
+            with Pool(workers) as pool, open(tmp_path, 'wb') as output:
+                # imap hands the results back in task order, whichever worker finishes first
+                for patched, report in pool.imap(_patch_csv_chunk, tasks):
+                    output.write(patched)
+                    self.report.merge(report)
+            os.replace(tmp_path, self.dst_path)
+        except PermissionError as e:
+            print(f"Error: Permission denied: {e}")
+            return
+        except Exception as e:
+            print(f"Error processing '{self.src_path}' in parallel: {e}")
+            return
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        elapsed = time.perf_counter() - started
+
+        self._report_missing_rows(changes_by_row)
+        self.report.print_summary()
+        print(f"\nModified file saved to '{self.dst_path}' ({len(index)} rows): {file_size / 2 ** 20:.1f} MB "
+              f"in {elapsed:.2f} s ({file_size / 2 ** 20 / elapsed:.1f} MB/s, {len(tasks)} chunks, "
+              f"{workers} processes)")
+
+    def _remove_row_index(self):
+        """Drops the saved row index, which a rewrite makes useless."""
+        try:
+            os.remove(self.src_path + ROW_INDEX_SUFFIX)
+        except FileNotFoundError:
+            pass
+
+    def _iter_rows(self):
+        """Yields CSV rows one by one; only the current row is in memory."""
+        with open(self.src_path, 'r', newline='', encoding='utf-8') as csvfile:
+            yield from csv.reader(csvfile)
+
+    def _write_rows(self, path, rows):
+        """Writes CSV rows as they come. Returns the number of rows written."""
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+
+# --- Streaming JSON ---
+def iter_json_array(jsonfile, chunk_size=JSON_CHUNK_SIZE):
+    """
+    Yields the elements of the top-level JSON array in jsonfile one by one.
+    The file is read in chunks and every element is parsed as soon as it is complete,
+    so memory is bounded by the chunk size plus the largest element.
+    Raises json.JSONDecodeError for invalid JSON.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0  # Where parsing continues in buffer
+    at_eof = False
+    expecting = "["  # What has to come next: "[", a value, or "," / "]" after a value
+
+    def fill(size=chunk_size):
+        """Drops the parsed part of the buffer and reads size more characters. Returns False at the end of the file."""
+        nonlocal buffer, position, at_eof
+        chunk = jsonfile.read(size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        at_eof = not chunk
+        return bool(chunk)
+
+    while True:
+        # Skip whitespace, reading more when the buffer runs out
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\n\r":
+                position += 1
+            if position < len(buffer) or not fill():
+                break
+        if position >= len(buffer):
+            raise json.JSONDecodeError("Unexpected end of the JSON array", buffer, position)
+        char = buffer[position]
+
+        if expecting == "[":
+            if char != "[":
+                raise json.JSONDecodeError("Expecting a top-level array", buffer, position)
+            position += 1
+            expecting = "value or ]"
+        elif expecting == ", or ]" or (expecting == "value or ]" and char == "]"):
+            if char == "]":
+                position += 1
+                break
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+            position += 1
+            expecting = "value"
+        else:
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A number or literal ending at the buffer end may continue in the next chunk
+                    if end < len(buffer) or at_eof or buffer[position] in "[{\"":
+                        break
+                except json.JSONDecodeError:
+                    if at_eof:
+                        raise
+                # The element goes past the buffer: at least double the unparsed part, so a huge element
+                # is parsed a logarithmic number of times, not once per chunk
+                fill(max(chunk_size, len(buffer) - position))
+            position = end
+            expecting = ", or ]"
+            yield value
+
+    # Only whitespace may follow the array
+    while True:
+        if buffer[position:].strip():
+            raise json.JSONDecodeError("Extra data after the JSON array", buffer, position)
+        position = len(buffer)
+        if not fill():
+            return
+
+
+def dump_json_row(row, indent):
+    """
+    Encodes one row exactly as it appears inside json.dumps(rows, indent=indent, ensure_ascii=False):
+    indented by one level for indent=4, compact (no spaces) for indent=None.
+    """
+    if indent is None:
+        return json.dumps(row, ensure_ascii=False, separators=(',', ':'))
+    outer = " " * indent
+    if row and not any(isinstance(cell, (list, dict)) for cell in row):
+        # Flat row (the usual case): json.dumps with indent uses the slow pure-Python encoder,
+        # so the line breaks are put into the item separator of the fast compact encoder instead
+        inner = json.dumps(row, ensure_ascii=False, separators=(",\n" + outer * 2, ": "))[1:-1]
+        return f"{outer}[\n{outer * 2}{inner}\n{outer}]"
+    # Strings never contain raw line breaks (they are escaped), so every line break starts a nested line
+    return outer + json.dumps(row, indent=indent, ensure_ascii=False).replace("\n", "\n" + outer)
+
+
+def _patch_csv_chunk(task):
+    """
+    Worker of CsvFileManager.run_parallel(): patches the rows of one chunk of the file.
+    Returns (the chunk written by csv.writer as bytes, ChangeReport of its changes).
+    """
+    src_path, changes_file, start, end, first_row, chunk_changes = task
+    manager = CsvFileManager(src_path, None, [], changes_file)
+    manager.report = ChangeReport(detailed=False)
+    with open(src_path, 'rb') as csvfile:
+        csvfile.seek(start)
+        text = csvfile.read(end - start).decode('utf-8')
+    output = io.StringIO()
+    writer = csv.writer(output)
+    for row_index, row in enumerate(csv.reader(io.StringIO(text, newline='')), start=first_row):
+        row_changes = chunk_changes.get(row_index)
+        if row_changes:
+            manager._patch_row(row_index, row, row_changes)
+        writer.writerow(row)
+    return output.getvalue().encode('utf-8'), manager.report
+
 
 # --- Concrete JSON File Manager ---
 class JsonFileManager(FileManager):
+    # indent=4 gives the pretty-printed file, None the compact form without any spaces
+    indent = 4
     def _load_data(self):
         """Loads JSON data into self.data (expects list of lists)."""
         try:
@@ -164,7 +818,10 @@ class JsonFileManager(FileManager):
         """Saves self.data to JSON file."""
         try:
             with open(self.dst_path, 'w', encoding='utf-8') as jsonfile:
-                json.dump(self.data, jsonfile, indent=4, ensure_ascii=False)
+                if self.indent is None:
+                    json.dump(self.data, jsonfile, ensure_ascii=False, separators=(',', ':'))
+                else:
+                    json.dump(self.data, jsonfile, indent=self.indent, ensure_ascii=False)
         except TypeError as e:
             print(f"Error: TypeError when writing JSON. Data contains non-serializable types: {e}")
             raise
@@ -175,16 +832,76 @@ class JsonFileManager(FileManager):
             print(f"Error writing JSON file to '{self.dst_path}': {e}")
             raise
 
+    def _iter_rows(self):
+        """Yields the rows of the top-level array one by one, without loading the whole file."""
+        with open(self.src_path, 'r', encoding='utf-8') as jsonfile:
+            for row in iter_json_array(jsonfile):
+                if not isinstance(row, list):
+                    raise ValueError("JSON file does not contain a list of lists.")
+                yield row
+
+    def _write_rows(self, path, rows):
+        """
+        Writes rows as they come, byte for byte like _save_data would write the whole list.
+        Returns the number of rows written.
+        """
+        count = 0
+        separator = ",\n" if self.indent is not None else ","
+        with open(path, 'w', encoding='utf-8') as jsonfile:
+            jsonfile.write("[")
+            for row in rows:
+                if count:
+                    jsonfile.write(separator)
+                elif self.indent is not None:
+                    jsonfile.write("\n")
+                jsonfile.write(dump_json_row(row, self.indent))
+                count += 1
+            if count and self.indent is not None:
+                jsonfile.write("\n")
+            jsonfile.write("]")
+        return count
+
 
 # --- Main Program Logic ---
 
-if len(sys.argv) < 4:
-    print("Usage: reader.py <source_file> <destination_file> <change1> <change2> ...")
-    sys.exit(1)
+USAGE = ("Usage: reader.py [--stream] [--preview N] [--changes-file FILE] <source_file> <destination_file> "
+         "<change1> <change2> ...\n"
+         "  --stream             patch the file row by row without loading it (for files bigger than memory)\n"
+         f"  --preview N          in streaming mode, display only the first N rows (default {PREVIEW_ROWS}, 0 for none)\n"
+         "  --changes-file FILE  read more changes from a .csv (col,row,value) or .jsonl file\n"
+         "  --compact            write JSON without indentation or spaces\n"
+         "  --in-place           patch a CSV source file itself (destination = source); same-length changes\n"
+         "                       are written into the file directly, others fall back to a full rewrite\n"
+         f"  --save-index         with --in-place, keep the row index in <file>{ROW_INDEX_SUFFIX} for the next run\n"
+         "  --parallel N         patch a CSV file in chunks with N worker processes (0 for one per CPU)")
+
 
-src_file = sys.argv[1]
-dst_file = sys.argv[2]
-changes = sys.argv[3:]
+def parse_options(args):
+    """Separates the leading --options from the positional arguments. Returns (options, positional)."""
+    options = {"stream": False, "preview": PREVIEW_ROWS, "changes_file": None, "compact": False,
+               "in_place": False, "save_index": False, "parallel": None}
+    args = list(args)
+    while args and args[0].startswith("--"):
+        option = args.pop(0)
+        if option == "--stream":
+            options["stream"] = True
+        elif option == "--preview" and args and args[0].isdigit():
+            options["preview"] = int(args.pop(0))
+        elif option == "--changes-file" and args:
+            options["changes_file"] = args.pop(0)
+        elif option == "--compact":
+            options["compact"] = True
+        elif option == "--in-place":
+            options["in_place"] = True
+        elif option == "--save-index":
+            options["save_index"] = True
+        elif option == "--parallel" and args and args[0].isdigit():
+            options["parallel"] = int(args.pop(0))
+        else:
+            print(f"Unknown or incomplete option: {option}")
+            print(USAGE)
+            sys.exit(1)
+    return options, args
 
 
 def get_file_manager_class(filepath):
@@ -197,15 +914,41 @@ def get_file_manager_class(filepath):
         raise ValueError(f"Unsupported file type for {filepath}. Supported types are .csv, .json.")
 
 
-try:
-    src_manager_class = get_file_manager_class(src_file)
+def main():
+    options, positional = parse_options(sys.argv[1:])
+    if len(positional) < 2 or (len(positional) < 3 and not options["changes_file"]):
+        print(USAGE)
+        sys.exit(1)
+
+    src_file = positional[0]
+    dst_file = positional[1]
+    changes = positional[2:]
+    if options["changes_file"] and not os.path.isfile(options["changes_file"]):
+        print(f"Error: Changes file '{options['changes_file']}' does not exist.")
+        sys.exit(1)
+
+    try:
+        src_manager_class = get_file_manager_class(src_file)
+
+        file_manager = src_manager_class(src_file, dst_file, changes, options["changes_file"])
+        if options["compact"]:
+            file_manager.indent = None
+        if options["in_place"]:
+            file_manager.run_in_place(options["save_index"])
+        elif options["parallel"] is not None:
+            file_manager.run_parallel(options["parallel"] or None)
+        elif options["stream"]:
+            file_manager.run_streaming(options["preview"])
+        else:
+            file_manager.run()
+
+    except ValueError as e:
+        print(f"Configuration Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        sys.exit(1)
 
-    file_manager = src_manager_class(src_file, dst_file, changes)
-    file_manager.run()
 
-except ValueError as e:
-    print(f"Configuration Error: {e}")
-    sys.exit(1)
-except Exception as e:
-    print(f"An unexpected error occurred: {e}")
-    sys.exit(1)
+if __name__ == "__main__":
+    main()